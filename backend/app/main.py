@@ -57,7 +57,7 @@ async def startup_event():
     """Cleanup old sessions on application startup"""
     try:
         # Cleanup sessions older than 7 days and keep max 100 most recent
-        result = whatsapp_service.cleanup_old_sessions(max_age_days=7, max_sessions=100)
+        result = await whatsapp_service.cleanup_old_sessions_async(max_age_days=7, max_sessions=100)
         if result["deleted"] > 0:
             logger.info("Cleaned up %d old sessions on startup (kept %d)", result["deleted"], result["kept"])
     except Exception as e:
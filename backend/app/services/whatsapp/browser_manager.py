@@ -1,8 +1,11 @@
 """
 Browser management for WhatsApp Web automation
 """
+import asyncio
 import logging
-from typing import Optional
+import weakref
+from functools import partial
+from typing import Dict, Optional
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 
 logger = logging.getLogger(__name__)
@@ -14,6 +17,12 @@ class BrowserManager:
     def __init__(self):
         self.playwright = None
         self.browser: Optional[Browser] = None
+        # Persistent contexts by user_data_dir, cached as soon as the launch
+        # starts so concurrent callers share it; evicted when the context
+        # closes or its launch fails
+        self._persistent_contexts: Dict[str, "asyncio.Future[BrowserContext]"] = {}
+        # Pages that already carry the anti-detection init script
+        self._prepared_pages: "weakref.WeakSet[Page]" = weakref.WeakSet()
     
     async def initialize(self):
         """Initialize Playwright browser"""
@@ -28,6 +37,15 @@ class BrowserManager:
     
     async def shutdown(self):
         """Shutdown browser and cleanup"""
+        # Persistent contexts run their own browser process; close the
+        # ones no session has closed yet
+        launches = list(self._persistent_contexts.values())
+        self._persistent_contexts.clear()
+        contexts = [
+            launch.result() for launch in launches
+            if launch.done() and not launch.cancelled() and launch.exception() is None
+        ]
+        await asyncio.gather(*(context.close() for context in contexts), return_exceptions=True)
         if self.browser:
             await self.browser.close()
             self.browser = None
@@ -42,7 +60,12 @@ class BrowserManager:
         user_agent: Optional[str] = None
     ) -> BrowserContext:
         """
-        Create a persistent browser context
+        Create a persistent browser context, or return the open one already
+        launched for user_data_dir
+        
+        Chromium can't open the same user data directory twice, and launching
+        a persistent context starts a whole browser process, so contexts are
+        pooled until they are closed.
         
         Args:
             user_data_dir: Directory for browser data (cookies, storage, etc.)
@@ -52,6 +75,37 @@ class BrowserManager:
         Returns:
             BrowserContext instance
         """
+        launch = self._persistent_contexts.get(user_data_dir)
+        if launch is None:
+            launch = asyncio.ensure_future(
+                self._launch_persistent_context(user_data_dir, viewport, user_agent)
+            )
+            self._persistent_contexts[user_data_dir] = launch
+            launch.add_done_callback(partial(self._on_context_launched, user_data_dir))
+        else:
+            logger.debug("Reusing persistent context for %s", user_data_dir)
+        # Shielded so a cancelled caller doesn't abort a launch others await
+        return await asyncio.shield(launch)
+    
+    def _on_context_launched(self, user_data_dir: str, launch: "asyncio.Future[BrowserContext]") -> None:
+        """Evict a failed launch, or hook eviction to the context closing"""
+        if launch.cancelled() or launch.exception() is not None:
+            self._evict_context(user_data_dir, launch)
+            return
+        launch.result().on("close", lambda _: self._evict_context(user_data_dir, launch))
+    
+    def _evict_context(self, user_data_dir: str, launch: "asyncio.Future[BrowserContext]") -> None:
+        """Drop a pooled context unless a newer launch already replaced it"""
+        if self._persistent_contexts.get(user_data_dir) is launch:
+            del self._persistent_contexts[user_data_dir]
+    
+    async def _launch_persistent_context(
+        self,
+        user_data_dir: str,
+        viewport: Optional[dict],
+        user_agent: Optional[str]
+    ) -> BrowserContext:
+        """Launch a new persistent browser context"""
         await self.initialize()
         
         if viewport is None:
@@ -98,11 +152,14 @@ class BrowserManager:
         else:
             page = await context.new_page()
         
-        # Override webdriver property to avoid detection
-        await page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-        """)
+        # Override webdriver property to avoid detection (once per page, as
+        # pages of pooled contexts are handed out again)
+        if page not in self._prepared_pages:
+            await page.add_init_script("""
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                });
+            """)
+            self._prepared_pages.add(page)
         
         return page
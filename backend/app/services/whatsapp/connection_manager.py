@@ -15,12 +15,34 @@ from app.core.logging_setup import (
     trace_id_ctx,
     request_id_ctx,
 )
-from app.services.whatsapp.session_manager import SessionManager
+from app.services.whatsapp.session_manager import (
+    CONNECTED_SELECTORS,
+    PAGE_STATE_JS,
+    QR_SELECTOR,
+    SessionManager,
+    SessionState,
+    utc_iso_now,
+)
 from app.services.whatsapp.browser_manager import BrowserManager
 
 logger = logging.getLogger(__name__)
 
 QR_WAIT_TIMEOUT_MS = 30000  # Allow slower networks to fetch QR
+# Elements only shown once the QR code has been scanned and the main
+# interface loaded, watched by _monitor_connection
+MONITOR_CONNECTED_SELECTORS = (
+    'div[data-testid="chatlist"]',
+    'div[data-testid="conversation-header"]',
+    'div#app > div > div > div[role="application"]',
+    'div[data-testid="intro-md-beta-logo"]',
+    'div[aria-label*="Chat"]',
+    'div[data-testid="chat"]',
+    'nav[aria-label*="Chat"]',
+)
+
+# How long start_connection waits after navigating for the QR code (or the
+# chat list of an already linked session) to render
+PAGE_RENDER_TIMEOUT_MS = 25000
 
 
 class ConnectionManager:
@@ -63,7 +85,7 @@ class ConnectionManager:
         # Create browser context with persistent storage
         user_data_dir = str(session_path / "browser_data")
         context = None
-        qr_selector = 'div[data-ref] canvas, div[data-ref] img'
+        qr_selector = QR_SELECTOR
         
         try:
             context = await self.browser_manager.create_persistent_context(user_data_dir)
@@ -72,18 +94,22 @@ class ConnectionManager:
             # Navigate to WhatsApp Web
             target_url = 'https://web.whatsapp.com'
             logger.info("Session %s navigating to %s ...", session_id, target_url)
-            await page.goto(target_url, wait_until='networkidle')
+            # WhatsApp Web keeps long-polling, so networkidle can take tens
+            # of seconds; the render wait below covers the rest
+            await page.goto(target_url, wait_until='domcontentloaded')
             logger.info("Session %s page loaded, current url=%s", session_id, page.url)
             
-            # Wait for page to fully render
-            await asyncio.sleep(10)
-            
-            # Wait for canvas elements to appear
+            # Wait page-side until the QR code or the chat list renders,
+            # instead of sleeping for the worst case
             try:
-                await page.wait_for_selector('canvas', timeout=15000)
-                logger.info("Session %s canvas elements appeared on page", session_id)
+                state = await page.wait_for_function(
+                    PAGE_STATE_JS,
+                    arg=[CONNECTED_SELECTORS, QR_SELECTOR],
+                    timeout=PAGE_RENDER_TIMEOUT_MS
+                )
+                logger.info("Session %s page rendered (%s)", session_id, await state.json_value())
             except Exception:
-                logger.warning("Session %s no canvas elements found after wait", session_id)
+                logger.warning("Session %s no QR code or chat list rendered after wait", session_id)
             
             # Check page title and basic structure
             title = await page.title()
@@ -151,13 +177,13 @@ class ConnectionManager:
             expires_at = datetime.utcnow() + timedelta(seconds=settings.WHATSAPP_QR_REFRESH_SEC)
             
             # Store session info
-            self.session_manager.set_session(session_id, {
-                'context': context,
-                'page': page,
-                'status': 'waiting_qr',
-                'expires_at': expires_at.isoformat(),
-                'created_at': datetime.utcnow().isoformat()
-            })
+            self.session_manager.set_session(session_id, SessionState(
+                context=context,
+                page=page,
+                status='waiting_qr',
+                expires_at=expires_at.isoformat(),
+                created_at=utc_iso_now()
+            ))
             
             # Start monitoring connection status in background
             asyncio.create_task(self._monitor_connection(session_id))
@@ -329,7 +355,7 @@ class ConnectionManager:
             logger.warning("Session %s not found for monitoring", session_id)
             return
         
-        page = session['page']
+        page = session.page
         
         logger.info(
             "Session %s starting connection monitoring (timeout=%ds)",
@@ -338,79 +364,41 @@ class ConnectionManager:
         )
         
         try:
-            connected_selectors = [
-                'div[data-testid="chatlist"]',
-                'div[data-testid="conversation-header"]',
-                'div#app > div > div > div[role="application"]',
-                'div[data-testid="intro-md-beta-logo"]',
-                'div[aria-label*="Chat"]',
-                'div[data-testid="chat"]',
-                'nav[aria-label*="Chat"]',
-            ]
-            
             timeout_seconds = settings.WHATSAPP_CONNECT_TIMEOUT_SEC
-            start_time = datetime.utcnow()
+            loop = asyncio.get_running_loop()
+            start_time = loop.time()
             
-            while True:
-                elapsed = (datetime.utcnow() - start_time).total_seconds()
-                if elapsed >= timeout_seconds:
-                    expires_at = datetime.fromisoformat(session['expires_at'])
-                    if datetime.utcnow() > expires_at:
-                        session['status'] = 'expired'
-                        self.session_manager.set_session(session_id, session)  # Update session
-                        logger.warning(
-                            "Session %s QR expired during monitor",
-                            session_id,
-                            extra={
-                                "error_code": "WHATSAPP_QR_EXPIRED",
-                                "extra_data": {"elapsed_sec": elapsed, "timeout_sec": timeout_seconds},
-                            },
-                        )
-                    break
-                
-                # Check if QR disappeared
-                try:
-                    qr_selector = 'div[data-ref] canvas, div[data-ref] img'
-                    qr_element = await page.query_selector(qr_selector)
-                    if not qr_element:
-                        logger.info("Session %s QR code disappeared, checking for connection...", session_id)
-                except:
-                    pass
-                
-                # Check each selector for connection indicators
-                for selector in connected_selectors:
-                    try:
-                        element = await page.query_selector(selector)
-                        if element:
-                            box = await element.bounding_box()
-                            if box and box['width'] > 0 and box['height'] > 0:
-                                logger.info(
-                                    "Session %s connection successful! Found selector: %s",
-                                    session_id,
-                                    selector,
-                                )
-                                session['status'] = 'ready'
-                                session['connected_at'] = datetime.utcnow().isoformat()
-                                self.session_manager.set_session(session_id, session)  # Update session
-                                return
-                    except Exception as e:
-                        logger.debug("Session %s selector %s check failed: %s", session_id, selector, str(e))
-                        continue
-                
-                # Log progress every 10 seconds
-                if int(elapsed) % 10 == 0 and int(elapsed) > 0:
-                    logger.info(
-                        "Session %s still waiting for connection (elapsed: %ds, timeout: %ds)",
-                        session_id,
-                        int(elapsed),
-                        timeout_seconds,
-                    )
-                
-                await asyncio.sleep(2)
+            # Playwright waits for every indicator page-side at once; the
+            # first one to show up means the QR code was scanned
+            selector = await self._wait_for_connected(page, timeout_seconds * 1000)
+            if selector is not None:
+                logger.info(
+                    "Session %s connection successful! Found selector: %s",
+                    session_id,
+                    selector,
+                )
+                session.status = 'ready'
+                session.connected_at = utc_iso_now()
+                self.session_manager.set_session(session_id, session)  # Update session
+                return
+            
+            elapsed = loop.time() - start_time
+            expires_at = datetime.fromisoformat(session.expires_at)
+            if datetime.utcnow() > expires_at:
+                session.status = 'expired'
+                self.session_manager.set_session(session_id, session)  # Update session
+                logger.warning(
+                    "Session %s QR expired during monitor",
+                    session_id,
+                    extra={
+                        "error_code": "WHATSAPP_QR_EXPIRED",
+                        "extra_data": {"elapsed_sec": elapsed, "timeout_sec": timeout_seconds},
+                    },
+                )
             
         except Exception as e:
-            session['status'] = 'failed'
-            session['error'] = str(e)
+            session.status = 'failed'
+            session.error = str(e)
             self.session_manager.set_session(session_id, session)  # Update session
             logger.error(
                 "Session %s monitor failed",
@@ -422,6 +410,31 @@ class ConnectionManager:
                 exc_info=True,
             )
     
+    async def _wait_for_connected(self, page: Page, timeout_ms: float) -> Optional[str]:
+        """Wait for any connection indicator in parallel, returning the first to show up."""
+        tasks = {
+            asyncio.ensure_future(page.wait_for_selector(selector, timeout=timeout_ms)): selector
+            for selector in MONITOR_CONNECTED_SELECTORS
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        return tasks[task]
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+            # Retrieve every failure (timeouts, closed page) so none is
+            # reported as unhandled
+            for task in tasks:
+                if not task.cancelled():
+                    task.exception()
+    
     async def get_status(self, session_id: str) -> Dict:
         """
         Get current connection status
@@ -443,7 +456,7 @@ class ConnectionManager:
                 "status": "not_found"
             }
         
-        status = session['status']
+        status = session.status
         
         result = {
             "session_id": session_id,
@@ -452,13 +465,13 @@ class ConnectionManager:
         
         # If waiting for QR, check if it expired and refresh if needed
         if status == 'waiting_qr':
-            expires_at = datetime.fromisoformat(session['expires_at'])
+            expires_at = datetime.fromisoformat(session.expires_at)
             now = datetime.utcnow()
             
             if now > expires_at:
                 # QR expired, try to get new one
                 try:
-                    page = session['page']
+                    page = session.page
                     qr_selector = 'div[data-ref] canvas, div[data-ref] img'
                     qr_element = await page.query_selector(qr_selector)
                     
@@ -467,12 +480,12 @@ class ConnectionManager:
                         qr_base64 = base64.b64encode(qr_screenshot).decode('utf-8')
                         new_expires = now + timedelta(seconds=settings.WHATSAPP_QR_REFRESH_SEC)
                         
-                        session['expires_at'] = new_expires.isoformat()
+                        session.expires_at = new_expires.isoformat()
                         self.session_manager.set_session(session_id, session)  # Update session
                         result['qr_code'] = qr_base64
                         result['expires_at'] = new_expires.isoformat()
                     else:
-                        session['status'] = 'expired'
+                        session.status = 'expired'
                         self.session_manager.set_session(session_id, session)  # Update session
                         result['status'] = 'expired'
                         logger.warning(
@@ -484,7 +497,7 @@ class ConnectionManager:
                             },
                         )
                 except Exception:
-                    session['status'] = 'expired'
+                    session.status = 'expired'
                     self.session_manager.set_session(session_id, session)  # Update session
                     result['status'] = 'expired'
                     logger.warning(
@@ -499,26 +512,26 @@ class ConnectionManager:
             else:
                 # QR still valid, return it
                 try:
-                    page = session['page']
+                    page = session.page
                     qr_selector = 'div[data-ref] canvas, div[data-ref] img'
                     qr_element = await page.query_selector(qr_selector)
                     if qr_element:
                         qr_screenshot = await qr_element.screenshot(type='png')
                         qr_base64 = base64.b64encode(qr_screenshot).decode('utf-8')
                         result['qr_code'] = qr_base64
-                        result['expires_at'] = session['expires_at']
+                        result['expires_at'] = session.expires_at
                 except Exception:
                     pass
         
         if status == 'ready':
             result['connected'] = True
-            if 'connected_at' in session:
-                result['connected_at'] = session['connected_at']
+            if session.connected_at is not None:
+                result['connected_at'] = session.connected_at
         else:
             result['connected'] = False
         
-        if status == 'failed' and 'error' in session:
-            result['error'] = session['error']
+        if status == 'failed' and session.error is not None:
+            result['error'] = session.error
         
         return result
     
@@ -130,26 +130,58 @@ class IdentityResolver:
         - Invalid or missing IDs
         - Integrity conflicts
         """
+        anomalies, _ = self.analyze(chats)
+        return [a for a in anomalies if a['type'] != 'duplicate_ids']
+    
+    def analyze(self, chats: List[ChatDTO]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Detect anomalies and duplicate IDs in a single pass over chats.
+        
+        Combines detect_ambiguities() and validate_uniqueness() so that
+        the chats are grouped by ID only once. If duplicates are found,
+        a 'duplicate_ids' anomaly is included as the last entry.
+        
+        Args:
+            chats: List of chats to analyze
+            
+        Returns:
+            Tuple of (anomalies, duplicate_ids)
+        """
         anomalies = []
+        duplicate_ids: List[str] = []
+        chats_by_id: Dict[str, List[ChatDTO]] = {}
+        chats_by_name: Dict[str, List[ChatDTO]] = {}
+        validate_id = self.validate_id
         
-        # Check for missing or invalid IDs
         for chat in chats:
-            if not chat.id or not self.validate_id(chat.id):
+            chat_id = chat.id
+            
+            # Check for missing or invalid IDs
+            if not chat_id or not validate_id(chat_id):
                 anomalies.append({
                     'type': 'invalid_id',
                     'chat_name': chat.name,
-                    'chat_id': chat.id,
+                    'chat_id': chat_id,
                     'source': chat.source,
                     'integrity': chat.integrity
                 })
-        
-        # Group chats by ID
-        chats_by_id: Dict[str, List[ChatDTO]] = {}
-        for chat in chats:
-            if chat.id:
-                if chat.id not in chats_by_id:
-                    chats_by_id[chat.id] = []
-                chats_by_id[chat.id].append(chat)
+            
+            # Group chats by ID, recording repeats as duplicates
+            if chat_id:
+                same_id = chats_by_id.get(chat_id)
+                if same_id is None:
+                    chats_by_id[chat_id] = [chat]
+                else:
+                    same_id.append(chat)
+                    duplicate_ids.append(chat_id)
+            
+            # Group chats by name
+            if chat.name:
+                same_name = chats_by_name.get(chat.name)
+                if same_name is None:
+                    chats_by_name[chat.name] = [chat]
+                else:
+                    same_name.append(chat)
         
         # Check for duplicate IDs with different data
         for chat_id, chat_list in chats_by_id.items():
@@ -189,13 +221,6 @@ class IdentityResolver:
                     })
         
         # Check for chats with same name but different IDs (potential duplicates)
-        chats_by_name: Dict[str, List[ChatDTO]] = {}
-        for chat in chats:
-            if chat.name:
-                if chat.name not in chats_by_name:
-                    chats_by_name[chat.name] = []
-                chats_by_name[chat.name].append(chat)
-        
         for name, chat_list in chats_by_name.items():
             if len(chat_list) > 1:
                 ids = {chat.id for chat in chat_list if chat.id}
@@ -212,7 +237,14 @@ class IdentityResolver:
                             'count': len(chat_list)
                         })
         
-        return anomalies
+        if duplicate_ids:
+            anomalies.append({
+                'type': 'duplicate_ids',
+                'duplicate_ids': duplicate_ids,
+                'count': len(duplicate_ids)
+            })
+        
+        return anomalies, duplicate_ids
     
     def validate_uniqueness(self, chats: List[ChatDTO]) -> Tuple[bool, List[str]]:
         """
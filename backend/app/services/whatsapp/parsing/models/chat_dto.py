@@ -3,7 +3,7 @@ Normalized chat data transfer object.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, Literal, Optional
+from typing import Any, Dict, Literal, Mapping, Optional
 
 
 @dataclass
@@ -27,7 +27,7 @@ class ChatDTO:
     unread_count: int = 0
     
     # Metadata for diagnostics
-    raw_data: Dict[str, Any] = field(default_factory=dict)
+    raw_data: Mapping[str, Any] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary format (for API responses)."""
@@ -3,12 +3,12 @@ Parsing result with completeness information.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Mapping, Optional, Sequence
 
 from .chat_dto import ChatDTO
 
 
-@dataclass
+@dataclass(frozen=True)
 class ParsingResult:
     """
     Result of chat parsing with completeness and metadata.
@@ -20,6 +20,9 @@ class ParsingResult:
     - Missing IDs (if partial)
     - Source information
     - Anomalies detected
+    
+    Results are immutable: streamed intermediate results may be held by
+    consumers while parsing continues.
     """
     
     # Chat data
@@ -29,22 +32,22 @@ class ParsingResult:
     completeness: Literal["complete", "partial"] = "partial"
     collected: int = 0
     expected: Optional[int] = None
-    missing_ids: List[str] = field(default_factory=list)
+    missing_ids: Sequence[str] = field(default_factory=list)
     
     # Source information
     source_type: str = "unknown"  # 'store', 'network', 'dom'
     source_degraded: bool = False  # True if fallback was used
     
     # Anomalies detected during parsing
-    anomalies: List[Dict[str, Any]] = field(default_factory=list)
+    anomalies: Sequence[Dict[str, Any]] = field(default_factory=list)
     
     # Additional metadata
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Mapping[str, Any] = field(default_factory=dict)
     
     def __post_init__(self):
         """Calculate collected count from chats list."""
         if self.collected == 0 and self.chats:
-            self.collected = len(self.chats)
+            object.__setattr__(self, 'collected', len(self.chats))
     
     def is_complete(self) -> bool:
         """Check if parsing is complete."""
@@ -69,11 +72,11 @@ class ParsingResult:
             'completeness': self.completeness,
             'collected': self.collected,
             'expected': self.expected,
-            'missing_ids': self.missing_ids,
+            'missing_ids': list(self.missing_ids),
             'source_type': self.source_type,
             'source_degraded': self.source_degraded,
-            'anomalies': self.anomalies,
-            'metadata': self.metadata,
+            'anomalies': list(self.anomalies),
+            'metadata': dict(self.metadata),
             'completeness_percentage': self.get_completeness_percentage(),
         }
 
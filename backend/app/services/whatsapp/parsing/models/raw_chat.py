@@ -2,10 +2,30 @@
 Raw chat data structure from various sources.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Any, Dict, List, Optional
 
 
+def _add_slots(cls):
+    """
+    Recreate a dataclass with __slots__ for its fields.
+    
+    Backport of dataclass(slots=True) (Python 3.10+) for the 3.8 runtime:
+    slotted instances carry no per-instance __dict__.
+    """
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict['__slots__'] = field_names
+    for name in field_names:
+        # Class-level defaults would clash with the slot descriptors;
+        # the generated __init__ keeps its own copy of them
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+@_add_slots
 @dataclass
 class RawChat:
     """
@@ -13,6 +33,9 @@ class RawChat:
     
     This is the unnormalized representation that will be converted to ChatDTO
     by the normalizer. The structure may vary depending on the source.
+    
+    Instances are slotted (one is created per chat per fetch), so attributes
+    outside the declared fields can't be set.
     """
     
     # Common fields that should be present in all sources
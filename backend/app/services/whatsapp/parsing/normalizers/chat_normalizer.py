@@ -2,7 +2,10 @@
 Chat normalizer - converts RawChat to ChatDTO.
 """
 
-from typing import List, Optional, TYPE_CHECKING
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional, Tuple, TYPE_CHECKING
 import logging
 
 from ..models.raw_chat import RawChat
@@ -13,6 +16,37 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Shared read-only placeholder for chats without diagnostic data
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+# JID server suffix -> chat type
+_SUFFIX_TO_TYPE = {
+    "g.us": "group",
+    "c.us": "personal",
+    "broadcast": "broadcast",
+}
+
+# Source -> (integrity with ID, integrity without ID).
+# DOM source is always fallback (by requirement).
+_INTEGRITY_BY_SOURCE = {
+    "store": ("verified", "fallback"),
+    "network": ("verified", "fallback"),
+    "dom": ("fallback", "fallback"),
+}
+
+# Max number of normalized chats remembered across parse runs
+NORMALIZE_CACHE_SIZE = 8192
+
+
+def _strip_or_none(value: Optional[str]) -> Optional[str]:
+    """Strip surrounding whitespace, mapping empty results to None."""
+    if not value:
+        return None
+    # Already clean strings (the common case) are returned without copying
+    if not (value[0].isspace() or value[-1].isspace()):
+        return value
+    return value.strip() or None
+
 
 class ChatNormalizer:
     """
@@ -22,8 +56,22 @@ class ChatNormalizer:
     - Type determination (personal/group/broadcast)
     - Integrity status assignment
     - Field mapping from various sources
+    
+    Normalized chats are memoized (LRU) on the raw fields that affect the
+    result, since WhatsApp Web re-delivers mostly identical chat lists within
+    and across parse runs. A DTO depends only on its key, so entries never go
+    stale and are kept between parses. DTOs are shared between results and
+    must not be mutated.
+    
+    The cache is guarded by a lock: large batches are normalized in worker
+    threads and one normalizer serves all sessions.
     """
     
+    def __init__(self, cache_size: int = NORMALIZE_CACHE_SIZE):
+        self._cache: "OrderedDict[Tuple, ChatDTO]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+    
     def normalize(self, raw_chat: RawChat, chat_id: Optional[str] = None) -> ChatDTO:
         """
         Normalize a single RawChat to ChatDTO.
@@ -39,6 +87,37 @@ class ChatNormalizer:
             If chat_id is not provided, it should be set later by IdentityResolver.
             For now, we'll use a placeholder if ID extraction is needed.
         """
+        # raw_data is diagnostic only and deliberately not part of the key
+        key = (
+            chat_id,
+            raw_chat.source,
+            raw_chat.jid,
+            raw_chat.wid,
+            raw_chat.server_id,
+            raw_chat.user_id,
+            raw_chat.name,
+            raw_chat.avatar_url,
+            raw_chat.is_group,
+            raw_chat.unread_count,
+        )
+        cache = self._cache
+        with self._cache_lock:
+            dto = cache.get(key)
+            if dto is not None:
+                cache.move_to_end(key)
+                return dto
+        
+        # Built outside the lock; a concurrent build of the same key just
+        # stores an equal DTO
+        dto = self._build_dto(raw_chat, chat_id)
+        with self._cache_lock:
+            cache[key] = dto
+            if len(cache) > self._cache_size:
+                cache.popitem(last=False)
+        return dto
+    
+    def _build_dto(self, raw_chat: RawChat, chat_id: Optional[str]) -> ChatDTO:
+        """Build a new ChatDTO from raw chat data (uncached)."""
         # Determine chat type
         chat_type = self._determine_type(raw_chat)
         
@@ -48,19 +127,9 @@ class ChatNormalizer:
         # Use provided ID or placeholder (will be set by IdentityResolver)
         final_id = chat_id or ""  # Empty string as placeholder
         
-        # Normalize name (clean up whitespace, handle None)
-        normalized_name = None
-        if raw_chat.name:
-            normalized_name = raw_chat.name.strip()
-            if not normalized_name:
-                normalized_name = None
-        
-        # Normalize avatar URL
-        normalized_avatar = None
-        if raw_chat.avatar_url:
-            normalized_avatar = raw_chat.avatar_url.strip()
-            if not normalized_avatar:
-                normalized_avatar = None
+        # Normalize name and avatar URL (clean up whitespace, handle None)
+        normalized_name = _strip_or_none(raw_chat.name)
+        normalized_avatar = _strip_or_none(raw_chat.avatar_url)
         
         # Create DTO
         dto = ChatDTO(
@@ -71,7 +140,7 @@ class ChatNormalizer:
             name=normalized_name,
             avatar=normalized_avatar,
             unread_count=raw_chat.unread_count or 0,
-            raw_data=raw_chat.raw_data.copy() if raw_chat.raw_data else {}
+            raw_data=raw_chat.raw_data if raw_chat.raw_data else _EMPTY
         )
         
         return dto
@@ -120,12 +189,22 @@ class ChatNormalizer:
             List of normalized ChatDTOs (chats without IDs are skipped if resolver provided)
         """
         if identity_resolver:
-            # Use resolver to extract IDs and skip chats without IDs
+            # Use resolver to extract IDs and skip chats without IDs.
+            # Same logic as normalize_with_id, kept in one loop to avoid
+            # an extra method call per chat.
+            extract_id = identity_resolver.extract_id
+            normalize = self.normalize
             normalized = []
             for raw_chat in raw_chats:
-                dto = self.normalize_with_id(raw_chat, identity_resolver)
-                if dto:
-                    normalized.append(dto)
+                chat_id = extract_id(raw_chat)
+                if not chat_id:
+                    logger.warning(
+                        "Cannot normalize chat without ID: name=%s, source=%s",
+                        raw_chat.name,
+                        raw_chat.source
+                    )
+                    continue
+                normalized.append(normalize(raw_chat, chat_id))
             return normalized
         else:
             # Normalize without ID extraction (IDs will be set later)
@@ -147,25 +226,12 @@ class ChatNormalizer:
         elif raw_chat.is_group is False:
             return "personal"
         
-        # Check JID format
-        jid = raw_chat.jid or ""
-        if jid:
-            if jid.endswith("@g.us"):
-                return "group"
-            elif jid.endswith("@c.us"):
-                return "personal"
-            elif jid.endswith("@broadcast"):
-                return "broadcast"
-        
-        # Check wid format
-        wid = raw_chat.wid or ""
-        if wid:
-            if "@g.us" in wid:
-                return "group"
-            elif "@c.us" in wid:
-                return "personal"
-            elif "@broadcast" in wid:
-                return "broadcast"
+        # Check JID, then wid, by the server part after '@'
+        for candidate in (raw_chat.jid, raw_chat.wid):
+            if candidate:
+                chat_type = _SUFFIX_TO_TYPE.get(candidate.rpartition("@")[2])
+                if chat_type:
+                    return chat_type
         
         # Default to personal
         return "personal"
@@ -178,34 +244,21 @@ class ChatNormalizer:
         - fallback: Missing reliable ID or using DOM source
         - ambiguous: Conflicting or unclear data (e.g., different sources give different data)
         """
-        # Check if we have a reliable ID
-        has_reliable_id = bool(raw_chat.jid or raw_chat.wid)
-        has_network_id = bool(raw_chat.server_id or raw_chat.user_id)
-        
-        # Source-based integrity determination
-        if raw_chat.source == "store":
-            if has_reliable_id:
-                # Store with reliable ID = verified
-                return "verified"
-            else:
-                # Store without ID = fallback (shouldn't happen normally)
-                logger.warning("Store source chat without reliable ID: %s", raw_chat.name)
-                return "fallback"
-        
-        elif raw_chat.source == "network":
-            if has_reliable_id or has_network_id:
-                # Network with ID = verified
-                return "verified"
-            else:
-                # Network without ID = fallback
-                return "fallback"
-        
-        elif raw_chat.source == "dom":
-            # DOM source always fallback (by requirement)
-            return "fallback"
+        # Fast path: the overwhelmingly common case
+        if raw_chat.jid and raw_chat.source == "store":
+            return "verified"
         
-        else:
+        outcomes = _INTEGRITY_BY_SOURCE.get(raw_chat.source)
+        if outcomes is None:
             # Unknown source = ambiguous
             logger.warning("Unknown source for chat: %s", raw_chat.source)
             return "ambiguous"
-
+        
+        # Store and Network sources only ever populate their own ID fields,
+        # so any ID present counts as reliable for that source
+        has_id = bool(raw_chat.jid or raw_chat.wid or raw_chat.server_id or raw_chat.user_id)
+        if not has_id and raw_chat.source == "store":
+            # Store without ID = fallback (shouldn't happen normally)
+            logger.warning("Store source chat without reliable ID: %s", raw_chat.name)
+        
+        return outcomes[0] if has_id else outcomes[1]
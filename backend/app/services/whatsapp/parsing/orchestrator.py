@@ -3,9 +3,10 @@ Chat parsing orchestrator - main entry point.
 Coordinates all components: sources, normalizers, identity resolver, completion, and publisher.
 """
 
-from typing import AsyncGenerator, List, Optional
+from typing import AsyncGenerator, List, Optional, Tuple
+import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 from playwright.async_api import Page
 
@@ -23,6 +24,21 @@ from .publishers.result_publisher import ResultPublisher
 
 logger = logging.getLogger(__name__)
 
+_UTC = timezone.utc
+
+# Batch fetching limits: hard safety cap on iterations, and how many
+# consecutive empty polls (with exponential backoff) count as a stall
+MAX_FETCH_ITERATIONS = 100
+MAX_EMPTY_POLLS = 8
+EMPTY_POLL_INITIAL_BACKOFF = 0.01  # seconds
+EMPTY_POLL_MAX_BACKOFF = 0.5  # seconds
+
+# Batches larger than this are normalized off the event loop
+NORMALIZE_IN_THREAD_THRESHOLD = 500
+
+# How many normalized batches may be fetched ahead of the stream consumer
+STREAM_QUEUE_SIZE = 2
+
 
 class ChatParsingOrchestrator:
     """
@@ -70,6 +86,7 @@ class ChatParsingOrchestrator:
         source: Optional[IChatSource] = None
         source_degraded = False
         source_metadata = {}
+        producer: Optional[asyncio.Task] = None
         
         try:
             # Step 1: Select source
@@ -84,84 +101,44 @@ class ChatParsingOrchestrator:
             )
             
             # Step 2: Initialize source (if not already done)
-            if not hasattr(source, '_initialized') or not source._initialized:
+            if not source._initialized:
                 await source.init()
             
             # Get expected total for progress tracking
             expected_total = await source.total_expected()
             
-            # Step 3: Collect all chats
-            all_raw_chats: List[RawChat] = []
-            all_normalized_chats: List[ChatDTO] = []
+            # Step 3: Collect all chats. Fetching and normalization run in a
+            # background producer so the next batch is fetched while the
+            # caller consumes the current one (bounded queue = backpressure)
+            queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+            producer = asyncio.create_task(
+                self._produce_batches(page, source, source_degraded, expected_total, queue)
+            )
             
-            # Fetch batches and normalize
-            batch_count = 0
-            async for raw_batch in self._fetch_batches(source):
-                batch_count += 1
-                all_raw_chats.extend(raw_batch)
-                
-                # Normalize batch
-                normalized_batch = self.normalizer.normalize_batch(
-                    raw_batch,
-                    identity_resolver=self.identity_resolver
-                )
-                all_normalized_chats.extend(normalized_batch)
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                normalized_batch, batch_source_type, batch_degraded, batch_expected = item
                 
                 # Stream intermediate result
-                intermediate_result = await self.publisher.publish_stream(
-                    self._chats_to_generator(normalized_batch),
-                    source_type=source_type,
-                    source_degraded=source_degraded,
-                    expected_total=expected_total
+                yield self.publisher.build_stream_result(
+                    normalized_batch,
+                    source_type=batch_source_type,
+                    source_degraded=batch_degraded,
+                    expected_total=batch_expected
                 )
-                
-                async for result in intermediate_result:
-                    yield result
             
-            logger.info(
-                "Collected %d raw chats, normalized to %d chats (batches: %d)",
-                len(all_raw_chats),
-                len(all_normalized_chats),
-                batch_count
-            )
-            
-            # Fallback logic: If we got 0 chats from CDP Network, try DOM source
-            if len(all_normalized_chats) == 0 and source_type == "network":
-                logger.warning(
-                    "CDP Network source returned 0 chats, falling back to DOM source"
-                )
-                try:
-                    from .sources.dom_chat_source import DOMChatSource
-                    dom_source = DOMChatSource(page)
-                    await dom_source.init()
-                    
-                    # Fetch from DOM
-                    dom_raw_chats: List[RawChat] = []
-                    async for raw_batch in self._fetch_batches(dom_source):
-                        dom_raw_chats.extend(raw_batch)
-                    
-                    if dom_raw_chats:
-                        # Normalize DOM chats
-                        dom_normalized = self.normalizer.normalize_batch(
-                            dom_raw_chats,
-                            identity_resolver=self.identity_resolver
-                        )
-                        all_normalized_chats.extend(dom_normalized)
-                        all_raw_chats.extend(dom_raw_chats)
-                        
-                        source_type = "dom"
-                        source_degraded = True
-                        expected_total = await dom_source.total_expected()
-                        
-                        logger.info(
-                            "DOM fallback successful: collected %d chats",
-                            len(dom_normalized)
-                        )
-                except Exception as e:
-                    logger.warning(
-                        "DOM fallback failed: %s",
-                        str(e)
-                    )
+            # Producer errors surface here
+            (
+                source,
+                source_degraded,
+                expected_total,
+                all_normalized_chats,
+                raw_chats_count,
+                batch_count,
+            ) = await producer
+            source_type = source.source_name
             
             # Step 4: Check completion
             is_complete, final_expected, missing_ids = await self.completion_controller.check_completion(
@@ -181,16 +158,9 @@ class ChatParsingOrchestrator:
             )
             
             # Step 6: Detect anomalies
-            anomalies = self.identity_resolver.detect_ambiguities(all_normalized_chats)
-            
-            # Validate uniqueness
-            is_unique, duplicate_ids = self.identity_resolver.validate_uniqueness(all_normalized_chats)
-            if not is_unique:
-                anomalies.append({
-                    'type': 'duplicate_ids',
-                    'duplicate_ids': duplicate_ids,
-                    'count': len(duplicate_ids)
-                })
+            # (ambiguities and ID uniqueness are checked in a single pass)
+            anomalies, duplicate_ids = self.identity_resolver.analyze(all_normalized_chats)
+            if duplicate_ids:
                 logger.warning(
                     "Found %d duplicate chat IDs: %s",
                     len(duplicate_ids),
@@ -201,11 +171,11 @@ class ChatParsingOrchestrator:
             metadata = {
                 'source_metadata': source_metadata,
                 'batch_count': batch_count,
-                'raw_chats_count': len(all_raw_chats),
+                'raw_chats_count': raw_chats_count,
                 'normalized_chats_count': len(all_normalized_chats),
                 'anomalies_count': len(anomalies),
-                'duplicate_ids_count': len(duplicate_ids) if not is_unique else 0,
-                'parsing_timestamp': datetime.utcnow().isoformat(),
+                'duplicate_ids_count': len(duplicate_ids),
+                'parsing_timestamp': datetime.now(_UTC).isoformat(),
             }
             
             # Step 8: Publish final result
@@ -222,13 +192,6 @@ class ChatParsingOrchestrator:
             
             yield final_result
             
-            # Cleanup if source has cleanup method
-            if hasattr(source, 'cleanup'):
-                try:
-                    await source.cleanup()
-                except Exception as e:
-                    logger.warning("Error cleaning up source: %s", str(e))
-            
         except Exception as e:
             logger.error(
                 "Error in chat parsing orchestrator: %s",
@@ -254,6 +217,18 @@ class ChatParsingOrchestrator:
                 }
             )
             yield error_result
+        
+        finally:
+            # Stop fetching if the caller abandoned the stream early
+            if producer is not None and not producer.done():
+                producer.cancel()
+                await asyncio.wait([producer])
+                if not producer.cancelled():
+                    producer.exception()
+            # Released on every exit: a DOM source's prefetched scroll would
+            # otherwise keep running on the page into the next parse
+            if source is not None:
+                await self._cleanup_source(source)
     
     async def parse_chats(
         self,
@@ -297,47 +272,188 @@ class ChatParsingOrchestrator:
         # For sources like Store, fetch_batch returns all chats at once
         # For sources like DOM, we may need to fetch multiple batches
         
-        max_iterations = 100  # Safety limit
+        # Source name is constant for the whole loop - resolve it once
+        source_name = source.source_name
+        # CDP Network returns everything collected so far on every call, so
+        # an empty batch means nothing is coming. DOM scrolls and chunked
+        # Store reads can come back empty midway (rows still rendering, an
+        # unreadable chunk); only is_complete() or a stall ends those.
+        stops_when_empty = source_name == 'network'
+        fetch_batch = source.fetch_batch
+        is_complete = source.is_complete
+        
         iteration = 0
+        consecutive_empty = 0
+        backoff = 0.0
         
-        while iteration < max_iterations:
-            batch = await source.fetch_batch()
+        while iteration < MAX_FETCH_ITERATIONS:
+            batch = await fetch_batch()
             
-            # For DOM source, empty batch doesn't mean we're done - we need to keep scrolling
-            # Only break if source explicitly says it's complete
             if batch:
+                consecutive_empty = 0
+                backoff = 0.0
                 yield batch
             
             # Check if source is complete (even if batch was empty)
-            if await source.is_complete():
+            if await is_complete():
                 logger.debug(
                     "Source %s marked as complete after %d iterations",
-                    source.source_name,
+                    source_name,
                     iteration + 1
                 )
                 break
             
-            # For DOM source, continue even if batch is empty (might need more scrolling)
-            if not batch and source.source_name != 'dom':
-                # For non-DOM sources, empty batch means done
-                logger.debug(
-                    "Source %s returned empty batch, stopping",
-                    source.source_name
-                )
-                break
+            if not batch:
+                if stops_when_empty:
+                    logger.debug(
+                        "Source %s returned empty batch, stopping",
+                        source_name
+                    )
+                    break
+                
+                # Keep polling with growing backoff, and stop once no progress
+                # is made for a while
+                consecutive_empty += 1
+                if consecutive_empty >= MAX_EMPTY_POLLS:
+                    logger.debug(
+                        "Source %s made no progress for %d polls, stopping",
+                        source_name,
+                        consecutive_empty
+                    )
+                    break
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2 or EMPTY_POLL_INITIAL_BACKOFF, EMPTY_POLL_MAX_BACKOFF)
             
             iteration += 1
         
-        if iteration >= max_iterations:
+        if iteration >= MAX_FETCH_ITERATIONS:
             logger.warning(
                 "Reached max iterations (%d) for fetching batches from source %s",
-                max_iterations,
-                source.source_name
+                MAX_FETCH_ITERATIONS,
+                source_name
             )
     
-    async def _chats_to_generator(
+    async def _cleanup_source(self, source: IChatSource) -> None:
+        """Release source resources, logging (not raising) on failure."""
+        try:
+            await source.cleanup()
+        except Exception as e:
+            logger.warning("Error cleaning up source: %s", str(e))
+    
+    async def _normalize_batch(self, raw_batch: List[RawChat]) -> List[ChatDTO]:
+        """
+        Normalize a batch of raw chats with ID resolution.
+        
+        Large batches are normalized in a worker thread so the event loop
+        stays responsive. The resolver holds no mutable state and the
+        normalizer's cache is lock-protected, so this is safe alongside other
+        sessions' parses.
+        """
+        if len(raw_batch) > NORMALIZE_IN_THREAD_THRESHOLD:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None,
+                self.normalizer.normalize_batch,
+                raw_batch,
+                self.identity_resolver
+            )
+        return self.normalizer.normalize_batch(
+            raw_batch,
+            identity_resolver=self.identity_resolver
+        )
+    
+    async def _produce_batches(
         self,
-        chats: List[ChatDTO]
-    ) -> AsyncGenerator[List[ChatDTO], None]:
-        """Convert list of chats to async generator."""
-        yield chats
+        page: Page,
+        source: IChatSource,
+        source_degraded: bool,
+        expected_total: Optional[int],
+        queue: asyncio.Queue
+    ) -> Tuple[IChatSource, bool, Optional[int], List[ChatDTO], int, int]:
+        """
+        Fetch and normalize all batches, putting them on the queue.
+        
+        Each queue item is (normalized_batch, source_type, source_degraded,
+        expected_total). A None sentinel is put when collection ends, also
+        on error (the error itself is raised from the task).
+        
+        Returns:
+            Tuple of (final_source, source_degraded, expected_total,
+            normalized_chats, raw_chats_count, batch_count)
+        """
+        initial_source = source
+        source_type = source.source_name
+        all_normalized_chats: List[ChatDTO] = []
+        write_idx = 0
+        raw_chats_count = 0
+        batch_count = 0
+        
+        try:
+            while True:
+                # Pre-size when the total is known to avoid repeated list growth;
+                # unused slots are trimmed after collection
+                if expected_total:
+                    all_normalized_chats.extend([None] * expected_total)
+                
+                # Fetch batches and normalize
+                async for raw_batch in self._fetch_batches(source):
+                    batch_count += 1
+                    raw_chats_count += len(raw_batch)
+                    
+                    # Normalize batch
+                    normalized_batch = await self._normalize_batch(raw_batch)
+                    next_idx = write_idx + len(normalized_batch)
+                    all_normalized_chats[write_idx:next_idx] = normalized_batch
+                    write_idx = next_idx
+                    
+                    await queue.put((normalized_batch, source_type, source_degraded, expected_total))
+                
+                del all_normalized_chats[write_idx:]
+                
+                logger.info(
+                    "Collected %d raw chats, normalized to %d chats (batches: %d)",
+                    raw_chats_count,
+                    len(all_normalized_chats),
+                    batch_count
+                )
+                
+                # Fallback logic: If we got 0 chats from CDP Network, try DOM source
+                if all_normalized_chats or source_type != "network":
+                    break
+                
+                logger.warning(
+                    "CDP Network source returned 0 chats, falling back to DOM source"
+                )
+                try:
+                    fallback_source = await self.source_selector.on_empty_fallback(page)
+                except Exception as e:
+                    logger.warning(
+                        "DOM fallback failed: %s",
+                        str(e)
+                    )
+                    break
+                
+                await self._cleanup_source(source)
+                source = fallback_source
+                source_type = source.source_name
+                source_degraded = True
+                expected_total = await source.total_expected()
+        
+        except BaseException as e:
+            # The caller only knows the initial source; release a fallback
+            # switched to here, also when cancelled
+            if source is not initial_source:
+                await self._cleanup_source(source)
+            if isinstance(e, Exception):
+                await queue.put(None)
+            raise
+        
+        await queue.put(None)
+        return (
+            source,
+            source_degraded,
+            expected_total,
+            all_normalized_chats,
+            raw_chats_count,
+            batch_count,
+        )
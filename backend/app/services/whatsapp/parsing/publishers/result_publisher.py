@@ -2,7 +2,8 @@
 Result publisher - publishes parsing results.
 """
 
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, AsyncGenerator, Dict, List, Mapping, Optional, Sequence
 import logging
 
 from ..models.chat_dto import ChatDTO
@@ -10,6 +11,10 @@ from ..models.parsing_result import ParsingResult
 
 logger = logging.getLogger(__name__)
 
+# Shared read-only placeholders for empty result fields
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+_EMPTY_TUPLE: tuple = ()
+
 
 class ResultPublisher:
     """
@@ -40,42 +45,68 @@ class ResultPublisher:
         async for batch in chats:
             all_chats.extend(batch)
             
-            # Determine completeness for this batch
-            # If we have expected_total and reached it, mark as complete
-            completeness = "partial"
-            if expected_total is not None and len(all_chats) >= expected_total:
-                completeness = "complete"
-            
-            # Publish intermediate result
-            result = ParsingResult(
-                chats=all_chats.copy(),  # Copy to avoid mutation
-                completeness=completeness,
-                collected=len(all_chats),
-                expected=expected_total,
+            # Publish intermediate result (copy to avoid mutation)
+            yield self.build_stream_result(
+                all_chats.copy(),
                 source_type=source_type,
                 source_degraded=source_degraded,
-                anomalies=[],  # Anomalies will be detected at the end
-                metadata={
-                    'streaming': True,
-                    'batch_count': len(batch)
-                }
+                expected_total=expected_total,
+                batch_size=len(batch)
             )
-            
-            yield result
         
         # Final result will be published separately by orchestrator
         # after completion check and anomaly detection
     
+    def build_stream_result(
+        self,
+        chats: List[ChatDTO],
+        source_type: str,
+        source_degraded: bool,
+        expected_total: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> ParsingResult:
+        """
+        Build a single intermediate (streaming) result.
+        
+        Args:
+            chats: Chats collected for this result
+            source_type: Type of source used
+            source_degraded: Whether fallback source was used
+            expected_total: Optional expected total count (for progress tracking)
+            batch_size: Size of the latest batch (defaults to len(chats))
+            
+        Returns:
+            ParsingResult with streaming metadata
+        """
+        # If we have expected_total and reached it, mark as complete
+        completeness = "partial"
+        if expected_total is not None and len(chats) >= expected_total:
+            completeness = "complete"
+        
+        return ParsingResult(
+            chats=chats,
+            completeness=completeness,
+            collected=len(chats),
+            expected=expected_total,
+            source_type=source_type,
+            source_degraded=source_degraded,
+            anomalies=_EMPTY_TUPLE,  # Anomalies will be detected at the end
+            metadata={
+                'streaming': True,
+                'batch_count': len(chats) if batch_size is None else batch_size
+            }
+        )
+    
     async def publish_final(
         self,
         chats: List[ChatDTO],
         completeness: str,
         expected: Optional[int],
-        missing_ids: List[str],
+        missing_ids: Sequence[str],
         source_type: str,
         source_degraded: bool,
-        anomalies: List[Dict[str, Any]],
-        metadata: Dict[str, Any]
+        anomalies: Sequence[Dict[str, Any]],
+        metadata: Mapping[str, Any]
     ) -> ParsingResult:
         """
         Publish final parsing result.
@@ -98,11 +129,11 @@ class ResultPublisher:
             completeness=completeness,
             collected=len(chats),
             expected=expected,
-            missing_ids=missing_ids,
+            missing_ids=missing_ids or _EMPTY_TUPLE,
             source_type=source_type,
             source_degraded=source_degraded,
-            anomalies=anomalies,
-            metadata=metadata
+            anomalies=anomalies or _EMPTY_TUPLE,
+            metadata=metadata or _EMPTY
         )
         
         logger.info(
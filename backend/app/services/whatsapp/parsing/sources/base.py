@@ -16,6 +16,9 @@ class IChatSource(ABC):
     This allows the orchestrator to work with any source transparently.
     """
     
+    # Set to True by init() once the source is ready
+    _initialized: bool = False
+    
     @abstractmethod
     async def init(self) -> None:
         """
@@ -95,6 +98,15 @@ class IChatSource(ABC):
         needs to check availability dynamically.
         """
         return True
+    
+    async def cleanup(self) -> None:
+        """
+        Release resources held by the source.
+        
+        Default implementation does nothing. Override if source
+        holds sessions or listeners that must be detached.
+        """
+        pass
 
 
 class SourceUnavailableError(Exception):
@@ -2,17 +2,120 @@
 CDP Network chat source - extracts chats from network payloads via CDP.
 """
 
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 import logging
 import json
 import asyncio
+import base64
+import hashlib
+import re
 
 from playwright.async_api import Page, CDPSession
 
 from .base import IChatSource, SourceUnavailableError
 from ..models.raw_chat import RawChat
 
+try:
+    # orjson is several times faster on large chat payloads; its
+    # JSONDecodeError subclasses json.JSONDecodeError
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - optional speedup
+    _json_loads = json.loads
+
+try:
+    # Incremental parser for large payloads (yajl2 C backend when available)
+    import ijson as _ijson
+    _JSON_ERRORS: Tuple[type, ...] = (json.JSONDecodeError, _ijson.JSONError)
+except ImportError:  # pragma: no cover - optional
+    _ijson = None
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
 logger = logging.getLogger(__name__)
+# Debug calls in the response path run per network event; guard them so
+# url[:100] / str(e) aren't built when debug logging is off
+_debug_enabled = logger.isEnabledFor
+
+# HTTPS responses served from WhatsApp Web (any path may carry chat data)
+_WHATSAPP_URL_RE = re.compile(r'https://.*?web\.whatsapp\.com')
+
+# Response MIME types worth fetching the body for. Protobuf bodies are left
+# out: there is no schema to decode them with, so fetching them is wasted
+_BODY_MIME_PREFIXES = ('application/json', 'text/')
+
+# Max Network.getResponseBody calls in flight on the CDP WebSocket
+MAX_CONCURRENT_BODY_FETCHES = 16
+
+# How long fetch_batch waits for the first chats to arrive (seconds)
+FIRST_CHATS_TIMEOUT = 5.0
+
+# Bodies larger than this are parsed incrementally with ijson (bytes)
+STREAM_PARSE_THRESHOLD = 64 * 1024
+
+# Max number of response bodies remembered for duplicate detection
+BODY_CACHE_SIZE = 64
+
+# Alternative payload keys for the chat ID, in priority order
+_ID_KEYS = ('id', 'jid', 'wid')
+
+
+def _extract_chat_rows(chats: Iterable[Any], url: str) -> List[Tuple[str, Tuple]]:
+    """
+    Extract (chat_id, row) pairs from a list of chat dicts.
+    
+    Row layout matches CDPNetworkChatSource._store_row. Kept as a plain
+    function with everything in locals: this loop runs for every chat of
+    every intercepted payload.
+    """
+    rows = []
+    append = rows.append
+    for chat_data in chats:
+        if type(chat_data) is not dict:
+            continue
+        get = chat_data.get
+        
+        # Extract chat ID - try multiple fields
+        chat_id = None
+        id_val = get('id')
+        id_dict = id_val if type(id_val) is dict else None
+        if id_dict is not None:
+            chat_id = id_dict.get('_serialized') or id_dict.get('user') or str(id_dict)
+        else:
+            for key in _ID_KEYS:
+                if key in chat_data:
+                    chat_id = str(chat_data[key])
+                    break
+        
+        if not chat_id:
+            continue
+        
+        # Extract other fields
+        name = get('name')
+        if not name:
+            contact = get('contact')
+            name = contact.get('name') if contact else None
+        
+        # Fall back to the alternative key only when the primary one is
+        # missing: an explicit isGroup=False / unreadCount=0 is an answer
+        is_group = get('isGroup')
+        if is_group is None:
+            is_group = get('isGroupChat') or False
+        unread_count = get('unreadCount')
+        if unread_count is None:
+            unread_count = get('unread') or 0
+        
+        append((chat_id, (
+            get('wid'),
+            id_dict.get('server_id') if id_dict is not None else None,
+            id_dict.get('user') if id_dict is not None else None,
+            name,
+            is_group,
+            unread_count,
+            get('avatar') or get('profilePicUrl') or None,
+            url,
+        )))
+    return rows
 
 
 class CDPNetworkChatSource(IChatSource):
@@ -21,11 +124,14 @@ class CDPNetworkChatSource(IChatSource):
     
     This source:
     - Intercepts WhatsApp Web API calls
-    - Parses protobuf/JSON payloads
+    - Parses JSON payloads
     - Provides reliable IDs from network data
     
     Note: WhatsApp Web uses protobuf for most API calls, but some endpoints
-    may return JSON. We'll try to parse both formats.
+    may return JSON. Only JSON (and text) responses are parsed.
+    
+    Construction has no side effects: the CDP session and its listeners are
+    attached in init() and released in cleanup().
     """
     
     def __init__(self, page: Page):
@@ -33,9 +139,30 @@ class CDPNetworkChatSource(IChatSource):
         self.cdp_session: Optional[CDPSession] = None
         self._initialized = False
         self._collected_payloads: List[Dict[str, Any]] = []
-        self._collected_chats: Dict[str, RawChat] = {}  # Keyed by chat ID
+        # Collected chats are stored column-wise (one list per field) with a
+        # chat ID -> row index for deduplication; RawChat objects are only
+        # built in fetch_batch. Large accounts re-deliver thousands of chats.
+        self._row_index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._wids: List[Optional[str]] = []
+        self._server_ids: List[Optional[str]] = []
+        self._user_ids: List[Optional[str]] = []
+        self._names: List[Optional[str]] = []
+        self._is_group: List[bool] = []
+        self._unread: List[int] = []
+        self._avatars: List[Optional[str]] = []
+        self._urls: List[str] = []
+        # (url, sha256 of body) -> rows parsed from it; WhatsApp Web refetches
+        # identical chat lists on reconnect and tab focus
+        self._body_cache: "OrderedDict[Tuple[str, bytes], List[Tuple[str, Tuple]]]" = OrderedDict()
+        # Materialized RawChat list, rebuilt only after a row actually changes
+        self._chats_cache: Optional[List[RawChat]] = None
         self._total_count: Optional[int] = None
         self._response_listener_task: Optional[asyncio.Task] = None
+        # Created in _setup_response_listener so they bind to the running loop
+        self._pending: Optional["asyncio.Queue[Tuple[str, str]]"] = None
+        self._sema: Optional[asyncio.Semaphore] = None
+        self._have_chats: Optional[asyncio.Event] = None  # Set on first stored chat
         self._collection_timeout = 30.0  # Wait up to 30 seconds for responses
     
     @property
@@ -92,57 +219,118 @@ class CDPNetworkChatSource(IChatSource):
             raise SourceUnavailableError(f"Failed to initialize CDP Network: {str(e)}")
     
     def _setup_response_listener(self):
-        """Set up listener for network responses."""
-        async def handle_response(event: Dict[str, Any]):
-            """Handle network response events."""
+        """Set up listener for network responses and start the body fetch worker."""
+        self._pending = asyncio.Queue()
+        self._sema = asyncio.Semaphore(MAX_CONCURRENT_BODY_FETCHES)
+        self._have_chats = asyncio.Event()
+        if self._ids:
+            self._have_chats.set()
+        
+        def handle_response(event: Dict[str, Any]):
+            """
+            Handle network response events.
+            
+            Deliberately synchronous: the event emitter calls sync handlers
+            inline but wraps coroutine handlers in a Task per event.
+            """
             try:
-                response = event.get('response', {})
-                request = event.get('request', {})
+                response = event.get('response') or {}
                 url = response.get('url', '')
                 request_id = event.get('requestId')
                 
-                # Filter for WhatsApp Web API endpoints
-                # WhatsApp Web uses various endpoints, we'll look for chat-related ones
-                if not any(keyword in url.lower() for keyword in ['chat', 'conversation', 'whatsapp', 'web.whatsapp.com']):
+                # Filter for WhatsApp Web API endpoints (skip non-API requests)
+                if not _WHATSAPP_URL_RE.match(url):
                     return
                 
-                # Skip non-API requests
-                if not url.startswith('https://') or 'web.whatsapp.com' not in url:
+                # Skip failed responses and bodies that can't carry chat data
+                # (images, fonts, scripts) before the getResponseBody round-trip
+                if response.get('status', 0) >= 400:
+                    return
+                if not response.get('mimeType', '').startswith(_BODY_MIME_PREFIXES):
                     return
                 
-                logger.debug("Intercepted network response: %s", url[:100])
+                if _debug_enabled(logging.DEBUG):
+                    logger.debug("Intercepted network response: %s", url[:100])
                 
-                # Try to get response body
-                try:
-                    body = await self.cdp_session.send('Network.getResponseBody', {
-                        'requestId': request_id
-                    })
-                    
-                    body_text = body.get('body', '')
-                    if body.get('base64Encoded'):
-                        import base64
-                        body_text = base64.b64decode(body_text).decode('utf-8', errors='ignore')
-                    
-                    # Try to parse as JSON first
-                    try:
-                        data = json.loads(body_text)
-                        self._parse_json_payload(data, url)
-                    except json.JSONDecodeError:
-                        # Might be protobuf or other format
-                        logger.debug("Response is not JSON, might be protobuf: %s", url[:100])
-                        # TODO: Add protobuf parsing if needed
-                        
-                except Exception as e:
-                    logger.debug("Failed to get response body for %s: %s", url[:100], str(e))
+                # Body is fetched by the worker so round-trips can overlap
+                self._pending.put_nowait((request_id, url))
                     
             except Exception as e:
                 logger.warning("Error handling network response: %s", str(e))
         
         # Subscribe to Network.responseReceived events
         self.cdp_session.on('Network.responseReceived', handle_response)
+        self._response_listener_task = asyncio.create_task(self._drain_responses())
     
-    def _parse_json_payload(self, data: Dict[str, Any], url: str):
-        """Parse JSON payload and extract chat information."""
+    async def _drain_responses(self) -> None:
+        """
+        Fetch queued response bodies concurrently.
+        
+        Up to MAX_CONCURRENT_BODY_FETCHES getResponseBody calls are kept in
+        flight; CDP pipelines them over a single WebSocket.
+        """
+        in_flight: Set[asyncio.Task] = set()
+        try:
+            while True:
+                request_id, url = await self._pending.get()
+                await self._sema.acquire()
+                task = asyncio.create_task(self._fetch_response_body(request_id, url))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        finally:
+            for task in in_flight:
+                task.cancel()
+    
+    async def _fetch_response_body(self, request_id: str, url: str) -> None:
+        """Fetch a single response body and parse chats from it."""
+        try:
+            body = await self.cdp_session.send('Network.getResponseBody', {
+                'requestId': request_id
+            })
+            
+            body_text = body.get('body', '')
+            if body.get('base64Encoded'):
+                body_text = base64.b64decode(body_text)
+            
+            # Byte-identical body already parsed: re-store its rows, skip decoding
+            raw = body_text if isinstance(body_text, bytes) else body_text.encode('utf-8')
+            cache_key = (url, hashlib.sha256(raw).digest())
+            cached_rows = self._body_cache.get(cache_key)
+            if cached_rows is not None:
+                self._body_cache.move_to_end(cache_key)
+                for chat_id, row in cached_rows:
+                    self._store_row(chat_id, row)
+                return
+            
+            # Try to parse as JSON first (accepts str or bytes)
+            try:
+                if _ijson is not None and len(raw) > STREAM_PARSE_THRESHOLD:
+                    stored = self._parse_json_stream(raw, url)
+                else:
+                    stored = self._parse_json_payload(_json_loads(body_text), url)
+                self._body_cache[cache_key] = stored
+                if len(self._body_cache) > BODY_CACHE_SIZE:
+                    self._body_cache.popitem(last=False)
+            except _JSON_ERRORS:
+                # Plain text or another non-JSON format
+                if _debug_enabled(logging.DEBUG):
+                    logger.debug("Response is not JSON: %s", url[:100])
+                
+        except Exception as e:
+            if _debug_enabled(logging.DEBUG):
+                logger.debug("Failed to get response body for %s: %s", url[:100], str(e))
+        finally:
+            self._sema.release()
+            self._pending.task_done()
+    
+    def _parse_json_payload(self, data: Dict[str, Any], url: str) -> List[Tuple[str, Tuple]]:
+        """
+        Parse JSON payload and extract chat information.
+        
+        Returns:
+            (chat_id, row) pairs stored from this payload
+        """
+        stored: List[Tuple[str, Tuple]] = []
         try:
             # WhatsApp Web API structure varies, try common patterns
             chats = []
@@ -165,52 +353,123 @@ class CDPNetworkChatSource(IChatSource):
                 elif 'count' in data:
                     self._total_count = data['count']
             
-            # Parse each chat
-            for chat_data in chats:
-                if not isinstance(chat_data, dict):
-                    continue
-                
-                # Extract chat ID - try multiple fields
-                chat_id = None
-                if 'id' in chat_data:
-                    id_val = chat_data['id']
-                    if isinstance(id_val, dict):
-                        chat_id = id_val.get('_serialized') or id_val.get('user') or str(id_val)
-                    else:
-                        chat_id = str(id_val)
-                elif 'jid' in chat_data:
-                    chat_id = str(chat_data['jid'])
-                elif 'wid' in chat_data:
-                    chat_id = str(chat_data['wid'])
-                
-                if not chat_id:
-                    continue
-                
-                # Extract other fields
-                name = chat_data.get('name') or chat_data.get('contact', {}).get('name')
-                is_group = chat_data.get('isGroup') or chat_data.get('isGroupChat') or False
-                unread_count = chat_data.get('unreadCount') or chat_data.get('unread') or 0
-                avatar_url = chat_data.get('avatar') or chat_data.get('profilePicUrl')
-                
-                # Create or update RawChat
-                raw_chat = RawChat(
-                    source="network",
-                    jid=chat_id if '@' in chat_id else None,
-                    wid=chat_data.get('wid'),
-                    server_id=chat_data.get('id', {}).get('server_id') if isinstance(chat_data.get('id'), dict) else None,
-                    user_id=chat_data.get('id', {}).get('user') if isinstance(chat_data.get('id'), dict) else None,
-                    name=name,
-                    is_group=is_group,
-                    unread_count=unread_count,
-                    avatar_url=avatar_url,
-                    raw_data={'url': url, 'source': 'network_response'}
-                )
-                
-                # Store by ID (will deduplicate)
-                self._collected_chats[chat_id] = raw_chat
+            # Parse each chat and store by ID (will deduplicate)
+            self._store_chats(chats, url, stored)
                 
         except Exception as e:
-            logger.debug("Error parsing JSON payload from %s: %s", url[:100], str(e))
+            if _debug_enabled(logging.DEBUG):
+                logger.debug("Error parsing JSON payload from %s: %s", url[:100], str(e))
+        return stored
+    
+    def _parse_json_stream(self, raw: bytes, url: str) -> List[Tuple[str, Tuple]]:
+        """
+        Parse a large JSON payload incrementally.
+        
+        Follows the same patterns as _parse_json_payload, but only one chat
+        object is materialized at a time instead of the whole document.
+        
+        Returns:
+            (chat_id, row) pairs stored from this payload
+        
+        Raises:
+            ijson.JSONError: If the body is not valid JSON
+        """
+        # First pass: document shape (top-level value types) and scalar
+        # top-level values such as total/count, without building containers
+        is_array = False
+        top_level: Dict[str, Tuple[str, Any]] = {}
+        pending_key = None
+        for prefix, event, value in _ijson.parse(raw, use_float=True):
+            if pending_key is not None:
+                top_level[pending_key] = (event, value)
+                pending_key = None
+            elif prefix == '':
+                if event == 'start_array':
+                    is_array = True
+                    break
+                if event == 'map_key':
+                    pending_key = value
+        
+        # Pattern 1: Direct array of chats; Pattern 2: nested chats array
+        items_prefix = None
+        if is_array:
+            items_prefix = 'item'
+        elif 'chats' in top_level:
+            items_prefix = 'chats.item' if top_level['chats'][0] == 'start_array' else None
+        elif 'conversations' in top_level:
+            items_prefix = 'conversations.item' if top_level['conversations'][0] == 'start_array' else None
+        elif top_level.get('data', ('',))[0] == 'start_array':
+            items_prefix = 'data.item'
+        
+        # Check for total count (scalars only; containers aren't counts)
+        for key in ('total', 'count'):
+            if key in top_level:
+                event, value = top_level[key]
+                if event not in ('start_map', 'start_array'):
+                    self._total_count = value
+                break
+        
+        stored: List[Tuple[str, Tuple]] = []
+        if items_prefix is not None:
+            self._store_chats(_ijson.items(raw, items_prefix, use_float=True), url, stored)
+        return stored
+    
+    def _store_chats(self, chats: Any, url: str, stored: List[Tuple[str, Tuple]]) -> None:
+        """Extract rows from an iterable of chat dicts, store them and record them in stored."""
+        store_row = self._store_row
+        for chat_id, row in _extract_chat_rows(chats, url):
+            store_row(chat_id, row)
+            stored.append((chat_id, row))
+    
+    def _store_row(self, chat_id: str, row: Tuple) -> None:
+        """
+        Append a chat row to the columns, or overwrite it if already seen.
+        
+        Unchanged re-deliveries (the common case on refetch) write nothing
+        and keep the materialized chat list valid.
+        """
+        columns = (
+            self._wids, self._server_ids, self._user_ids, self._names,
+            self._is_group, self._unread, self._avatars, self._urls,
+        )
+        index = self._row_index.get(chat_id)
+        if index is None:
+            self._row_index[chat_id] = len(self._ids)
+            self._ids.append(chat_id)
+            for column, value in zip(columns, row):
+                column.append(value)
+            if self._have_chats is not None and not self._have_chats.is_set():
+                self._have_chats.set()
+        else:
+            changed = False
+            for column, value in zip(columns, row):
+                if column[index] != value:
+                    column[index] = value
+                    changed = True
+            if not changed:
+                return
+        self._chats_cache = None
+    
+    def _build_chats(self) -> List[RawChat]:
+        """Materialize collected columns into RawChat objects."""
+        return [
+            RawChat(
+                source="network",
+                jid=chat_id if '@' in chat_id else None,
+                wid=wid,
+                server_id=server_id,
+                user_id=user_id,
+                name=name,
+                is_group=is_group,
+                unread_count=unread_count,
+                avatar_url=avatar_url,
+                raw_data={'url': url, 'source': 'network_response'}
+            )
+            for chat_id, wid, server_id, user_id, name, is_group, unread_count, avatar_url, url in zip(
+                self._ids, self._wids, self._server_ids, self._user_ids, self._names,
+                self._is_group, self._unread, self._avatars, self._urls,
+            )
+        ]
     
     async def fetch_batch(self) -> List[RawChat]:
         """Fetch chats from collected network payloads."""
@@ -219,24 +478,29 @@ class CDPNetworkChatSource(IChatSource):
         
         # Wait longer for network responses to arrive
         # WhatsApp Web might need time to load chats
-        if not self._collected_chats:
+        if not self._ids and self._have_chats is not None:
             logger.info("No chats collected yet, waiting for network responses...")
-            # Wait up to 5 seconds with periodic checks
-            for i in range(5):
-                await asyncio.sleep(1.0)
-                if self._collected_chats:
-                    logger.info("Chats collected after %.1fs", i + 1.0)
-                    break
+            # Wake up as soon as the first chat is stored
+            loop = asyncio.get_event_loop()
+            started = loop.time()
+            try:
+                await asyncio.wait_for(self._have_chats.wait(), timeout=FIRST_CHATS_TIMEOUT)
+                logger.info("Chats collected after %.1fs", loop.time() - started)
+            except asyncio.TimeoutError:
+                pass
         
-        # Return collected chats
-        chats = list(self._collected_chats.values())
+        # Return collected chats (shared between calls until a row changes;
+        # callers must not mutate the list)
+        if self._chats_cache is None:
+            self._chats_cache = self._build_chats()
+        chats = self._chats_cache
         logger.info("Fetched %d chats from CDP Network", len(chats))
         return chats
     
     async def is_complete(self) -> bool:
         """Check if all chats have been collected from network."""
         # If we have a total count and collected that many, we're complete
-        if self._total_count and len(self._collected_chats) >= self._total_count:
+        if self._total_count and len(self._ids) >= self._total_count:
             return True
         
         # Otherwise, we can't be sure - network responses are asynchronous
@@ -247,8 +511,11 @@ class CDPNetworkChatSource(IChatSource):
         """Return total count from network payloads if available."""
         return self._total_count
     
-    async def cleanup(self):
+    async def cleanup(self) -> None:
         """Clean up CDP session."""
+        if self._response_listener_task:
+            self._response_listener_task.cancel()
+            self._response_listener_task = None
         if self.cdp_session:
             try:
                 # Remove listeners
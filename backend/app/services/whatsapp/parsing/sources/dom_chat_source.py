@@ -2,10 +2,13 @@
 DOM chat source - extracts chats from DOM (fallback).
 """
 
-from typing import List, Optional
+from array import array
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 import logging
 import asyncio
 import random
+import weakref
 
 from playwright.async_api import Page
 
@@ -14,6 +17,620 @@ from ..models.raw_chat import RawChat
 
 logger = logging.getLogger(__name__)
 
+# Per-scroll details are logged at debug level, once per scroll of every
+# batch; guard them so their arguments aren't built when debug is off
+_debug_enabled = logger.isEnabledFor
+
+# Scrolls performed per fetch_batch before extracting
+SCROLLS_PER_BATCH = 5
+# A scroll is settled once the chat list has had no DOM mutations for
+# SCROLL_IDLE_MS, or after SCROLL_SETTLE_TIMEOUT_MS at most
+SCROLL_IDLE_MS = 300
+SCROLL_SETTLE_TIMEOUT_MS = 1500
+# Max wait for new rows after scrolling straight to the bottom / re-scrolling
+AGGRESSIVE_SCROLL_WAIT_MS = 2000
+AGGRESSIVE_RESCROLL_WAIT_MS = 1000
+# Field order of fetch_batch_columns(); matches the RawChat fields it fills
+BATCH_COLUMNS = ('jid', 'wid', 'name', 'is_group', 'unread_count', 'avatar_url', 'raw_data')
+
+# Animation frames scrollHeight must hold still before the list counts as loaded
+SCROLL_STABLE_FRAMES = 3
+
+# Chat list containers waited for at init, in order
+_CHAT_LIST_SELECTORS = (
+    'div[data-testid="chatlist"]',
+    'div[role="listbox"]',
+    'div[aria-label*="Chat"]',
+)
+
+# Page-side helpers, installed once per document (see _install_helpers) so
+# each call ships a short invocation instead of the full source
+_DOM_HELPERS_JS = """
+(() => {
+// Chat row selectors; the one matching the most rows wins
+const CHAT_SELECTORS = [
+    'div[data-testid="cell-frame-container"]',
+    'div[role="row"]',
+    'div[data-testid="chat"]',
+    'div[aria-label*="Chat"]',
+    'div[aria-label*="чат"]',
+    'div[aria-label*="групп"]',
+    'div[aria-label*="group"]',
+    'div[role="listbox"] > div',
+    'div[data-testid="list"] > div',
+];
+
+// Chat list containers, tried in order; the first scrollable one is used
+const SCROLL_CONTAINER_SELECTORS = [
+    'div[data-testid="chatlist"]',
+    'div[role="listbox"]',
+    'div[aria-label*="Chat"]',
+    '#pane-side',
+    'div[data-testid="chatlist"] > div',
+    'div[role="application"] > div > div'
+];
+
+// Row ID/name patterns, shared by every extracted row
+const RE_HREF_CHAT_ID = /[\\/](\\d+@[cg]\\.us|[^\\/]+)$/;
+const RE_ARIA_CHAT_ID = /(\\+?\\d{10,15}@[cg]\\.us|\\d+@[cg]\\.us)/;
+const RE_ARIA_NAME = /^([^,]+)/;
+
+const isScrollable = (element) => {
+    const style = window.getComputedStyle(element);
+    return element.scrollHeight > element.clientHeight || 
+        style.overflowY === 'auto' || 
+        style.overflowY === 'scroll' ||
+        element.scrollHeight > 0;
+};
+
+// Container found by the last lookup, shared by every scroll helper
+let cachedContainer = null;
+let cachedContainerSelector = null;
+
+// Find the chat list container, trying the selector that matched last time
+// first. Returns [element, selector] or [null, null].
+const findScrollContainer = (preferredSelector) => {
+    // Reuse the last container while it is still in the document
+    if (cachedContainer && cachedContainer.isConnected &&
+            (!preferredSelector || preferredSelector === cachedContainerSelector)) {
+        return [cachedContainer, cachedContainerSelector];
+    }
+    const [element, selector] = scanScrollContainers(preferredSelector);
+    cachedContainer = element;
+    cachedContainerSelector = selector;
+    return [element, selector];
+};
+
+const scanScrollContainers = (preferredSelector) => {
+    if (preferredSelector) {
+        const element = document.querySelector(preferredSelector);
+        if (element && isScrollable(element)) {
+            return [element, preferredSelector];
+        }
+    }
+    for (const selector of SCROLL_CONTAINER_SELECTORS) {
+        const element = document.querySelector(selector);
+        if (element && isScrollable(element)) {
+            return [element, selector];
+        }
+    }
+    return [null, null];
+};
+
+// Walk a chat row's subtree once and collect the first descendant matching
+// each per-row lookup, in document order (same result as querySelector)
+const scanRow = (row) => {
+    const found = {link: null, idElement: null, title: null, img: null, unread: null, groupIcon: false};
+    const walker = document.createTreeWalker(row, NodeFilter.SHOW_ELEMENT);
+    let node;
+    while ((node = walker.nextNode())) {
+        if (!found.link && node.localName === 'a' && node.hasAttribute('href')) {
+            found.link = node;
+        }
+        if (!found.idElement && (node.hasAttribute('data-id') || node.hasAttribute('data-chat-id'))) {
+            found.idElement = node;
+        }
+        if (!found.title && node.hasAttribute('title')) {
+            found.title = node;
+        }
+        if (!found.img && node.localName === 'img' && node.hasAttribute('src')) {
+            found.img = node;
+        }
+        const testId = node.getAttribute('data-testid');
+        if (testId === 'group' || testId === 'group-icon') {
+            found.groupIcon = true;
+        } else if (!found.unread && testId === 'icon-unread-count') {
+            found.unread = node;
+        }
+    }
+    return found;
+};
+
+// Resolve once the target's rows stop changing for idleMs (virtual
+// scrolling has rendered), or after timeoutMs at most
+const waitForIdle = (target, idleMs, timeoutMs) => new Promise((resolve) => {
+    let idleTimer = null;
+    let observer = null;
+    const done = () => {
+        clearTimeout(idleTimer);
+        clearTimeout(deadline);
+        observer.disconnect();
+        resolve();
+    };
+    const deadline = setTimeout(done, timeoutMs);
+    observer = new MutationObserver(() => {
+        clearTimeout(idleTimer);
+        idleTimer = setTimeout(done, idleMs);
+    });
+    observer.observe(target, {childList: true, subtree: true});
+    idleTimer = setTimeout(done, idleMs);
+});
+
+// Resolve true as soon as nodes are added under target, or false after
+// timeoutMs. Call before the action that should render new rows.
+const waitForNewRows = (target, timeoutMs) => new Promise((resolve) => {
+    const observer = new MutationObserver((mutations) => {
+        if (mutations.some((m) => m.addedNodes.length > 0)) {
+            clearTimeout(deadline);
+            observer.disconnect();
+            resolve(true);
+        }
+    });
+    const deadline = setTimeout(() => {
+        observer.disconnect();
+        resolve(false);
+    }, timeoutMs);
+    observer.observe(target, {childList: true, subtree: true});
+});
+
+// Resolve with target.scrollHeight once it has stayed the same for
+// stableFrames animation frames, or after timeoutMs at most (rAF is
+// paused in hidden tabs, so the deadline is a timer of its own)
+const waitForStableHeight = (target, stableFrames, timeoutMs) => new Promise((resolve) => {
+    let last = target.scrollHeight;
+    let stable = 0;
+    let frame = null;
+    const deadline = setTimeout(() => {
+        cancelAnimationFrame(frame);
+        resolve(target.scrollHeight);
+    }, timeoutMs);
+    const tick = () => {
+        const height = target.scrollHeight;
+        stable = height === last ? stable + 1 : 0;
+        last = height;
+        if (stable >= stableFrames) {
+            clearTimeout(deadline);
+            resolve(height);
+        } else {
+            frame = requestAnimationFrame(tick);
+        }
+    };
+    frame = requestAnimationFrame(tick);
+});
+
+window.__waDom = {
+    // IDs of chats already returned by extractChats; reset whenever the
+    // bundle is (re)installed, i.e. for every new DOMChatSource
+    seenIds: new Set(),
+    // Chat list scrollHeight at the last scrollAndCollect extraction
+    lastExtractHeight: null,
+
+    // Scroll to the top, then wait for the rows there to render (only if
+    // anything actually moved)
+    scrollToTop: async (idleMs, timeoutMs) => {
+        window.scrollTo(0, 0);
+        // Also try to scroll chat list containers
+        const containers = [
+            document.querySelector('div[data-testid="chatlist"]'),
+            document.querySelector('div[role="listbox"]'),
+            document.querySelector('#pane-side')
+        ].filter(container => container);
+        let moved = false;
+        containers.forEach(container => {
+            if (container.scrollTop > 0) {
+                moved = true;
+            }
+            container.scrollTop = 0;
+        });
+        if (moved) {
+            await waitForIdle(containers[0], idleMs, timeoutMs);
+        }
+        return moved;
+    },
+
+    extractChats: (preferredSelector) => {
+        const rows = [];
+        // IDs of every rendered row, including the ones skipped as seen
+        const visibleIds = [];
+
+        let chatElements = [];
+        let bestSelector = null;
+
+        // Selector that won last time first; full scan only if it matches nothing
+        if (preferredSelector) {
+            const elements = document.querySelectorAll(preferredSelector);
+            if (elements.length > 0) {
+                chatElements = Array.from(elements);
+                bestSelector = preferredSelector;
+            }
+        }
+
+        // Try all selectors and use the one that finds the most elements
+        if (chatElements.length === 0) {
+            let maxElements = 0;
+            for (const selector of CHAT_SELECTORS) {
+                const elements = document.querySelectorAll(selector);
+                if (elements.length > maxElements) {
+                    maxElements = elements.length;
+                    chatElements = Array.from(elements);
+                    bestSelector = selector;
+                }
+            }
+        }
+
+        // If still no elements, try more aggressive search
+        if (chatElements.length === 0) {
+            const allDivs = document.querySelectorAll('div[role="row"], div[aria-label]');
+            chatElements = Array.from(allDivs).filter(div => {
+                const ariaLabel = div.getAttribute('aria-label') || '';
+                return ariaLabel.includes('Chat') || ariaLabel.includes('чат') || 
+                       ariaLabel.includes('group') || ariaLabel.includes('групп');
+            });
+        }
+
+        // Additional fallback: look for any div with clickable chat-like structure
+        if (chatElements.length === 0) {
+            const chatListContainer = document.querySelector('div[data-testid="chatlist"]') || 
+                                     document.querySelector('div[role="listbox"]');
+            if (chatListContainer) {
+                chatElements = Array.from(chatListContainer.querySelectorAll('div[role="row"], div > div'));
+            }
+        }
+
+        // Chats already returned by an earlier call are skipped as soon as
+        // their ID is known, before the costlier field extraction
+        const seenIds = window.__waDom.seenIds;
+
+        // Parse all elements in DOM
+        chatElements.forEach((element, index) => {
+            try {
+                const ariaLabel = element.getAttribute('aria-label');
+
+                // Extract chat ID - DOM source uses fallback methods
+                // Note: This is less reliable than Store/Network sources
+                let chatId = null;
+
+                // Try multiple data attributes (more reliable)
+                chatId = element.getAttribute('data-id') || 
+                        element.getAttribute('data-chat-id') ||
+                        element.getAttribute('data-testid') ||
+                        element.getAttribute('id');
+
+                if (chatId && seenIds.has(chatId)) {
+                    visibleIds.push(chatId);
+                    return;
+                }
+
+                // Everything else comes from the row's descendants
+                const found = scanRow(element);
+
+                // Try to find link with chat ID
+                if (!chatId) {
+                    const linkElement = found.link;
+                    if (linkElement) {
+                        const href = linkElement.getAttribute('href');
+                        // Extract ID from href like /chat/1234567890@c.us
+                        const match = href.match(RE_HREF_CHAT_ID);
+                        if (match) chatId = match[1];
+                    }
+                }
+
+                // Try to find ID in child elements
+                if (!chatId) {
+                    const idElement = found.idElement;
+                    if (idElement) {
+                        chatId = idElement.getAttribute('data-id') || 
+                                idElement.getAttribute('data-chat-id');
+                    }
+                }
+
+                // Try to extract from aria-label (less reliable but acceptable for DOM fallback)
+                if (!chatId && ariaLabel) {
+                    // Try to find WhatsApp ID format in aria-label
+                    const match = ariaLabel.match(RE_ARIA_CHAT_ID);
+                    if (match) chatId = match[1];
+                }
+
+                if (chatId && seenIds.has(chatId)) {
+                    visibleIds.push(chatId);
+                    return;
+                }
+
+                let name = null;
+                if (ariaLabel) {
+                    const match = ariaLabel.match(RE_ARIA_NAME);
+                    if (match) name = match[1].trim();
+                }
+
+                if (!name) {
+                    const titleElement = found.title;
+                    if (titleElement) {
+                        name = titleElement.getAttribute('title') || titleElement.textContent.trim();
+                    }
+                }
+
+                if (!name) {
+                    const textContent = element.textContent.trim();
+                    if (textContent && textContent.length < 100) {
+                        name = textContent.split('\\n')[0].trim();
+                    }
+                }
+
+                if (!name || name.length === 0) {
+                    name = `Chat ${index + 1}`;
+                }
+
+                // Last resort: stable fallback ID from name and position,
+                // built (and memoized) on the Python side
+                const seenKey = chatId || `fallback:${index}:${name}`;
+                visibleIds.push(seenKey);
+                if (seenIds.has(seenKey)) {
+                    return;
+                }
+
+                const isGroup = found.groupIcon ||
+                               (ariaLabel && (ariaLabel.toLowerCase().includes('group') || 
+                                              ariaLabel.toLowerCase().includes('групп'))) ||
+                               false;
+
+                const avatarElement = found.img;
+                const avatar = avatarElement ? avatarElement.getAttribute('src') : null;
+
+                let messageCount = 0;
+                const unreadElement = found.unread;
+                if (unreadElement) {
+                    const unreadText = unreadElement.textContent.trim();
+                    messageCount = parseInt(unreadText) || 0;
+                }
+
+                if (name && name.length > 0 && name !== `Chat ${index + 1}`) {
+                    seenIds.add(seenKey);
+                    // Positional row unpacked by fetch_batch_columns(); a null ID
+                    // means the fallback ID is built from name and index
+                    rows.push([
+                        chatId || null,
+                        name,
+                        isGroup,
+                        messageCount,
+                        avatar,
+                        index,
+                        !!ariaLabel,
+                    ]);
+                }
+            } catch (e) {
+                console.error('Error parsing chat element:', e);
+            }
+        });
+
+        return {rows: rows, selector: bestSelector, visibleIds: visibleIds};
+    },
+
+    scrollForMore: (preferredSelector) => {
+        // Try to find chat list container - try multiple selectors
+        const [chatList, containerSelector] = findScrollContainer(preferredSelector);
+
+        if (chatList) {
+            const oldScrollTop = chatList.scrollTop;
+            const oldScrollHeight = chatList.scrollHeight;
+            const oldClientHeight = chatList.clientHeight;
+
+            // Calculate distance to bottom
+            const distanceToBottom = chatList.scrollHeight - chatList.scrollTop - chatList.clientHeight;
+
+            // Scroll strategy for virtual scrolling:
+            // Always scroll to near bottom (not absolute bottom) to trigger loading
+            // Virtual scrolling loads content as we approach bottom
+            // Don't scroll to absolute bottom immediately - leave space for loading
+            if (distanceToBottom > 500) {
+                // Far from bottom, scroll by large amount to get closer
+                const scrollAmount = Math.max(
+                    chatList.clientHeight * 2.0,  // 200% of viewport for faster loading
+                    1500  // Minimum 1500px
+                );
+                chatList.scrollTop += scrollAmount;
+            } else {
+                // Close to bottom, scroll to near bottom (not absolute) to trigger loading
+                // Leave some space (200px) to allow virtual scrolling to load more
+                chatList.scrollTop = chatList.scrollHeight - chatList.clientHeight - 200;
+            }
+
+            // Force a small delay to let virtual scrolling work
+            // (actual delay happens in Python)
+
+            // Wait a moment for virtual scrolling to update scrollHeight
+            // (actual wait happens in Python)
+            const newScrollHeight = chatList.scrollHeight;
+            // More lenient bottom detection - consider bottom if within 300px
+            // This prevents premature completion when virtual scrolling is still loading
+            const atBottom = chatList.scrollTop >= chatList.scrollHeight - chatList.clientHeight - 300;
+
+            return {
+                containerSelector: containerSelector,
+                scrolled: chatList.scrollTop !== oldScrollTop,
+                scrollTop: chatList.scrollTop,
+                scrollHeight: newScrollHeight,
+                oldScrollHeight: oldScrollHeight,
+                clientHeight: chatList.clientHeight,
+                oldClientHeight: oldClientHeight,
+                atBottom: atBottom,
+                hasMoreContent: newScrollHeight > oldScrollHeight,
+                scrollDelta: chatList.scrollTop - oldScrollTop
+            };
+        }
+
+        // Fallback to window scroll
+        const oldScrollTop = window.scrollY;
+        const oldScrollHeight = document.body.scrollHeight;
+        const scrollAmount = window.innerHeight * 0.9;
+        window.scrollBy(0, scrollAmount);
+
+        return {
+            scrolled: window.scrollY !== oldScrollTop,
+            scrollTop: window.scrollY,
+            scrollHeight: document.body.scrollHeight,
+            oldScrollHeight: oldScrollHeight,
+            clientHeight: window.innerHeight,
+            atBottom: window.scrollY >= document.body.scrollHeight - window.innerHeight - 200,
+            hasMoreContent: document.body.scrollHeight > oldScrollHeight,
+            scrollDelta: window.scrollY - oldScrollTop
+        };
+    },
+
+    // Scroll up to maxScrolls times, waiting for rows to render after each
+    // scroll, then extract chats - all in one round-trip
+    scrollAndCollect: async (maxScrolls, idleMs, timeoutMs, chatSelector, scrollSelector) => {
+        const scrolls = [];
+        try {
+            for (let i = 0; i < maxScrolls; i++) {
+                const info = window.__waDom.scrollForMore(scrollSelector);
+                scrolls.push(info);
+                scrollSelector = info.containerSelector || scrollSelector;
+                if (!info.scrolled && info.atBottom) {
+                    break;
+                }
+                // Couldn't scroll but not at bottom: short pause and retry
+                const [container] = findScrollContainer(scrollSelector);
+                await waitForIdle(container || document.body, idleMs, info.scrolled ? timeoutMs : idleMs);
+            }
+        } catch (e) {
+            console.error('Error scrolling chat list:', e);
+        }
+
+        // Nothing scrolled and the list is as tall as at the last extraction:
+        // the rendered rows are the ones already returned, skip the walk
+        const [container] = findScrollContainer(scrollSelector);
+        const height = (container || document.body).scrollHeight;
+        if (!scrolls.some((info) => info.scrolled) && height === window.__waDom.lastExtractHeight) {
+            return {rows: [], selector: chatSelector, scrolls: scrolls, unchanged: true};
+        }
+
+        const result = window.__waDom.extractChats(chatSelector);
+        window.__waDom.lastExtractHeight = height;
+        result.scrolls = scrolls;
+        return result;
+    },
+
+    // Scroll to the bottom, then wait (up to waitMs) for new rows to render
+    // and (up to waitMs again) for scrollHeight to stop growing
+    scrollToBottom: async (preferredSelector, waitMs, stableFrames) => {
+        // Try to find chat list container
+        const [chatList, containerSelector] = findScrollContainer(preferredSelector);
+
+        if (chatList) {
+            const oldScrollTop = chatList.scrollTop;
+            const oldScrollHeight = chatList.scrollHeight;
+            const rowsAdded = waitForNewRows(chatList, waitMs);
+
+            // Scroll to absolute bottom
+            chatList.scrollTop = chatList.scrollHeight;
+
+            const result = {
+                containerSelector: containerSelector,
+                scrolled: true,
+                oldScrollTop: oldScrollTop,
+                oldScrollHeight: oldScrollHeight,
+                newScrollTop: chatList.scrollTop,
+                newScrollHeight: chatList.scrollHeight,
+                scrollDelta: chatList.scrollTop - oldScrollTop
+            };
+            result.rowsAdded = await rowsAdded;
+            result.settledScrollHeight = result.rowsAdded
+                ? await waitForStableHeight(chatList, stableFrames, waitMs)
+                : chatList.scrollHeight;
+            return result;
+        }
+
+        // Fallback to window scroll
+        const oldScrollTop = window.scrollY;
+        const oldScrollHeight = document.body.scrollHeight;
+        const rowsAdded = waitForNewRows(document.body, waitMs);
+        window.scrollTo(0, document.body.scrollHeight);
+
+        const result = {
+            scrolled: true,
+            oldScrollTop: oldScrollTop,
+            oldScrollHeight: oldScrollHeight,
+            newScrollTop: window.scrollY,
+            newScrollHeight: document.body.scrollHeight,
+            scrollDelta: window.scrollY - oldScrollTop
+        };
+        result.rowsAdded = await rowsAdded;
+        return result;
+    },
+
+    rescrollToBottom: async (preferredSelector, waitMs) => {
+        const [chatList] = findScrollContainer(preferredSelector);
+
+        if (chatList) {
+            const rowsAdded = waitForNewRows(chatList, waitMs);
+            chatList.scrollTop = chatList.scrollHeight;
+            return await rowsAdded;
+        }
+        return false;
+    },
+};
+})()
+"""
+
+# Pages the helpers were registered on with add_init_script
+_pages_with_helpers: "weakref.WeakSet[Page]" = weakref.WeakSet()
+
+
+def _to_int32(value: int) -> int:
+    """Wrap an integer to a signed 32-bit value (JS ToInt32)."""
+    value &= 0xFFFFFFFF
+    return value - 0x100000000 if value & 0x80000000 else value
+
+
+@lru_cache(maxsize=4096)
+def _name_hash(name: str) -> int:
+    """
+    Hash a chat name the way earlier page-side code did.
+    
+    Reproduces JS `((acc << 5) - acc) + name.charCodeAt(i)` over UTF-16
+    code units so fallback IDs stay the same. Memoized: the same names
+    are seen on every scroll.
+    """
+    acc = 0
+    for code_unit in array('H', name.encode('utf-16-le')):
+        acc = _to_int32(_to_int32(acc) << 5) - acc + code_unit
+    return abs(acc)
+
+
+def _fallback_chat_id(name: str, index: int) -> str:
+    """Build a fallback chat ID from name and position in the list."""
+    return f"dom_chat_{_name_hash(name)}_{index}"
+
+
+def _filter_new_rows(rows: Iterable[list], seen: Set[int]) -> List[Tuple[str, list]]:
+    """
+    Return (chat_id, row) for extracted rows whose ID isn't in seen yet.
+    
+    Fills in fallback IDs and adds the hash of every returned ID to seen.
+    Kept as a module-level loop with locally bound methods; it runs over
+    every row of every batch.
+    """
+    new_rows = []
+    append = new_rows.append
+    seen_add = seen.add
+    for row in rows:
+        chat_id = row[0] or _fallback_chat_id(row[1], row[5])
+        id_hash = hash(chat_id)
+        if id_hash not in seen:
+            seen_add(id_hash)
+            append((chat_id, row))
+    return new_rows
+
 
 class DOMChatSource(IChatSource):
     """
@@ -29,10 +646,21 @@ class DOMChatSource(IChatSource):
     def __init__(self, page: Page):
         self.page = page
         self._initialized = False
-        self._seen_ids: set = set()
+        # hash() of each returned chat ID; ints are much smaller than the
+        # ID strings and the set never outlives the process
+        self._seen_ids: Set[int] = set()
         self._scroll_iterations = 0
         self._no_new_chats_count = 0
         self._reached_bottom = False
+        # Hash of the chat IDs rendered at the last batch, and whether it
+        # matched the batch before
+        self._visible_ids_hash: Optional[int] = None
+        self._visible_ids_unchanged = False
+        # Selectors that matched last time, tried first on the next call
+        self._best_chat_selector: Optional[str] = None
+        self._best_scroll_selector: Optional[str] = None
+        # Next scrollAndCollect round-trip, started at the end of fetch_batch
+        self._pending_collect: Optional[asyncio.Future] = None
     
     @property
     def source_name(self) -> str:
@@ -42,44 +670,20 @@ class DOMChatSource(IChatSource):
         """Initialize DOM parsing - wait for page to load."""
         try:
             # Wait for chat list container
-            chatlist_selectors = [
-                'div[data-testid="chatlist"]',
-                'div[role="listbox"]',
-                'div[aria-label*="Chat"]',
-            ]
-            
-            found = False
-            for selector in chatlist_selectors:
-                try:
-                    await self.page.wait_for_selector(selector, timeout=5000)
-                    logger.info("DOM source: found chat list with selector: %s", selector)
-                    found = True
-                    break
-                except Exception:
-                    continue
-            
-            if not found:
+            selector = await self._wait_for_chat_list()
+            if selector:
+                logger.info("DOM source: found chat list with selector: %s", selector)
+            else:
                 logger.warning("DOM source: chat list container not found, will try to parse anyway")
             
+            await self._install_helpers()
+            
             # Scroll to top to start from beginning
             # Also try to scroll the chat list container
-            await self.page.evaluate("""
-                () => {
-                    window.scrollTo(0, 0);
-                    // Also try to scroll chat list containers
-                    const containers = [
-                        document.querySelector('div[data-testid="chatlist"]'),
-                        document.querySelector('div[role="listbox"]'),
-                        document.querySelector('#pane-side')
-                    ];
-                    containers.forEach(container => {
-                        if (container) {
-                            container.scrollTop = 0;
-                        }
-                    });
-                }
-            """)
-            await asyncio.sleep(0.5)
+            await self.page.evaluate(
+                "(args) => window.__waDom.scrollToTop(...args)",
+                [SCROLL_IDLE_MS, SCROLL_SETTLE_TIMEOUT_MS]
+            )
             
             self._initialized = True
             
@@ -87,237 +691,128 @@ class DOMChatSource(IChatSource):
             logger.error("Failed to initialize DOM source: %s", str(e), exc_info=True)
             raise SourceUnavailableError(f"Failed to initialize DOM: {str(e)}")
     
+    async def _wait_for_chat_list(self) -> Optional[str]:
+        """Wait for any chat list selector in parallel, returning the first to match."""
+        tasks = {
+            asyncio.ensure_future(self.page.wait_for_selector(selector, timeout=5000)): selector
+            for selector in _CHAT_LIST_SELECTORS
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        return tasks[task]
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _install_helpers(self) -> None:
+        """
+        Install page-side helpers in the current document and any later one.
+        
+        The init script is registered once per page; later calls only
+        re-evaluate the bundle to reset its state in the current document.
+        """
+        if self.page not in _pages_with_helpers:
+            await self.page.add_init_script(script=_DOM_HELPERS_JS)
+            _pages_with_helpers.add(self.page)
+        await self.page.evaluate(_DOM_HELPERS_JS)
+    
     async def fetch_batch(self) -> List[RawChat]:
         """Fetch visible chats from DOM, scrolling to load more if needed."""
+        return [raw_chat async for raw_chat in self.iter_batch()]
+    
+    async def iter_batch(self) -> AsyncIterator[RawChat]:
+        """
+        Fetch the next batch like fetch_batch, building RawChat objects lazily.
+        
+        The whole batch is still fetched and deduplicated up front; callers that
+        stop early only skip constructing the remaining RawChat objects.
+        """
+        columns = await self.fetch_batch_columns()
+        for jid, wid, name, is_group, unread_count, avatar_url, raw_data in zip(
+            *(columns[column] for column in BATCH_COLUMNS)
+        ):
+            yield RawChat(
+                source="dom",
+                jid=jid,
+                wid=wid,  # Store fallback ID here for DOM source
+                name=name,
+                is_group=is_group,
+                unread_count=unread_count,
+                avatar_url=avatar_url,
+                raw_data=raw_data
+            )
+    
+    async def fetch_batch_columns(self) -> Dict[str, list]:
+        """
+        Fetch the next batch like fetch_batch, as one list per RawChat field.
+        
+        Keys are BATCH_COLUMNS; row i of every list describes the same chat.
+        """
+        columns: Dict[str, list] = {column: [] for column in BATCH_COLUMNS}
         if not self._initialized:
             await self.init()
         
-        # Scroll to load more chats before parsing
-        # This is important for virtual scrolling in WhatsApp Web
-        # Scroll multiple times to ensure we load all chats
-        if not self._reached_bottom and self._no_new_chats_count < 10:
-            # Scroll multiple times to load more content
-            # For virtual scrolling, we need to scroll gradually to trigger loading
+        pending = self._pending_collect
+        self._pending_collect = None
+        
+        try:
+            # Use the round-trip started after the previous batch, if any
+            result = await pending if pending is not None else await self._collect()
+            
             scroll_count = 0
-            for scroll_attempt in range(5):  # Try up to 5 scrolls per batch
-                scrolled = await self.scroll_for_more()
-                if scrolled:
+            for scroll_info in result.get('scrolls') or ():
+                if self._record_scroll(scroll_info):
                     scroll_count += 1
-                    # Wait for new chats to render after each scroll
-                    # Increase wait time for virtual scrolling to load content
-                    await asyncio.sleep(1.5)  # Increased wait time for virtual scrolling
-                else:
-                    # Can't scroll more, but don't break immediately - might need to wait
-                    if self._reached_bottom:
-                        logger.info("DOM source: reached bottom after %d scrolls", scroll_count)
-                        break
-                    # If not at bottom but can't scroll, wait a bit and try again
-                    await asyncio.sleep(0.5)
+                elif self._reached_bottom:
+                    logger.info("DOM source: reached bottom after %d scrolls", scroll_count)
             
-            if scroll_count > 0:
-                logger.info("DOM source: performed %d scrolls before parsing batch", scroll_count)
-        
-        try:
-            chats_data = await self.page.evaluate("""
-                () => {
-                    const chats = [];
-                    const chatSelectors = [
-                        'div[data-testid="cell-frame-container"]',
-                        'div[role="row"]',
-                        'div[data-testid="chat"]',
-                        'div[aria-label*="Chat"]',
-                        'div[aria-label*="чат"]',
-                        'div[aria-label*="групп"]',
-                        'div[aria-label*="group"]',
-                        'div[role="listbox"] > div',
-                        'div[data-testid="list"] > div',
-                    ];
-                    
-                    let chatElements = [];
-                    let bestSelector = null;
-                    let maxElements = 0;
-                    
-                    // Try all selectors and use the one that finds the most elements
-                    for (const selector of chatSelectors) {
-                        const elements = document.querySelectorAll(selector);
-                        if (elements.length > maxElements) {
-                            maxElements = elements.length;
-                            chatElements = Array.from(elements);
-                            bestSelector = selector;
-                        }
-                    }
-                    
-                    // If still no elements, try more aggressive search
-                    if (chatElements.length === 0) {
-                        const allDivs = document.querySelectorAll('div[role="row"], div[aria-label]');
-                        chatElements = Array.from(allDivs).filter(div => {
-                            const ariaLabel = div.getAttribute('aria-label') || '';
-                            return ariaLabel.includes('Chat') || ariaLabel.includes('чат') || 
-                                   ariaLabel.includes('group') || ariaLabel.includes('групп');
-                        });
-                    }
-                    
-                    // Additional fallback: look for any div with clickable chat-like structure
-                    if (chatElements.length === 0) {
-                        const chatListContainer = document.querySelector('div[data-testid="chatlist"]') || 
-                                                 document.querySelector('div[role="listbox"]');
-                        if (chatListContainer) {
-                            chatElements = Array.from(chatListContainer.querySelectorAll('div[role="row"], div > div'));
-                        }
-                    }
-                    
-                    // Parse all elements in DOM
-                    chatElements.forEach((element, index) => {
-                        try {
-                            let name = null;
-                            const ariaLabel = element.getAttribute('aria-label');
-                            if (ariaLabel) {
-                                const match = ariaLabel.match(/^([^,]+)/);
-                                if (match) name = match[1].trim();
-                            }
-                            
-                            if (!name) {
-                                const titleElement = element.querySelector('[title]');
-                                if (titleElement) {
-                                    name = titleElement.getAttribute('title') || titleElement.textContent.trim();
-                                }
-                            }
-                            
-                            if (!name) {
-                                const textContent = element.textContent.trim();
-                                if (textContent && textContent.length < 100) {
-                                    name = textContent.split('\\n')[0].trim();
-                                }
-                            }
-                            
-                            if (!name || name.length === 0) {
-                                name = `Chat ${index + 1}`;
-                            }
-                            
-                            // Extract chat ID - DOM source uses fallback methods
-                            // Note: This is less reliable than Store/Network sources
-                            let chatId = null;
-                            
-                            // Try multiple data attributes (more reliable)
-                            chatId = element.getAttribute('data-id') || 
-                                    element.getAttribute('data-chat-id') ||
-                                    element.getAttribute('data-testid') ||
-                                    element.getAttribute('id');
-                            
-                            // Try to find link with chat ID
-                            if (!chatId) {
-                                const linkElement = element.querySelector('a[href]');
-                                if (linkElement) {
-                                    const href = linkElement.getAttribute('href');
-                                    // Extract ID from href like /chat/1234567890@c.us
-                                    const match = href.match(/[\\/](\\d+@[cg]\\.us|[^\\/]+)$/);
-                                    if (match) chatId = match[1];
-                                }
-                            }
-                            
-                            // Try to find ID in child elements
-                            if (!chatId) {
-                                const idElement = element.querySelector('[data-id], [data-chat-id]');
-                                if (idElement) {
-                                    chatId = idElement.getAttribute('data-id') || 
-                                            idElement.getAttribute('data-chat-id');
-                                }
-                            }
-                            
-                            // Try to extract from aria-label (less reliable but acceptable for DOM fallback)
-                            if (!chatId && ariaLabel) {
-                                // Try to find WhatsApp ID format in aria-label
-                                const match = ariaLabel.match(/(\\+?\\d{10,15}@[cg]\\.us|\\d+@[cg]\\.us)/);
-                                if (match) chatId = match[1];
-                            }
-                            
-                            // Last resort: generate stable fallback ID based on name and position
-                            if (!chatId) {
-                                // Use hash of name + index for stability
-                                const nameHash = name.split('').reduce((acc, char) => {
-                                    return ((acc << 5) - acc) + char.charCodeAt(0);
-                                }, 0);
-                                chatId = `dom_chat_${Math.abs(nameHash)}_${index}`;
-                            }
-                            
-                            const isGroup = element.querySelector('[data-testid="group"]') !== null ||
-                                           element.querySelector('[data-testid="group-icon"]') !== null ||
-                                           (ariaLabel && (ariaLabel.toLowerCase().includes('group') || 
-                                                          ariaLabel.toLowerCase().includes('групп'))) ||
-                                           false;
-                            
-                            const avatarElement = element.querySelector('img[src]');
-                            const avatar = avatarElement ? avatarElement.getAttribute('src') : null;
-                            
-                            let messageCount = 0;
-                            const unreadElement = element.querySelector('[data-testid="icon-unread-count"]');
-                            if (unreadElement) {
-                                const unreadText = unreadElement.textContent.trim();
-                                messageCount = parseInt(unreadText) || 0;
-                            }
-                            
-                            if (name && name.length > 0 && name !== `Chat ${index + 1}`) {
-                                chats.push({
-                                    id: chatId,
-                                    name: name,
-                                    isGroup: isGroup,
-                                    unreadCount: messageCount,
-                                    avatarUrl: avatar,
-                                    rawData: {
-                                        selector: bestSelector || 'fallback',
-                                        index: index,
-                                        hasAriaLabel: !!ariaLabel,
-                                    }
-                                });
-                            }
-                        } catch (e) {
-                            console.error('Error parsing chat element:', e);
-                        }
-                    });
-                    
-                    return chats;
-                }
-            """)
+            if result.get('unchanged') and _debug_enabled(logging.DEBUG):
+                logger.debug("DOM source: chat list unchanged since last batch, extraction skipped")
             
-            # Convert to RawChat objects
-            raw_chats = []
-            new_chats_count = 0
+            rows = result.get('rows') or ()
+            row_selector = result.get('selector')
+            if row_selector:
+                self._best_chat_selector = row_selector
+            row_selector = row_selector or 'fallback'
             
-            for chat_data in chats_data or []:
-                chat_id = chat_data.get('id')
-                if not chat_id:
-                    continue
-                
-                # Track seen IDs to avoid duplicates
-                if chat_id in self._seen_ids:
-                    continue
-                
-                self._seen_ids.add(chat_id)
-                new_chats_count += 1
-                
+            jids, wids, names = columns['jid'], columns['wid'], columns['name']
+            is_groups, unread_counts = columns['is_group'], columns['unread_count']
+            avatar_urls, raw_datas = columns['avatar_url'], columns['raw_data']
+            
+            # Track seen IDs to avoid duplicates
+            new_rows = _filter_new_rows(rows, self._seen_ids)
+            new_chats_count = len(new_rows)
+            if result.get('unchanged'):
+                # Extraction skipped: the rendered rows are the previous batch's
+                visible_ids_hash = self._visible_ids_hash
+            else:
+                # rows only holds chats not returned before; visibleIds covers
+                # every rendered row, so repeated screens hash the same
+                visible_ids_hash = hash(frozenset(result.get('visibleIds') or ()))
+            self._visible_ids_unchanged = visible_ids_hash == self._visible_ids_hash
+            self._visible_ids_hash = visible_ids_hash
+            
+            for chat_id, (_, name, is_group, unread_count, avatar_url, index, has_aria_label) in new_rows:
                 # For DOM source, use wid for fallback IDs (non-JID format)
                 # and jid for proper WhatsApp JIDs
-                jid = None
-                wid = None
-                
                 if '@' in chat_id:
                     # Looks like a proper WhatsApp JID
-                    jid = chat_id
+                    jids.append(chat_id)
+                    wids.append(None)
                 else:
                     # Fallback ID - use wid field
-                    wid = chat_id
-                
-                raw_chat = RawChat(
-                    source="dom",
-                    jid=jid,
-                    wid=wid,  # Store fallback ID here for DOM source
-                    name=chat_data.get('name'),
-                    is_group=chat_data.get('isGroup', False),
-                    unread_count=chat_data.get('unreadCount', 0),
-                    avatar_url=chat_data.get('avatarUrl'),
-                    raw_data=chat_data.get('rawData', {})
-                )
-                raw_chats.append(raw_chat)
+                    jids.append(None)
+                    wids.append(chat_id)
+                names.append(name)
+                is_groups.append(is_group)
+                unread_counts.append(unread_count)
+                avatar_urls.append(avatar_url)
+                raw_datas.append({'selector': row_selector, 'index': index, 'hasAriaLabel': has_aria_label})
             
             # Track if we got new chats
             if new_chats_count == 0:
@@ -335,20 +830,48 @@ class DOMChatSource(IChatSource):
                     logger.info("DOM source: first batch loaded %d chats, scrolling to bottom to load all", new_chats_count)
                     # Scroll to absolute bottom to trigger loading of all chats
                     await self._scroll_to_bottom_aggressive()
+                
+                # More chats are likely: start the next scroll now so the page
+                # scrolls and renders while the caller processes this batch
+                self._pending_collect = asyncio.ensure_future(self._collect())
             
             logger.info(
-                "DOM source: parsed %d chats (%d new, %d total seen, no_new_count=%d)",
-                len(chats_data) if chats_data else 0,
+                "DOM source: %d scrolls, parsed %d chats (%d new, %d total seen, no_new_count=%d)",
+                scroll_count,
+                len(rows),
                 new_chats_count,
                 len(self._seen_ids),
                 self._no_new_chats_count
             )
             
-            return raw_chats
+            return columns
             
         except Exception as e:
             logger.error("Failed to fetch chats from DOM: %s", str(e), exc_info=True)
-            return []
+            return {column: [] for column in BATCH_COLUMNS}
+    
+    async def _collect(self) -> Dict[str, Any]:
+        """Scroll (unless at the bottom) and extract chats in one page round-trip."""
+        # Scroll to load more chats before parsing
+        # This is important for virtual scrolling in WhatsApp Web
+        # Scroll multiple times to ensure we load all chats
+        max_scrolls = 0
+        if not self._reached_bottom and self._no_new_chats_count < 10:
+            max_scrolls = SCROLLS_PER_BATCH
+        
+        # Scrolling, waiting for rows to render and extraction happen
+        # in a single page round-trip
+        result = await self.page.evaluate(
+            "(args) => window.__waDom.scrollAndCollect(...args)",
+            [
+                max_scrolls,
+                SCROLL_IDLE_MS,
+                SCROLL_SETTLE_TIMEOUT_MS,
+                self._best_chat_selector,
+                self._best_scroll_selector,
+            ]
+        )
+        return result or {}
     
     async def scroll_for_more(self) -> bool:
         """
@@ -357,193 +880,72 @@ class DOMChatSource(IChatSource):
         Returns:
             True if scrolled, False if reached bottom
         """
+        # Don't scroll underneath a prefetched batch; fetch_batch still
+        # consumes its result
+        if self._pending_collect is not None:
+            await asyncio.wait([self._pending_collect])
+        
         try:
-            scroll_info = await self.page.evaluate("""
-                () => {
-                    // Try to find chat list container - try multiple selectors
-                    let chatList = null;
-                    const selectors = [
-                        'div[data-testid="chatlist"]',
-                        'div[role="listbox"]',
-                        'div[aria-label*="Chat"]',
-                        '#pane-side',
-                        'div[data-testid="chatlist"] > div',
-                        'div[role="application"] > div > div'
-                    ];
-                    
-                    for (const selector of selectors) {
-                        const element = document.querySelector(selector);
-                        if (element) {
-                            // Check if element is scrollable
-                            const style = window.getComputedStyle(element);
-                            if (element.scrollHeight > element.clientHeight || 
-                                style.overflowY === 'auto' || 
-                                style.overflowY === 'scroll' ||
-                                element.scrollHeight > 0) {
-                                chatList = element;
-                                break;
-                            }
-                        }
-                    }
-                    
-                    if (chatList) {
-                        const oldScrollTop = chatList.scrollTop;
-                        const oldScrollHeight = chatList.scrollHeight;
-                        const oldClientHeight = chatList.clientHeight;
-                        
-                        // Calculate distance to bottom
-                        const distanceToBottom = chatList.scrollHeight - chatList.scrollTop - chatList.clientHeight;
-                        
-                        // Scroll strategy for virtual scrolling:
-                        // Always scroll to near bottom (not absolute bottom) to trigger loading
-                        // Virtual scrolling loads content as we approach bottom
-                        // Don't scroll to absolute bottom immediately - leave space for loading
-                        if (distanceToBottom > 500) {
-                            // Far from bottom, scroll by large amount to get closer
-                            const scrollAmount = Math.max(
-                                chatList.clientHeight * 2.0,  // 200% of viewport for faster loading
-                                1500  // Minimum 1500px
-                            );
-                            chatList.scrollTop += scrollAmount;
-                        } else {
-                            // Close to bottom, scroll to near bottom (not absolute) to trigger loading
-                            // Leave some space (200px) to allow virtual scrolling to load more
-                            chatList.scrollTop = chatList.scrollHeight - chatList.clientHeight - 200;
-                        }
-                        
-                        // Force a small delay to let virtual scrolling work
-                        // (actual delay happens in Python)
-                        
-                        // Wait a moment for virtual scrolling to update scrollHeight
-                        // (actual wait happens in Python)
-                        const newScrollHeight = chatList.scrollHeight;
-                        // More lenient bottom detection - consider bottom if within 300px
-                        // This prevents premature completion when virtual scrolling is still loading
-                        const atBottom = chatList.scrollTop >= chatList.scrollHeight - chatList.clientHeight - 300;
-                        
-                        return {
-                            scrolled: chatList.scrollTop !== oldScrollTop,
-                            scrollTop: chatList.scrollTop,
-                            scrollHeight: newScrollHeight,
-                            oldScrollHeight: oldScrollHeight,
-                            clientHeight: chatList.clientHeight,
-                            oldClientHeight: oldClientHeight,
-                            atBottom: atBottom,
-                            hasMoreContent: newScrollHeight > oldScrollHeight,
-                            scrollDelta: chatList.scrollTop - oldScrollTop
-                        };
-                    }
-                    
-                    // Fallback to window scroll
-                    const oldScrollTop = window.scrollY;
-                    const oldScrollHeight = document.body.scrollHeight;
-                    const scrollAmount = window.innerHeight * 0.9;
-                    window.scrollBy(0, scrollAmount);
-                    
-                    return {
-                        scrolled: window.scrollY !== oldScrollTop,
-                        scrollTop: window.scrollY,
-                        scrollHeight: document.body.scrollHeight,
-                        oldScrollHeight: oldScrollHeight,
-                        clientHeight: window.innerHeight,
-                        atBottom: window.scrollY >= document.body.scrollHeight - window.innerHeight - 200,
-                        hasMoreContent: document.body.scrollHeight > oldScrollHeight,
-                        scrollDelta: window.scrollY - oldScrollTop
-                    };
-                }
-            """)
-            
-            self._reached_bottom = scroll_info.get('atBottom', False)
-            scrolled = scroll_info.get('scrolled', False)
-            
-            if scrolled:
-                self._scroll_iterations += 1
-                logger.info(
-                    "DOM scroll: iteration=%d, scrollTop=%.0f, scrollHeight=%.0f, scrollDelta=%.0f, atBottom=%s, hasMoreContent=%s",
-                    self._scroll_iterations,
-                    scroll_info.get('scrollTop', 0),
-                    scroll_info.get('scrollHeight', 0),
-                    scroll_info.get('scrollDelta', 0),
-                    self._reached_bottom,
-                    scroll_info.get('hasMoreContent', False)
-                )
-            else:
-                logger.info("DOM scroll: could not scroll (atBottom=%s, scrollTop=%.0f, scrollHeight=%.0f)", 
-                           self._reached_bottom,
-                           scroll_info.get('scrollTop', 0),
-                           scroll_info.get('scrollHeight', 0))
-            
-            return scrolled
+            scroll_info = await self.page.evaluate(
+                "(selector) => window.__waDom.scrollForMore(selector)",
+                self._best_scroll_selector
+            )
+            return self._record_scroll(scroll_info)
             
         except Exception as e:
             logger.debug("Error scrolling: %s", str(e))
             return False
     
+    def _record_scroll(self, scroll_info: Dict[str, Any]) -> bool:
+        """
+        Update scroll state from a page-side scroll result.
+        
+        Returns:
+            True if scrolled
+        """
+        if scroll_info.get('containerSelector'):
+            self._best_scroll_selector = scroll_info['containerSelector']
+        
+        self._reached_bottom = scroll_info.get('atBottom', False)
+        scrolled = scroll_info.get('scrolled', False)
+        
+        if scrolled:
+            self._scroll_iterations += 1
+        
+        if not _debug_enabled(logging.DEBUG):
+            return scrolled
+        
+        if scrolled:
+            logger.debug(
+                "DOM scroll: iteration=%d, scrollTop=%.0f, scrollHeight=%.0f, scrollDelta=%.0f, atBottom=%s, hasMoreContent=%s",
+                self._scroll_iterations,
+                scroll_info.get('scrollTop', 0),
+                scroll_info.get('scrollHeight', 0),
+                scroll_info.get('scrollDelta', 0),
+                self._reached_bottom,
+                scroll_info.get('hasMoreContent', False)
+            )
+        else:
+            logger.debug("DOM scroll: could not scroll (atBottom=%s, scrollTop=%.0f, scrollHeight=%.0f)", 
+                        self._reached_bottom,
+                        scroll_info.get('scrollTop', 0),
+                        scroll_info.get('scrollHeight', 0))
+        
+        return scrolled
+    
     async def _scroll_to_bottom_aggressive(self):
         """
         Aggressively scroll to bottom to load all chats.
         This is used after first batch to trigger virtual scrolling.
         """
         try:
-            scroll_result = await self.page.evaluate("""
-                () => {
-                    // Try to find chat list container
-                    let chatList = null;
-                    const selectors = [
-                        'div[data-testid="chatlist"]',
-                        'div[role="listbox"]',
-                        'div[aria-label*="Chat"]',
-                        '#pane-side',
-                        'div[data-testid="chatlist"] > div',
-                        'div[role="application"] > div > div'
-                    ];
-                    
-                    for (const selector of selectors) {
-                        const element = document.querySelector(selector);
-                        if (element) {
-                            const style = window.getComputedStyle(element);
-                            if (element.scrollHeight > element.clientHeight || 
-                                style.overflowY === 'auto' || 
-                                style.overflowY === 'scroll' ||
-                                element.scrollHeight > 0) {
-                                chatList = element;
-                                break;
-                            }
-                        }
-                    }
-                    
-                    if (chatList) {
-                        const oldScrollTop = chatList.scrollTop;
-                        const oldScrollHeight = chatList.scrollHeight;
-                        
-                        // Scroll to absolute bottom
-                        chatList.scrollTop = chatList.scrollHeight;
-                        
-                        return {
-                            scrolled: true,
-                            oldScrollTop: oldScrollTop,
-                            oldScrollHeight: oldScrollHeight,
-                            newScrollTop: chatList.scrollTop,
-                            newScrollHeight: chatList.scrollHeight,
-                            scrollDelta: chatList.scrollTop - oldScrollTop
-                        };
-                    }
-                    
-                    // Fallback to window scroll
-                    const oldScrollTop = window.scrollY;
-                    const oldScrollHeight = document.body.scrollHeight;
-                    window.scrollTo(0, document.body.scrollHeight);
-                    
-                    return {
-                        scrolled: true,
-                        oldScrollTop: oldScrollTop,
-                        oldScrollHeight: oldScrollHeight,
-                        newScrollTop: window.scrollY,
-                        newScrollHeight: document.body.scrollHeight,
-                        scrollDelta: window.scrollY - oldScrollTop
-                    };
-                }
-            """)
+            # Waits page-side until new rows render (or the timeout passes)
+            scroll_result = await self.page.evaluate(
+                "(args) => window.__waDom.scrollToBottom(...args)",
+                [self._best_scroll_selector, AGGRESSIVE_SCROLL_WAIT_MS, SCROLL_STABLE_FRAMES]
+            )
+            if scroll_result.get('containerSelector'):
+                self._best_scroll_selector = scroll_result['containerSelector']
             
             if scroll_result.get('scrolled'):
                 logger.info(
@@ -554,72 +956,19 @@ class DOMChatSource(IChatSource):
                     scroll_result.get('newScrollHeight', 0)
                 )
                 
-                # Wait for virtual scrolling to load content, then check if more content loaded
-                await asyncio.sleep(2.0)  # Longer wait for aggressive scroll
-                
-                # Check if scrollHeight increased after waiting (virtual scrolling loaded more)
-                check_result = await self.page.evaluate("""
-                    () => {
-                        let chatList = null;
-                        const selectors = [
-                            'div[data-testid="chatlist"]',
-                            'div[role="listbox"]',
-                            'div[aria-label*="Chat"]',
-                            '#pane-side'
-                        ];
-                        
-                        for (const selector of selectors) {
-                            const element = document.querySelector(selector);
-                            if (element && element.scrollHeight > element.clientHeight) {
-                                chatList = element;
-                                break;
-                            }
-                        }
-                        
-                        if (chatList) {
-                            return {
-                                scrollHeight: chatList.scrollHeight,
-                                scrollTop: chatList.scrollTop,
-                                clientHeight: chatList.clientHeight
-                            };
-                        }
-                        return null;
-                    }
-                """)
-                
-                if check_result:
-                    old_height = scroll_result.get('newScrollHeight', 0)
-                    new_height = check_result.get('scrollHeight', 0)
-                    if new_height > old_height:
-                        logger.info(
-                            "DOM source: scrollHeight increased after wait: %.0f -> %.0f (virtual scrolling loaded more)",
-                            old_height, new_height
-                        )
-                        # Scroll again to new bottom
-                        await self.page.evaluate("""
-                            () => {
-                                let chatList = null;
-                                const selectors = [
-                                    'div[data-testid="chatlist"]',
-                                    'div[role="listbox"]',
-                                    'div[aria-label*="Chat"]',
-                                    '#pane-side'
-                                ];
-                                
-                                for (const selector of selectors) {
-                                    const element = document.querySelector(selector);
-                                    if (element && element.scrollHeight > element.clientHeight) {
-                                        chatList = element;
-                                        break;
-                                    }
-                                }
-                                
-                                if (chatList) {
-                                    chatList.scrollTop = chatList.scrollHeight;
-                                }
-                            }
-                        """)
-                        await asyncio.sleep(1.0)  # Wait again for more content
+                # Check if scrollHeight increased once rendering settled (virtual scrolling loaded more)
+                old_height = scroll_result.get('newScrollHeight', 0)
+                new_height = scroll_result.get('settledScrollHeight', 0)
+                if new_height > old_height:
+                    logger.info(
+                        "DOM source: scrollHeight increased after wait: %.0f -> %.0f (virtual scrolling loaded more)",
+                        old_height, new_height
+                    )
+                    # Scroll again to new bottom and wait for more content
+                    await self.page.evaluate(
+                        "(args) => window.__waDom.rescrollToBottom(...args)",
+                        [self._best_scroll_selector, AGGRESSIVE_RESCROLL_WAIT_MS]
+                    )
                 
                 # Reset bottom flag since we scrolled
                 self._reached_bottom = False
@@ -630,12 +979,12 @@ class DOMChatSource(IChatSource):
     async def is_complete(self) -> bool:
         """Check if DOM parsing is complete (heuristic-based)."""
         # Complete if:
-        # 1. Reached bottom AND no new chats found in last 5 iterations, OR
+        # 1. Reached bottom AND the same chats were extracted twice in a row, OR
         # 2. No new chats found in last 10 iterations (even if not at bottom - might be stuck)
         # 3. Safety limit: too many scroll iterations
         
-        if self._reached_bottom and self._no_new_chats_count >= 5:
-            logger.info("DOM source: complete - reached bottom and no new chats for %d iterations", self._no_new_chats_count)
+        if self._reached_bottom and self._visible_ids_unchanged:
+            logger.info("DOM source: complete - reached bottom and visible chats unchanged since last batch")
             return True
         
         if self._no_new_chats_count >= 10:
@@ -653,3 +1002,14 @@ class DOMChatSource(IChatSource):
         """DOM source doesn't know total count."""
         return None
 
+    
+    async def cleanup(self) -> None:
+        """Drop a prefetched batch that won't be fetched."""
+        pending = self._pending_collect
+        self._pending_collect = None
+        if pending is not None:
+            pending.cancel()
+            await asyncio.wait([pending])
+            if not pending.cancelled():
+                # Finished before the cancel; retrieve any error so it isn't reported as unhandled
+                pending.exception()
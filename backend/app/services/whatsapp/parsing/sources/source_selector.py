@@ -2,11 +2,15 @@
 Source selector - chooses the best available data source.
 """
 
-from typing import Dict, Optional, Tuple
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import logging
+import weakref
 
 from playwright.async_api import Page
 
+from ..models.raw_chat import _add_slots
 from .base import IChatSource, SourceUnavailableError
 from .store_chat_source import StoreChatSource
 from .cdp_network_chat_source import CDPNetworkChatSource
@@ -14,6 +18,106 @@ from .dom_chat_source import DOMChatSource
 
 logger = logging.getLogger(__name__)
 
+# (name, priority, class), highest priority first
+_SOURCES = (
+    ('store', 1, StoreChatSource),
+    ('network', 2, CDPNetworkChatSource),
+    ('dom', 3, DOMChatSource),
+)
+
+# Seconds the Store probe runs alone before CDP Network and DOM are started
+STORE_HEAD_START = 1.0
+
+# Source names as they appear in log messages
+_LOG_NAMES = {'store': 'Store', 'network': 'CDP Network', 'dom': 'DOM'}
+
+# Per page, the _SOURCES index that won the probe (None if it failed), held
+# in a future so concurrent callers wait for the probe in flight. Kept after
+# the probe only when the Store won; a degraded winner is probed again.
+_selection_cache: "weakref.WeakKeyDictionary[Page, asyncio.Future]" = weakref.WeakKeyDictionary()
+
+# Pages whose "close" event already evicts their cache entry
+_pages_with_close_hook: "weakref.WeakSet[Page]" = weakref.WeakSet()
+
+
+@_add_slots
+@dataclass
+class SourceAttempt:
+    """One source probed by select_source()."""
+    
+    source: str
+    priority: int
+    status: str = 'attempting'  # 'success', 'unavailable', 'error' or 'cancelled' once finished
+    reason: Optional[str] = None  # SourceUnavailableError message
+    error: Optional[str] = None  # Unexpected init() failure
+    
+    def to_dict(self) -> Dict:
+        """Serialize, leaving out the reason/error fields that weren't set."""
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+
+@_add_slots
+@dataclass
+class SelectionMetadata:
+    """Diagnostics for a select_source() call, serialized once at the end."""
+    
+    attempts: List[SourceAttempt] = field(default_factory=list)
+    selected_source: Optional[str] = None
+    selection_reason: Optional[str] = None
+    
+    @property
+    def errors(self) -> List[Dict]:
+        """Failures of the attempted sources, in attempt order."""
+        return [
+            {'source': attempt.source, 'error': attempt.reason or attempt.error}
+            for attempt in self.attempts
+            if attempt.reason or attempt.error
+        ]
+    
+    def to_dict(self) -> Dict:
+        """Build the metadata dictionary returned to callers."""
+        return {
+            'attempted_sources': [attempt.to_dict() for attempt in self.attempts],
+            'selected_source': self.selected_source,
+            'selection_reason': self.selection_reason,
+            'errors': self.errors,
+        }
+
+
+def _record_outcome(task: asyncio.Future, attempt: SourceAttempt) -> None:
+    """Record a finished init() task in its SourceAttempt."""
+    log_name = _LOG_NAMES[attempt.source]
+    if task.cancelled():
+        attempt.status = 'cancelled'
+        return
+    
+    error = task.exception()
+    if error is None:
+        attempt.status = 'success'
+    elif isinstance(error, SourceUnavailableError):
+        attempt.status = 'unavailable'
+        attempt.reason = str(error)
+        logger.warning("%s source unavailable: %s", log_name, attempt.reason)
+    else:
+        attempt.status = 'error'
+        attempt.error = str(error)
+        # The traceback is only formatted when debug logging is on
+        logger.warning("%s source failed: %s", log_name, attempt.error)
+        logger.debug("%s source failure traceback", log_name, exc_info=error)
+
+
+def _forget_page(page: Page) -> None:
+    """Drop the cached selection of a closed page."""
+    _selection_cache.pop(page, None)
+
+
+async def _cleanup_unselected(source: IChatSource) -> None:
+    """Release a source that was probed but not selected."""
+    try:
+        await source.cleanup()
+    except Exception as e:
+        logger.warning("Failed to clean up %s source: %s", source.source_name, str(e))
+
 
 class SourceSelector:
     """
@@ -23,6 +127,15 @@ class SourceSelector:
     1. StoreChatSource (preferred - most reliable)
     2. CDPNetworkChatSource (alternative - reliable IDs)
     3. DOMChatSource (fallback - least reliable)
+    
+    The Store is probed first; if it isn't ready within STORE_HEAD_START,
+    the others are initialized concurrently with it and a lower-priority
+    source is only used once every source above it has failed.
+    
+    A Store winner is remembered per page: later calls (parsing retries)
+    initialize a fresh instance of it directly. A degraded winner is not
+    remembered, so the Store gets another chance once it is ready. Calls
+    made while a probe is running wait for it instead of probing again.
     """
     
     @staticmethod
@@ -39,112 +152,172 @@ class SourceSelector:
             - is_degraded: True if fallback source was used (not preferred)
             - metadata: Dictionary with selection information for diagnostics
         """
-        metadata = {
-            'attempted_sources': [],
-            'selected_source': None,
-            'selection_reason': None,
-            'errors': []
-        }
+        cached = _selection_cache.get(page)
+        if cached is not None:
+            # Shielded: a cancelled caller must not cancel the shared probe
+            index = await asyncio.shield(cached)
+            if index is not None:
+                result = await SourceSelector._reuse_selection(page, index)
+                if result is not None:
+                    return result
+                if _selection_cache.get(page) is cached:
+                    del _selection_cache[page]
+        
+        selection = asyncio.get_event_loop().create_future()
+        _selection_cache[page] = selection
+        if page not in _pages_with_close_hook:
+            page.on("close", _forget_page)
+            _pages_with_close_hook.add(page)
+        
+        index = None
+        try:
+            index, source, metadata = await SourceSelector._probe(page)
+        finally:
+            selection.set_result(index)
+            if index != 0 and _selection_cache.get(page) is selection:
+                del _selection_cache[page]
         
-        # Try Store source first (preferred)
+        return await SourceSelector._selected(source, _SOURCES[index][0], metadata)
+    
+    @staticmethod
+    async def _probe(page: Page) -> Tuple[int, IChatSource, SelectionMetadata]:
+        """
+        Initialize the sources by priority and return the winner's _SOURCES index.
+        
+        Raises:
+            SourceUnavailableError: If every source fails to initialize
+        """
+        metadata = SelectionMetadata()
+        sources = []
+        attempts = metadata.attempts
+        tasks = {}
+        
+        def start(index: int) -> None:
+            name, priority, source_cls = _SOURCES[index]
+            source = source_cls(page)
+            sources.append(source)
+            attempts.append(SourceAttempt(name, priority))
+            tasks[asyncio.ensure_future(source.init())] = index
+        
+        selected = None
+        pending = set()
         try:
+            # Give the Store a head start: when it is healthy, the CDP session
+            # and DOM probing are never set up
             logger.info("Attempting to use Store source (priority 1)...")
-            metadata['attempted_sources'].append({
-                'source': 'store',
-                'priority': 1,
-                'status': 'attempting'
-            })
+            start(0)
+            done, pending = await asyncio.wait(set(tasks), timeout=STORE_HEAD_START)
+            for task in done:
+                _record_outcome(task, attempts[tasks[task]])
             
-            store_source = StoreChatSource(page)
-            await store_source.init()
-            
-            metadata['selected_source'] = 'store'
-            metadata['selection_reason'] = 'Preferred source available'
-            metadata['attempted_sources'][-1]['status'] = 'success'
+            if attempts[0].status == 'success':
+                selected = 0
+            else:
+                # Probe the rest concurrently with the Store (if it is still
+                # retrying); the highest-priority source that initializes wins
+                logger.info("Store not ready yet, probing CDP Network and DOM sources concurrently...")
+                for index in range(1, len(_SOURCES)):
+                    start(index)
+                pending = {task for task in tasks if not task.done()}
             
+            while pending and selected is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    _record_outcome(task, attempts[tasks[task]])
+                
+                # Selected once every higher-priority source has failed
+                for index, attempt in enumerate(attempts):
+                    if attempt.status == 'success':
+                        selected = index
+                    if attempt.status in ('attempting', 'success'):
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+                for task in pending:
+                    _record_outcome(task, attempts[tasks[task]])
+            for index, source in enumerate(sources):
+                if index != selected:
+                    await _cleanup_unselected(source)
+        
+        if selected is None:
+            logger.error("All sources failed, DOM source also unavailable: %s", attempts[-1].error)
+            raise SourceUnavailableError(
+                f"All chat sources are unavailable. Errors: {metadata.errors}"
+            )
+        
+        return selected, sources[selected], metadata
+    
+    @staticmethod
+    async def _reuse_selection(page: Page, index: int) -> Optional[Tuple[IChatSource, bool, Dict]]:
+        """Initialize a fresh instance of a page's previous winner, or None if it fails."""
+        name, priority, source_cls = _SOURCES[index]
+        source = source_cls(page)
+        attempt = SourceAttempt(name, priority)
+        task = asyncio.ensure_future(source.init())
+        try:
+            await asyncio.wait([task])
+        except asyncio.CancelledError:
+            task.cancel()
+            await _cleanup_unselected(source)
+            raise
+        
+        _record_outcome(task, attempt)
+        if attempt.status != 'success':
+            logger.info("Previously selected %s source failed, probing all sources again", _LOG_NAMES[name])
+            await _cleanup_unselected(source)
+            return None
+        
+        return await SourceSelector._selected(source, name, SelectionMetadata([attempt]))
+    
+    @staticmethod
+    async def _selected(
+        source: IChatSource,
+        name: str,
+        metadata: SelectionMetadata
+    ) -> Tuple[IChatSource, bool, Dict]:
+        """Log the selection and build the select_source() result."""
+        metadata.selected_source = name
+        
+        if name == 'store':
+            metadata.selection_reason = 'Preferred source available'
             logger.info(
                 "✓ Selected Store source (preferred) - total_count=%s",
-                await store_source.total_expected()
+                await source.total_expected()
             )
-            return store_source, False, metadata
-            
-        except SourceUnavailableError as e:
-            reason = str(e)
-            logger.warning("Store source unavailable: %s", reason)
-            metadata['attempted_sources'][-1]['status'] = 'unavailable'
-            metadata['attempted_sources'][-1]['reason'] = reason
-            metadata['errors'].append({'source': 'store', 'error': reason})
-            
-        except Exception as e:
-            error_msg = str(e)
-            logger.warning("Store source failed: %s", error_msg, exc_info=True)
-            metadata['attempted_sources'][-1]['status'] = 'error'
-            metadata['attempted_sources'][-1]['error'] = error_msg
-            metadata['errors'].append({'source': 'store', 'error': error_msg})
-        
-        # Try CDP Network source (alternative)
-        try:
-            logger.info("Attempting to use CDP Network source (priority 2)...")
-            metadata['attempted_sources'].append({
-                'source': 'network',
-                'priority': 2,
-                'status': 'attempting'
-            })
-            
-            network_source = CDPNetworkChatSource(page)
-            await network_source.init()
-            
-            metadata['selected_source'] = 'network'
-            metadata['selection_reason'] = 'Store unavailable, using CDP Network as alternative'
-            metadata['attempted_sources'][-1]['status'] = 'success'
-            
+            return source, False, metadata.to_dict()
+        
+        if name == 'network':
+            metadata.selection_reason = 'Store unavailable, using CDP Network as alternative'
             logger.info("✓ Selected CDP Network source (alternative - degraded from preferred)")
-            return network_source, True, metadata  # Degraded from preferred
-            
-        except SourceUnavailableError as e:
-            reason = str(e)
-            logger.warning("CDP Network source unavailable: %s", reason)
-            metadata['attempted_sources'][-1]['status'] = 'unavailable'
-            metadata['attempted_sources'][-1]['reason'] = reason
-            metadata['errors'].append({'source': 'network', 'error': reason})
-            
-        except Exception as e:
-            error_msg = str(e)
-            logger.warning("CDP Network source failed: %s", error_msg, exc_info=True)
-            metadata['attempted_sources'][-1]['status'] = 'error'
-            metadata['attempted_sources'][-1]['error'] = error_msg
-            metadata['errors'].append({'source': 'network', 'error': error_msg})
-        
-        # Fallback to DOM source
-        try:
-            logger.info("Falling back to DOM source (priority 3)...")
-            metadata['attempted_sources'].append({
-                'source': 'dom',
-                'priority': 3,
-                'status': 'attempting'
-            })
-            
-            dom_source = DOMChatSource(page)
-            await dom_source.init()
-            
-            metadata['selected_source'] = 'dom'
-            metadata['selection_reason'] = 'Store and CDP Network unavailable, using DOM fallback'
-            metadata['attempted_sources'][-1]['status'] = 'success'
-            
-            logger.warning(
-                "⚠ Selected DOM source (fallback - data quality may be reduced, "
-                "IDs may be less reliable)"
-            )
-            return dom_source, True, metadata  # Degraded
+            return source, True, metadata.to_dict()  # Degraded from preferred
+        
+        metadata.selection_reason = 'Store and CDP Network unavailable, using DOM fallback'
+        logger.warning(
+            "⚠ Selected DOM source (fallback - data quality may be reduced, "
+            "IDs may be less reliable)"
+        )
+        return source, True, metadata.to_dict()  # Degraded
+    
+    @staticmethod
+    async def on_empty_fallback(page: Page) -> IChatSource:
+        """
+        Get the fallback source for when the selected source returned no chats.
+        
+        Used when CDP Network initialized successfully but collected nothing.
+        
+        Args:
+            page: Playwright page instance
             
-        except Exception as e:
-            error_msg = str(e)
-            logger.error("All sources failed, DOM source also unavailable: %s", error_msg, exc_info=True)
-            metadata['attempted_sources'][-1]['status'] = 'error'
-            metadata['attempted_sources'][-1]['error'] = error_msg
-            metadata['errors'].append({'source': 'dom', 'error': error_msg})
+        Returns:
+            Initialized DOMChatSource
             
-            raise SourceUnavailableError(
-                f"All chat sources are unavailable. Errors: {metadata['errors']}"
-            ) from e
-
+        Raises:
+            SourceUnavailableError: If DOM source cannot be initialized
+        """
+        dom_source = DOMChatSource(page)
+        await dom_source.init()
+        logger.info("Switched to DOM source after empty CDP Network result")
+        return dom_source
@@ -2,8 +2,9 @@
 Store chat source - extracts chats from WhatsApp Web internal store.
 """
 
-from typing import List, Optional
+from typing import Any, List, Optional
 import logging
+import weakref
 
 from playwright.async_api import Page
 
@@ -12,6 +13,222 @@ from ..models.raw_chat import RawChat
 
 logger = logging.getLogger(__name__)
 
+# Chats serialized per page round-trip; larger lists stay in the page and
+# are fetched one slice per fetch_batch
+STORE_CHUNK_SIZE = 500
+
+# How long init() waits for the Store's chat models to appear, and how often
+# the page checks for them meanwhile
+STORE_WAIT_TIMEOUT_MS = 7500
+STORE_POLL_INTERVAL_MS = 100
+
+# Wait used instead when the page isn't on the logged-in chat UI (QR screen,
+# blank tab, click-to-chat link): the Store won't show up there, so the
+# selector falls back quickly
+STORE_NO_UI_WAIT_MS = 200
+
+WHATSAPP_WEB_URL = 'https://web.whatsapp.com'
+
+# Page-side helpers, installed once per page (see _install_helpers) so each
+# call ships a short dispatch instead of the full source:
+# - snapshot() resolves the Store, maps every chat and returns the first
+#   chunk; used by init() (whose chunk is kept for the first fetch_batch)
+#   and by fetch_batch() once the previous snapshot is exhausted
+# - chunk() returns a later slice of the snapshot
+# Chats are projected to rows one chunk at a time; rows are null for chats
+# that failed to parse, so an empty slice only means the page copy is gone
+_STORE_HELPERS_JS = """
+(() => {
+// Last successful resolution; the fallback chains below are stable for the
+// life of the document (a navigation reinstalls the helpers, resetting it)
+let resolved = null;
+
+// Returns [store, chatModels]; either may be null
+const resolveChatModels = () => {
+    if (resolved) {
+        return resolved;
+    }
+
+    // Try multiple possible Store locations
+    const store = window.Store || window.WWebJS || window.webpackChunkwhatsapp_web_client;
+    if (!store) {
+        return [null, null];
+    }
+
+    // Try multiple ways to access Chat models
+    let chatModels = null;
+
+    // Method 1: store.Chat.models (most common)
+    if (store.Chat && store.Chat.models) {
+        chatModels = store.Chat.models;
+    }
+    // Method 2: store.chats
+    else if (store.chats) {
+        chatModels = store.chats;
+    }
+    // Method 3: store.Chat (direct)
+    else if (store.Chat) {
+        chatModels = store.Chat;
+    }
+
+    if (!chatModels) {
+        return [store, null];
+    }
+    resolved = [store, chatModels];
+    return resolved;
+};
+
+// Positional row unpacked by fetch_batch(), or null if the chat can't be read
+const projectChat = (chat, index) => {
+    try {
+        // Extract JID - try different possible structures
+        let jid = null;
+        if (chat.id) {
+            // Most common: chat.id._serialized
+            if (chat.id._serialized) {
+                jid = chat.id._serialized;
+            }
+            // Alternative: chat.id.user (for personal chats)
+            else if (chat.id.user) {
+                jid = chat.id.user;
+            }
+            // Alternative: chat.id (if it's already a string)
+            else if (typeof chat.id === 'string') {
+                jid = chat.id;
+            }
+            // Last resort: try to stringify
+            else {
+                jid = String(chat.id);
+            }
+        }
+
+        // Extract wid (alternative ID format)
+        let wid = null;
+        if (chat.wid) {
+            wid = typeof chat.wid === 'string' ? chat.wid : chat.wid._serialized || String(chat.wid);
+        }
+
+        // Extract name - try multiple sources
+        let name = null;
+        if (chat.name) {
+            name = chat.name;
+        } else if (chat.contact && chat.contact.name) {
+            name = chat.contact.name;
+        } else if (chat.pushName) {
+            name = chat.pushName;
+        } else if (chat.formattedTitle) {
+            name = chat.formattedTitle;
+        }
+
+        // Determine if group; the model flags are set on almost every chat,
+        // so the JID suffix is only checked when neither is present
+        const groupFlag = chat.isGroup !== undefined ? chat.isGroup : chat.isGroupChat;
+        const isGroup = groupFlag !== undefined && groupFlag !== null
+            ? groupFlag === true
+            : typeof jid === 'string' && jid.endsWith('@g.us');
+
+        // Extract unread count
+        const unreadCount = chat.unreadCount || 
+                         chat.unread || 
+                         (chat.msgs && chat.msgs.unreadCount) ||
+                         0;
+
+        // Extract avatar URL
+        let avatarUrl = null;
+        if (chat.avatar) {
+            avatarUrl = typeof chat.avatar === 'string' ? chat.avatar : chat.avatar.url;
+        } else if (chat.profilePicUrl) {
+            avatarUrl = chat.profilePicUrl;
+        } else if (chat.pic) {
+            avatarUrl = typeof chat.pic === 'string' ? chat.pic : chat.pic.url;
+        }
+
+        // Positional row unpacked by fetch_batch()
+        return [jid, wid, name, isGroup, unreadCount, avatarUrl];
+    } catch (e) {
+        console.error('[StoreChatSource] Error parsing chat at index', index, ':', e);
+        return null;
+    }
+};
+
+window.__waStore = {
+    // True once the chat models are reachable
+    ready: () => !!resolveChatModels()[1],
+
+    // Resolve the Store, map every chat and return the first chunk; the
+    // Store keys (enumerating them is costly) are only listed when verbose
+    snapshot: (chunkSize, verbose) => {
+        const [store, chatModels] = resolveChatModels();
+        if (!store) {
+            return { available: false, reason: 'Store not found' };
+        }
+    
+        if (!chatModels) {
+            return {
+                available: false,
+                reason: 'Chat models not found',
+                storeKeys: verbose ? Object.keys(store).slice(0, 20) : undefined
+            };
+        }
+    
+        // Convert to array if it's a Map, Set, or object
+        let chats = [];
+        if (Array.isArray(chatModels)) {
+            chats = chatModels;
+        } else if (chatModels instanceof Map) {
+            chats = Array.from(chatModels.values());
+        } else if (chatModels instanceof Set) {
+            chats = Array.from(chatModels);
+        } else if (typeof chatModels === 'object') {
+            // Try to get values if it's an object with values() method
+            if (typeof chatModels.values === 'function') {
+                chats = Array.from(chatModels.values());
+            } else {
+                // Fallback: iterate over object keys
+                chats = Object.values(chatModels);
+            }
+        }
+    
+        // The rest is projected slice by slice in chunk(), so the mapped
+        // list is never held in full; only the model references are kept
+        if (chats.length > chunkSize) {
+            window.__waStoreChats = chats === chatModels ? chats.slice() : chats;
+        }
+    
+        return {
+            available: true,
+            totalCount: chats.length,
+            chats: chats.slice(0, chunkSize).map(projectChat)
+        };
+    },
+
+    // Project the next slice of the snapshot; the page copy is dropped with
+    // the last slice
+    chunk: (start, end) => {
+        const chats = window.__waStoreChats || [];
+        if (end >= chats.length) {
+            delete window.__waStoreChats;
+        }
+        return chats.slice(start, end).map((chat, i) => projectChat(chat, start + i));
+    },
+};
+})()
+"""
+
+# Dispatch calls; null means the helpers are missing from the current document
+# (_READY_CALL then reports ready so _call_helper can reinstall them)
+_READY_CALL = "() => window.__waStore ? window.__waStore.ready() : true"
+_SNAPSHOT_CALL = (
+    "([chunkSize, verbose]) => window.__waStore ? window.__waStore.snapshot(chunkSize, verbose) : null"
+)
+_CHUNK_CALL = "([start, end]) => window.__waStore ? window.__waStore.chunk(start, end) : null"
+
+# Whether the logged-in chat list is rendered
+_CHAT_LIST_PRESENT_CALL = "() => !!document.querySelector('#pane-side, [data-testid=\"chat-list\"]')"
+
+# Pages the helpers were registered on with add_init_script
+_pages_with_helpers: "weakref.WeakSet[Page]" = weakref.WeakSet()
+
 
 class StoreChatSource(IChatSource):
     """
@@ -29,6 +246,11 @@ class StoreChatSource(IChatSource):
         self._initialized = False
         self._total_count: Optional[int] = None
         self._store_available = False
+        # First chunk serialized by init(), consumed by the first fetch_batch
+        self._cached_chats: Optional[list] = None
+        # Chats of the current snapshot returned so far / in total
+        self._offset = 0
+        self._snapshot_count = 0
     
     @property
     def source_name(self) -> str:
@@ -36,114 +258,91 @@ class StoreChatSource(IChatSource):
     
     async def init(self) -> None:
         """Check if Store is available and get total count."""
-        import asyncio
+        try:
+            await self._install_helpers()
+        except Exception as e:
+            raise SourceUnavailableError(f"Failed to initialize Store: {str(e)}")
         
-        # Try multiple times with delays - Store might not be initialized immediately
-        max_attempts = 5
-        delay = 1.0
+        # Store might not be initialized immediately: wait page-side until
+        # the chat models appear instead of retrying from Python
+        wait_ms = await self._wait_budget_ms()
+        try:
+            await self.page.wait_for_function(
+                _READY_CALL,
+                timeout=wait_ms,
+                polling=STORE_POLL_INTERVAL_MS
+            )
+        except Exception as e:
+            # Timed out (or the page went away); the snapshot below reports why
+            logger.debug("Store not ready after %dms: %s", wait_ms, str(e))
         
-        for attempt in range(max_attempts):
-            try:
-                # Check if window.Store exists
-                store_info = await self.page.evaluate("""
-                    () => {
-                        // Try multiple possible Store locations
-                        const store = window.Store || window.WWebJS || window.webpackChunkwhatsapp_web_client;
-                        if (!store) {
-                            return { available: false, reason: 'Store not found' };
-                        }
-                        
-                        // Try to access Chat models
-                        let chatModels = null;
-                        if (store.Chat && store.Chat.models) {
-                            chatModels = store.Chat.models;
-                        } else if (store.chats) {
-                            chatModels = store.chats;
-                        } else if (store.Chat) {
-                            chatModels = store.Chat;
-                        }
-                        
-                        if (!chatModels) {
-                            return { 
-                                available: false, 
-                                reason: 'Chat models not found',
-                                storeKeys: Object.keys(store).slice(0, 20) // For debugging
-                            };
-                        }
-                        
-                        // Get count
-                        let totalCount = 0;
-                        if (Array.isArray(chatModels)) {
-                            totalCount = chatModels.length;
-                        } else if (chatModels instanceof Map || chatModels instanceof Set) {
-                            totalCount = chatModels.size;
-                        } else if (typeof chatModels === 'object') {
-                            totalCount = Object.keys(chatModels).length;
-                        }
-                        
-                        return {
-                            available: true,
-                            totalCount: totalCount,
-                            storeKeys: Object.keys(store).slice(0, 10) // First 10 keys for debugging
-                        };
-                    }
-                """)
-                
-                if store_info.get('available'):
-                    self._total_count = store_info.get('totalCount', 0)
-                    self._store_available = True
-                    self._initialized = True
-                    
-                    logger.info(
-                        "Store source initialized: total_count=%d (attempt %d/%d)",
-                        self._total_count,
-                        attempt + 1,
-                        max_attempts
-                    )
-                    return
-                
-                # If not available and not last attempt, wait and retry
-                if attempt < max_attempts - 1:
-                    reason = store_info.get('reason', 'Unknown')
-                    logger.debug(
-                        "Store not available yet: %s (attempt %d/%d, retrying in %.1fs)",
-                        reason,
-                        attempt + 1,
-                        max_attempts,
-                        delay
-                    )
-                    await asyncio.sleep(delay)
-                    delay *= 1.5  # Exponential backoff
-                else:
-                    # Last attempt failed
-                    reason = store_info.get('reason', 'Unknown')
-                    store_keys = store_info.get('storeKeys', [])
-                    logger.warning(
-                        "Store source unavailable after %d attempts: %s (store keys: %s)",
-                        max_attempts,
-                        reason,
-                        store_keys
-                    )
-                    raise SourceUnavailableError(f"Store not available: {reason}")
-                    
-            except SourceUnavailableError:
-                raise
-            except Exception as e:
-                if attempt < max_attempts - 1:
-                    logger.debug(
-                        "Store init attempt %d/%d failed: %s (retrying)",
-                        attempt + 1,
-                        max_attempts,
-                        str(e)
-                    )
-                    await asyncio.sleep(delay)
-                    delay *= 1.5
-                else:
-                    logger.error("Failed to initialize Store source after %d attempts: %s", max_attempts, str(e), exc_info=True)
-                    raise SourceUnavailableError(f"Failed to initialize Store: {str(e)}")
+        try:
+            # Last chance before giving up: ask for the Store keys to log
+            store_info = await self._call_helper(_SNAPSHOT_CALL, [STORE_CHUNK_SIZE, True])
+        except Exception as e:
+            logger.error("Failed to initialize Store source: %s", str(e), exc_info=True)
+            raise SourceUnavailableError(f"Failed to initialize Store: {str(e)}")
+        
+        if not store_info.get('available'):
+            reason = store_info.get('reason', 'Unknown')
+            store_keys = store_info.get('storeKeys') or []
+            logger.warning(
+                "Store source unavailable after %dms: %s (store keys: %s)",
+                wait_ms,
+                reason,
+                store_keys
+            )
+            raise SourceUnavailableError(f"Store not available: {reason}")
+        
+        self._total_count = store_info.get('totalCount', 0)
+        self._start_snapshot(store_info)
+        self._store_available = True
+        self._initialized = True
+        
+        logger.info("Store source initialized: total_count=%d", self._total_count)
+    
+    async def _wait_budget_ms(self) -> int:
+        """How long to wait for the Store: short unless the page shows the chat list."""
+        url = self.page.url
+        if not url.startswith(WHATSAPP_WEB_URL) or '/send' in url:
+            logger.info("Page is not on the WhatsApp Web chat UI (%s), probing Store once", url)
+            return STORE_NO_UI_WAIT_MS
+        
+        try:
+            has_chat_list = await self.page.evaluate(_CHAT_LIST_PRESENT_CALL)
+        except Exception as e:
+            logger.debug("Chat list check failed: %s", str(e))
+            return STORE_WAIT_TIMEOUT_MS
+        
+        if not has_chat_list:
+            logger.info("Chat list not rendered (logged out or still loading), probing Store once")
+            return STORE_NO_UI_WAIT_MS
+        return STORE_WAIT_TIMEOUT_MS
+    
+    async def _install_helpers(self) -> None:
+        """Install page-side helpers in the current document and any later one, once per page."""
+        if self.page in _pages_with_helpers:
+            return
+        await self.page.add_init_script(script=_STORE_HELPERS_JS)
+        await self.page.evaluate(_STORE_HELPERS_JS)
+        _pages_with_helpers.add(self.page)
+    
+    async def _call_helper(self, call: str, arg: Any) -> Any:
+        """Evaluate a helper dispatch, reinstalling the helpers if the document lost them."""
+        result = await self.page.evaluate(call, arg)
+        if result is None:
+            await self.page.evaluate(_STORE_HELPERS_JS)
+            result = await self.page.evaluate(call, arg)
+        return result
+    
+    def _start_snapshot(self, store_info: dict) -> None:
+        """Keep the first chunk of a Store snapshot for the next fetch_batch."""
+        self._cached_chats = store_info.get('chats') or []
+        self._offset = 0
+        self._snapshot_count = store_info.get('totalCount', len(self._cached_chats))
     
     async def fetch_batch(self) -> List[RawChat]:
-        """Fetch all chats from Store."""
+        """Fetch the next chunk of chats from Store (all of them for small lists)."""
         if not self._initialized:
             await self.init()
         
@@ -151,166 +350,57 @@ class StoreChatSource(IChatSource):
             return []
         
         try:
-            raw_chats_data = await self.page.evaluate("""
-                () => {
-                    const store = window.Store || window.WWebJS;
-                    if (!store) {
-                        console.warn('[StoreChatSource] Store not found');
-                        return [];
-                    }
-                    
-                    // Try multiple ways to access Chat models
-                    let chatModels = null;
-                    
-                    // Method 1: store.Chat.models (most common)
-                    if (store.Chat && store.Chat.models) {
-                        chatModels = store.Chat.models;
-                    }
-                    // Method 2: store.chats
-                    else if (store.chats) {
-                        chatModels = store.chats;
-                    }
-                    // Method 3: store.Chat (direct)
-                    else if (store.Chat) {
-                        chatModels = store.Chat;
-                    }
-                    
-                    if (!chatModels) {
-                        console.warn('[StoreChatSource] Chat models not found. Store keys:', Object.keys(store).slice(0, 20));
-                        return [];
-                    }
-                    
-                    // Convert to array if it's a Map, Set, or object
-                    let chats = [];
-                    if (Array.isArray(chatModels)) {
-                        chats = chatModels;
-                    } else if (chatModels instanceof Map) {
-                        chats = Array.from(chatModels.values());
-                    } else if (chatModels instanceof Set) {
-                        chats = Array.from(chatModels);
-                    } else if (typeof chatModels === 'object') {
-                        // Try to get values if it's an object with values() method
-                        if (typeof chatModels.values === 'function') {
-                            chats = Array.from(chatModels.values());
-                        } else {
-                            // Fallback: iterate over object keys
-                            chats = Object.values(chatModels);
-                        }
-                    }
-                    
-                    return chats.map((chat, index) => {
-                        try {
-                            // Extract JID - try different possible structures
-                            let jid = null;
-                            if (chat.id) {
-                                // Most common: chat.id._serialized
-                                if (chat.id._serialized) {
-                                    jid = chat.id._serialized;
-                                }
-                                // Alternative: chat.id.user (for personal chats)
-                                else if (chat.id.user) {
-                                    jid = chat.id.user;
-                                }
-                                // Alternative: chat.id (if it's already a string)
-                                else if (typeof chat.id === 'string') {
-                                    jid = chat.id;
-                                }
-                                // Last resort: try to stringify
-                                else {
-                                    jid = String(chat.id);
-                                }
-                            }
-                            
-                            // Extract wid (alternative ID format)
-                            let wid = null;
-                            if (chat.wid) {
-                                wid = typeof chat.wid === 'string' ? chat.wid : chat.wid._serialized || String(chat.wid);
-                            }
-                            
-                            // Extract name - try multiple sources
-                            let name = null;
-                            if (chat.name) {
-                                name = chat.name;
-                            } else if (chat.contact && chat.contact.name) {
-                                name = chat.contact.name;
-                            } else if (chat.pushName) {
-                                name = chat.pushName;
-                            } else if (chat.formattedTitle) {
-                                name = chat.formattedTitle;
-                            }
-                            
-                            // Determine if group
-                            const isGroup = chat.isGroup === true || 
-                                          chat.isGroupChat === true ||
-                                          (jid && jid.endsWith('@g.us')) ||
-                                          false;
-                            
-                            // Extract unread count
-                            const unreadCount = chat.unreadCount || 
-                                             chat.unread || 
-                                             (chat.msgs && chat.msgs.unreadCount) ||
-                                             0;
-                            
-                            // Extract avatar URL
-                            let avatarUrl = null;
-                            if (chat.avatar) {
-                                avatarUrl = typeof chat.avatar === 'string' ? chat.avatar : chat.avatar.url;
-                            } else if (chat.profilePicUrl) {
-                                avatarUrl = chat.profilePicUrl;
-                            } else if (chat.pic) {
-                                avatarUrl = typeof chat.pic === 'string' ? chat.pic : chat.pic.url;
-                            }
-                            
-                            return {
-                                jid: jid,
-                                wid: wid,
-                                name: name,
-                                isGroup: isGroup,
-                                unreadCount: unreadCount,
-                                avatarUrl: avatarUrl,
-                                rawData: {
-                                    // Store diagnostic info
-                                    hasId: !!chat.id,
-                                    hasContact: !!chat.contact,
-                                    hasName: !!chat.name,
-                                    idType: chat.id ? typeof chat.id : null,
-                                    chatIndex: index,
-                                }
-                            };
-                        } catch (e) {
-                            console.error('[StoreChatSource] Error parsing chat at index', index, ':', e);
-                            return null;
-                        }
-                    }).filter(chat => chat !== null); // Remove failed parses
-                }
-            """)
+            if self._cached_chats is None and self._offset >= self._snapshot_count:
+                # Previous snapshot exhausted: read the Store again
+                store_info = await self._call_helper(
+                    _SNAPSHOT_CALL,
+                    [STORE_CHUNK_SIZE, logger.isEnabledFor(logging.DEBUG)]
+                )
+                if not store_info.get('available'):
+                    logger.debug(
+                        "Store unavailable on re-read: %s (store keys: %s)",
+                        store_info.get('reason'),
+                        store_info.get('storeKeys')
+                    )
+                    return []
+                self._start_snapshot(store_info)
             
-            raw_chats = []
-            for chat_data in raw_chats_data:
-                if not chat_data:  # Skip null entries
-                    continue
-                    
-                raw_chat = RawChat(
-                    source="store",
-                    jid=chat_data.get('jid'),
-                    wid=chat_data.get('wid'),
-                    name=chat_data.get('name'),
-                    is_group=chat_data.get('isGroup', False),
-                    unread_count=chat_data.get('unreadCount', 0),
-                    avatar_url=chat_data.get('avatarUrl'),
-                    raw_data=chat_data.get('rawData', {})
+            if self._cached_chats is not None:
+                raw_chats_data = self._cached_chats
+                self._cached_chats = None
+            else:
+                raw_chats_data = await self._call_helper(
+                    _CHUNK_CALL,
+                    [self._offset, self._offset + STORE_CHUNK_SIZE]
                 )
-                raw_chats.append(raw_chat)
+            # An empty slice means the page copy is gone (e.g. reload); stop there
+            self._offset = self._offset + len(raw_chats_data) if raw_chats_data else self._snapshot_count
             
-            logger.info("Fetched %d chats from Store", len(raw_chats))
+            raw_chats = [
+                RawChat(
+                    source="store",
+                    jid=jid,
+                    wid=wid,
+                    name=name,
+                    is_group=is_group,
+                    unread_count=unread_count,
+                    avatar_url=avatar_url
+                )
+                for jid, wid, name, is_group, unread_count, avatar_url in filter(None, raw_chats_data)
+            ]
             
-            # Log diagnostic info if we got fewer chats than expected
-            if self._total_count and len(raw_chats) < self._total_count:
+            # Log diagnostic info if some chats couldn't be read
+            if len(raw_chats) < len(raw_chats_data):
                 logger.warning(
-                    "Fetched %d chats but expected %d from Store",
-                    len(raw_chats), self._total_count
+                    "Skipped %d Store chats that failed to parse",
+                    len(raw_chats_data) - len(raw_chats)
                 )
             
+            logger.info(
+                "Fetched %d chats from Store (%d/%d)",
+                len(raw_chats), self._offset, self._snapshot_count
+            )
+            
             return raw_chats
             
         except Exception as e:
@@ -318,8 +408,8 @@ class StoreChatSource(IChatSource):
             return []
     
     async def is_complete(self) -> bool:
-        """Store provides all chats at once, so always complete after first fetch."""
-        return True
+        """Complete once every chunk of the current Store snapshot was fetched."""
+        return self._cached_chats is None and self._offset >= self._snapshot_count
     
     async def total_expected(self) -> Optional[int]:
         """Return total count from Store."""
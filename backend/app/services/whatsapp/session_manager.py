@@ -3,17 +3,96 @@ Session management for WhatsApp Web
 """
 import asyncio
 import logging
+import os
 import shutil
+import stat
+import time
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 from playwright.async_api import BrowserContext, Page
 
 from app.services.whatsapp.browser_manager import BrowserManager
+from app.services.whatsapp.parsing.models.raw_chat import _add_slots
 
 logger = logging.getLogger(__name__)
 
+SECONDS_PER_DAY = 86400.0
+
+# Session directories deleted in parallel by cleanup_old_sessions
+MAX_DELETE_WORKERS = 8
+
+# Elements of the main interface, shown once a reused session is connected
+CONNECTED_SELECTORS = [
+    'div[data-testid="chatlist"]',
+    'div[role="listbox"]',
+    'div[data-testid="chat"]',
+    'div[aria-label*="Chat"]',
+]
+
+# QR code shown instead when the stored session is no longer logged in
+QR_SELECTOR = 'div[data-ref] canvas, div[data-ref] img'
+
+# Profile entries, relative to browser_data, where WhatsApp Web keeps its
+# login; without any of them the browser never got as far as the QR code
+PROFILE_MARKERS = (
+    os.path.join("Default", "IndexedDB"),
+    os.path.join("Default", "Local Storage"),
+)
+
+# Navigation timeout, and how long try_reuse_session then waits for either
+# the main interface or the QR code to render
+REUSE_NAVIGATION_TIMEOUT_MS = 30000
+REUSE_CONNECT_TIMEOUT_MS = 15000
+
+# 'connected' once a connected selector matches a visible element, 'qr' once
+# the QR code is shown, null while neither has rendered; all selectors are
+# checked in one page round-trip. Visibility is judged from offsetParent and
+# the layout boxes rather than a full getBoundingClientRect measurement.
+# Polled with wait_for_function by try_reuse_session and the QR flow
+PAGE_STATE_JS = """
+([connectedSelectors, qrSelector]) => {
+    for (const selector of connectedSelectors) {
+        const element = document.querySelector(selector);
+        if (element && (element.offsetParent !== null || element.getClientRects().length > 0)) {
+            return 'connected';
+        }
+    }
+    return document.querySelector(qrSelector) ? 'qr' : null;
+}
+"""
+
+
+def _age_days(mtime: float, now_ts: float) -> int:
+    """Whole days between a timestamp and now, for log messages."""
+    return int((now_ts - mtime) // SECONDS_PER_DAY)
+
+
+def utc_iso_now() -> str:
+    """Current UTC time as an ISO 8601 string (seconds precision) for session timestamps."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+
+
+@_add_slots
+@dataclass
+class SessionState:
+    """
+    In-memory state of a WhatsApp session
+    
+    Slotted, as one lives for every loaded session. Timestamps are ISO
+    strings; the optional fields stay None until the status sets them.
+    """
+    context: Optional[BrowserContext]
+    page: Optional[Page]
+    status: str  # 'waiting_qr', 'ready', 'expired' or 'failed'
+    expires_at: Optional[str] = None  # while waiting_qr
+    created_at: Optional[str] = None
+    connected_at: Optional[str] = None  # once ready
+    error: Optional[str] = None  # if failed
+
 
 class SessionManager:
     """Manages WhatsApp sessions on disk and in memory"""
@@ -21,8 +100,12 @@ class SessionManager:
     def __init__(self, sessions_dir: Path, browser_manager: BrowserManager):
         self.sessions_dir = sessions_dir
         self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self._sessions_dir_str = str(sessions_dir)
         self.browser_manager = browser_manager
-        self.sessions: Dict[str, Dict] = {}  # session_id -> {context, page, status, ...}
+        self.sessions: Dict[str, SessionState] = {}
+        # IDs of sessions whose status is 'ready', kept in step by set_session
+        # and cleanup_session
+        self._ready_sessions: Set[str] = set()
     
     def get_session_path(self, session_id: str) -> Path:
         """Get path to WhatsApp session directory"""
@@ -30,35 +113,54 @@ class SessionManager:
     
     def list_existing_sessions(self) -> List[str]:
         """List all existing session IDs from disk"""
-        if not self.sessions_dir.exists():
-            return []
+        return list(self.iter_existing_sessions())
+    
+    def iter_existing_sessions(self) -> Iterator[str]:
+        """
+        Yield existing session IDs from disk as the directory is scanned.
+        
+        Callers that stop early skip the stat calls for the remaining sessions.
+        """
+        try:
+            entries = os.scandir(self.sessions_dir)
+        except FileNotFoundError:
+            return
         
-        sessions = []
-        for item in self.sessions_dir.iterdir():
-            if item.is_dir():
-                # Check if session has browser_data (indicates it was used)
-                browser_data_path = item / "browser_data"
-                if browser_data_path.exists():
-                    sessions.append(item.name)
-        return sessions
+        # scandir entries answer is_dir() from the directory listing,
+        # leaving one stat per session for browser_data
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Check if session has browser_data (indicates it was used)
+                    if os.path.exists(os.path.join(entry.path, "browser_data")):
+                        yield entry.name
     
     async def check_session_exists(self, session_id: str) -> bool:
         """Check if session directory exists on disk"""
-        session_path = self.get_session_path(session_id)
-        return session_path.exists()
+        # Sessions loaded in memory were started from their directory
+        if session_id in self.sessions:
+            return True
+        return os.path.exists(os.path.join(self._sessions_dir_str, session_id))
     
-    def get_session(self, session_id: str) -> Optional[Dict]:
+    def get_session(self, session_id: str) -> Optional[SessionState]:
         """Get session from memory cache"""
         return self.sessions.get(session_id)
     
-    def set_session(self, session_id: str, session_data: Dict):
-        """Store session in memory cache"""
+    def set_session(self, session_id: str, session_data: SessionState):
+        """
+        Store session in memory cache
+        
+        Status changes must go through here to be seen by is_session_ready.
+        """
         self.sessions[session_id] = session_data
+        if session_data.status == 'ready':
+            self._ready_sessions.add(session_id)
+        else:
+            self._ready_sessions.discard(session_id)
     
     def is_session_ready(self, session_id: str) -> bool:
         """Check if session exists in memory and is ready"""
-        session = self.sessions.get(session_id)
-        return session is not None and session.get('status') == 'ready'
+        return session_id in self._ready_sessions
     
     async def try_reuse_session(self, session_id: str) -> Dict:
         """
@@ -72,22 +174,34 @@ class SessionManager:
             return {
                 "reused": True,
                 "status": "ready",
-                "connected_at": existing_session.get('connected_at', '')
+                "connected_at": existing_session.connected_at or ''
             }
         
-        session_path = self.get_session_path(session_id)
+        session_dir = os.path.join(self._sessions_dir_str, session_id)
+        browser_data_dir = os.path.join(session_dir, "browser_data")
         
-        if not session_path.exists():
+        # A single stat covers both directories; the session directory is
+        # only looked at again to tell which one is missing
+        try:
+            has_browser_data = stat.S_ISDIR(os.stat(browser_data_dir).st_mode)
+        except OSError:
+            has_browser_data = False
+        
+        if not has_browser_data:
+            if not os.path.exists(session_dir):
+                return {
+                    "reused": False,
+                    "reason": "Session directory not found"
+                }
             return {
                 "reused": False,
-                "reason": "Session directory not found"
+                "reason": "No browser data found"
             }
         
-        browser_data_path = session_path / "browser_data"
-        if not browser_data_path.exists():
+        if not self._has_usable_profile(browser_data_dir):
             return {
                 "reused": False,
-                "reason": "No browser data found"
+                "reason": "No usable profile data"
             }
         
         # Try to load the session
@@ -100,46 +214,44 @@ class SessionManager:
                 return {
                     "reused": True,
                     "status": "ready",
-                    "connected_at": existing_session.get('connected_at', '')
+                    "connected_at": existing_session.connected_at or ''
                 }
             
             # Create browser context with existing persistent storage
-            user_data_dir = str(browser_data_path)
+            user_data_dir = browser_data_dir
             context = await self.browser_manager.create_persistent_context(user_data_dir)
             page = await self.browser_manager.create_page(context)
             
             # Navigate to WhatsApp Web
-            await page.goto('https://web.whatsapp.com', wait_until='networkidle')
-            await asyncio.sleep(3)  # Wait for page to load
-            
-            # Check if already connected (look for chat list or main interface)
-            connected_selectors = [
-                'div[data-testid="chatlist"]',
-                'div[role="listbox"]',
-                'div[data-testid="chat"]',
-                'div[aria-label*="Chat"]',
-            ]
+            # WhatsApp Web keeps long-polling, so networkidle can take tens
+            # of seconds; wait for the interface itself instead
+            await page.goto(
+                'https://web.whatsapp.com',
+                wait_until='domcontentloaded',
+                timeout=REUSE_NAVIGATION_TIMEOUT_MS
+            )
             
-            is_connected = False
-            for selector in connected_selectors:
-                try:
-                    element = await page.query_selector(selector)
-                    if element:
-                        box = await element.bounding_box()
-                        if box and box['width'] > 0 and box['height'] > 0:
-                            is_connected = True
-                            break
-                except Exception:
-                    continue
+            # Check if already connected (look for chat list or main interface),
+            # polling page-side until it or the QR code shows up
+            try:
+                state = await page.wait_for_function(
+                    PAGE_STATE_JS,
+                    arg=[CONNECTED_SELECTORS, QR_SELECTOR],
+                    timeout=REUSE_CONNECT_TIMEOUT_MS
+                )
+                is_connected = await state.json_value() == 'connected'
+            except Exception as e:
+                logger.debug("Main interface not shown for session %s: %s", session_id, str(e))
+                is_connected = False
             
             if is_connected:
                 # Session is valid and connected
-                self.sessions[session_id] = {
-                    'context': context,
-                    'page': page,
-                    'status': 'ready',
-                    'connected_at': datetime.utcnow().isoformat(),
-                }
+                self.set_session(session_id, SessionState(
+                    context=context,
+                    page=page,
+                    status='ready',
+                    connected_at=utc_iso_now(),
+                ))
                 
                 logger.info(
                     "Successfully reused WhatsApp session %s",
@@ -153,10 +265,11 @@ class SessionManager:
                 return {
                     "reused": True,
                     "status": "ready",
-                    "connected_at": self.sessions[session_id]['connected_at']
+                    "connected_at": self.sessions[session_id].connected_at
                 }
             else:
-                # Session exists but not connected - need QR
+                # Session exists but not connected - need QR. Closing also
+                # evicts it from the pool; nothing else would ever close it
                 await context.close()
                 return {
                     "reused": False,
@@ -178,13 +291,29 @@ class SessionManager:
                 "reason": f"Error reusing session: {str(e)}"
             }
     
+    @staticmethod
+    def _has_usable_profile(browser_data_dir: str) -> bool:
+        """
+        Check that browser_data holds a Chromium profile WhatsApp Web wrote to
+        
+        A few stat calls, so a directory that can't hold a login is turned
+        down before paying for a browser launch.
+        """
+        return any(
+            os.path.exists(os.path.join(browser_data_dir, marker))
+            for marker in PROFILE_MARKERS
+        )
+    
     async def cleanup_session(self, session_id: str) -> bool:
         """Cleanup and close a session"""
-        if session_id not in self.sessions:
+        # Removed before closing so concurrent cleanups of the same session
+        # (e.g. during shutdown) close its context only once
+        session = self.sessions.pop(session_id, None)
+        if session is None:
             return False
+        self._ready_sessions.discard(session_id)
         
-        session = self.sessions[session_id]
-        context: Optional[BrowserContext] = session.get('context')
+        context = session.context
         
         if context:
             try:
@@ -192,7 +321,6 @@ class SessionManager:
             except Exception as e:
                 logger.warning("Error closing context for session %s: %s", session_id, str(e))
         
-        del self.sessions[session_id]
         logger.info("Session %s cleaned up", session_id)
         return True
     
@@ -214,72 +342,142 @@ class SessionManager:
         if not self.sessions_dir.exists():
             return {"deleted": 0, "kept": 0, "total_before": 0}
         
+        to_delete, kept_count, now_ts = self._plan_cleanup(max_age_days, max_sessions)
+        deleted_count = self._delete_sessions(to_delete, now_ts)
+        return self._cleanup_stats(to_delete, kept_count, deleted_count)
+    
+    async def cleanup_old_sessions_async(
+        self,
+        max_age_days: int = 7,
+        max_sessions: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Cleanup old sessions from disk without blocking the event loop
+        
+        The directory scan is a few stat calls and stays on the loop; each
+        rmtree runs in the default executor and they are awaited together.
+        Takes the same arguments and returns the same statistics as
+        cleanup_old_sessions.
+        """
+        if not self.sessions_dir.exists():
+            return {"deleted": 0, "kept": 0, "total_before": 0}
+        
+        to_delete, kept_count, now_ts = self._plan_cleanup(max_age_days, max_sessions)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(None, shutil.rmtree, session_info["path"]) for session_info, _ in to_delete),
+            return_exceptions=True
+        )
+        deleted_count = sum(
+            self._log_deletion(session_info, reason, now_ts, result)
+            for (session_info, reason), result in zip(to_delete, results)
+        )
+        return self._cleanup_stats(to_delete, kept_count, deleted_count)
+    
+    def _plan_cleanup(
+        self,
+        max_age_days: int,
+        max_sessions: Optional[int]
+    ) -> Tuple[List[Tuple[Dict, str]], int, float]:
+        """
+        Scan sessions on disk and pick the ones to delete.
+        
+        Returns:
+            (session_info, reason shown in the log line) for each session to
+            delete, the number of sessions kept and the scan timestamp
+        """
         sessions_to_check = []
-        cutoff_date = datetime.now() - timedelta(days=max_age_days)
+        # Raw float timestamps: st_mtime is compared as-is and ages are only
+        # computed for log messages
+        now_ts = time.time()
+        cutoff_ts = now_ts - max_age_days * SECONDS_PER_DAY
         
-        # Collect all sessions with their metadata
-        for item in self.sessions_dir.iterdir():
-            if not item.is_dir():
-                continue
-            
-            browser_data_path = item / "browser_data"
-            if not browser_data_path.exists():
-                continue
-            
-            # Get modification time of browser_data directory
-            try:
-                mtime = datetime.fromtimestamp(browser_data_path.stat().st_mtime)
+        # Collect all sessions with their metadata; scandir entries answer
+        # is_dir() from the directory listing and a single stat of
+        # browser_data gives both its existence and its mtime
+        with os.scandir(self.sessions_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                
+                # Get modification time of browser_data directory
+                try:
+                    mtime = os.stat(os.path.join(entry.path, "browser_data")).st_mtime
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logger.warning("Error checking session %s: %s", entry.name, str(e))
+                    continue
+                
                 sessions_to_check.append({
-                    "id": item.name,
-                    "path": item,
+                    "id": entry.name,
+                    "path": entry.path,
                     "mtime": mtime,
-                    "age_days": (datetime.now() - mtime).days
                 })
-            except Exception as e:
-                logger.warning("Error checking session %s: %s", item.name, str(e))
-                continue
         
-        deleted_count = 0
         kept_count = 0
+        to_delete = []
         
         # Sort by modification time (newest first)
-        sessions_to_check.sort(key=lambda x: x["mtime"], reverse=True)
+        sessions_to_check.sort(key=itemgetter("mtime"), reverse=True)
         
         # If max_sessions is set, keep only the N most recent
         if max_sessions and len(sessions_to_check) > max_sessions:
-            sessions_to_delete = sessions_to_check[max_sessions:]
-            for session_info in sessions_to_delete:
-                try:
-                    shutil.rmtree(session_info["path"])
-                    deleted_count += 1
-                    logger.info("Deleted old session %s (age: %d days, exceeded max_sessions limit)", 
-                              session_info["id"], session_info["age_days"])
-                except Exception as e:
-                    logger.warning("Error deleting session %s: %s", session_info["id"], str(e))
+            for session_info in sessions_to_check[max_sessions:]:
+                to_delete.append((session_info, ", exceeded max_sessions limit"))
             
             # Update kept_count for remaining sessions
             sessions_to_check = sessions_to_check[:max_sessions]
         
         # Delete sessions older than max_age_days
         for session_info in sessions_to_check:
-            if session_info["mtime"] < cutoff_date:
-                # Skip if already deleted
-                if not session_info["path"].exists():
-                    continue
-                
-                try:
-                    shutil.rmtree(session_info["path"])
-                    deleted_count += 1
-                    logger.info("Deleted old session %s (age: %d days)", 
-                              session_info["id"], session_info["age_days"])
-                except Exception as e:
-                    logger.warning("Error deleting session %s: %s", session_info["id"], str(e))
+            if session_info["mtime"] < cutoff_ts:
+                to_delete.append((session_info, ""))
             else:
-                if session_info["path"].exists():
-                    kept_count += 1
+                kept_count += 1
         
+        return to_delete, kept_count, now_ts
+    
+    @staticmethod
+    def _cleanup_stats(to_delete: List[Tuple[Dict, str]], kept_count: int, deleted_count: int) -> Dict[str, int]:
+        """Build the statistics returned by the cleanup methods"""
+        # Sessions left after the max_sessions cut: the kept ones and those
+        # deleted for their age
+        checked_count = kept_count + sum(1 for _, reason in to_delete if not reason)
         return {
             "deleted": deleted_count,
             "kept": kept_count,
-            "total_before": len(sessions_to_check) + deleted_count
+            "total_before": checked_count + deleted_count
         }
+    
+    @staticmethod
+    def _log_deletion(session_info: Dict, reason: str, now_ts: float, error: Optional[BaseException]) -> bool:
+        """Log the outcome of deleting one session, returning whether it was removed"""
+        if error is not None:
+            logger.warning("Error deleting session %s: %s", session_info["id"], str(error))
+            return False
+        logger.info("Deleted old session %s (age: %d days%s)",
+                  session_info["id"], _age_days(session_info["mtime"], now_ts), reason)
+        return True
+    
+    @staticmethod
+    def _delete_sessions(to_delete: List[Tuple[Dict, str]], now_ts: float) -> int:
+        """
+        Delete session directories concurrently, returning how many were removed.
+        
+        The trees are independent, so their rmtree walks overlap on a small
+        thread pool instead of running one after another.
+        """
+        if not to_delete:
+            return 0
+        
+        deleted_count = 0
+        with ThreadPoolExecutor(max_workers=min(MAX_DELETE_WORKERS, len(to_delete))) as executor:
+            futures = {
+                executor.submit(shutil.rmtree, session_info["path"]): (session_info, reason)
+                for session_info, reason in to_delete
+            }
+            for future in as_completed(futures):
+                session_info, reason = futures[future]
+                deleted_count += SessionManager._log_deletion(session_info, reason, now_ts, future.exception())
+        return deleted_count
@@ -1,9 +1,10 @@
 """
 Main WhatsApp service - facade that composes all components
 """
+import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, AsyncGenerator
+from typing import Dict, Iterator, List, Optional, AsyncGenerator
 
 from app.core.config import settings
 from app.services.whatsapp.browser_manager import BrowserManager
@@ -43,9 +44,12 @@ class WhatsAppConnectService:
     
     async def shutdown(self):
         """Shutdown all browsers and cleanup"""
-        # Cleanup all sessions
-        for session_id in list(self.session_manager.sessions.keys()):
-            await self.session_manager.cleanup_session(session_id)
+        # Cleanup all sessions, closing their contexts concurrently
+        session_ids = list(self.session_manager.sessions)
+        await asyncio.gather(
+            *(self.session_manager.cleanup_session(session_id) for session_id in session_ids),
+            return_exceptions=True
+        )
         
         await self.browser_manager.shutdown()
     
@@ -58,10 +62,18 @@ class WhatsAppConnectService:
         """List all existing session IDs from disk"""
         return self.session_manager.list_existing_sessions()
     
+    def iter_existing_sessions(self) -> Iterator[str]:
+        """Yield existing session IDs from disk as they are found"""
+        return self.session_manager.iter_existing_sessions()
+    
     def cleanup_old_sessions(self, max_age_days: int = 7, max_sessions: Optional[int] = None) -> Dict[str, int]:
         """Cleanup old sessions from disk"""
         return self.session_manager.cleanup_old_sessions(max_age_days, max_sessions)
     
+    async def cleanup_old_sessions_async(self, max_age_days: int = 7, max_sessions: Optional[int] = None) -> Dict[str, int]:
+        """Cleanup old sessions from disk, deleting them off the event loop"""
+        return await self.session_manager.cleanup_old_sessions_async(max_age_days, max_sessions)
+    
     async def check_session_exists(self, session_id: str) -> bool:
         """Check if session directory exists on disk"""
         return await self.session_manager.check_session_exists(session_id)
@@ -95,12 +107,11 @@ class WhatsAppConnectService:
         Uses new ChatParsingOrchestrator with multi-source support.
         Returns batches of chats in old format for backward compatibility.
         """
-        session = self.session_manager.get_session(session_id)
-        if not session or session.get('status') != 'ready':
+        if not self.session_manager.is_session_ready(session_id):
             logger.warning("Session %s not ready for get_chats_streaming", session_id)
             return
         
-        page = session['page']
+        page = self.session_manager.get_session(session_id).page
         
         # Use new orchestrator
         async for result in self.chat_orchestrator.parse_chats_streaming(page):
@@ -117,12 +128,11 @@ class WhatsAppConnectService:
         Uses new ChatParsingOrchestrator with multi-source support.
         Returns chats in old format for backward compatibility.
         """
-        session = self.session_manager.get_session(session_id)
-        if not session or session.get('status') != 'ready':
+        if not self.session_manager.is_session_ready(session_id):
             logger.warning("Session %s not ready for get_chats", session_id)
             return []
         
-        page = session['page']
+        page = self.session_manager.get_session(session_id).page
         
         # Use new orchestrator
         result = await self.chat_orchestrator.parse_chats(page)
@@ -136,8 +146,7 @@ class WhatsAppConnectService:
         
         Returns ParsingResult with completeness, anomalies, and metadata.
         """
-        session = self.session_manager.get_session(session_id)
-        if not session or session.get('status') != 'ready':
+        if not self.session_manager.is_session_ready(session_id):
             logger.warning("Session %s not ready for get_chats_with_metadata", session_id)
             from app.services.whatsapp.parsing.models.parsing_result import ParsingResult
             return ParsingResult(
@@ -147,7 +156,7 @@ class WhatsAppConnectService:
                 source_type="unknown"
             )
         
-        page = session['page']
+        page = self.session_manager.get_session(session_id).page
         return await self.chat_orchestrator.parse_chats(page)
     
     # Message methods
@@ -159,23 +168,21 @@ class WhatsAppConnectService:
         chat_name: Optional[str] = None
     ) -> AsyncGenerator[Dict, None]:
         """Stream messages from a specific WhatsApp chat as they are loaded"""
-        session = self.session_manager.get_session(session_id)
-        if not session or session.get('status') != 'ready':
+        if not self.session_manager.is_session_ready(session_id):
             logger.warning("Session %s not ready for get_chat_messages_streaming", session_id)
             return
         
-        page = session['page']
+        page = self.session_manager.get_session(session_id).page
         async for item in self.message_parser.parse_messages_streaming(page, chat_id, limit, chat_name):
             yield item
     
     async def get_chat_messages(self, session_id: str, chat_id: str) -> List[Dict]:
         """Get messages from a specific WhatsApp chat"""
-        session = self.session_manager.get_session(session_id)
-        if not session or session.get('status') != 'ready':
+        if not self.session_manager.is_session_ready(session_id):
             logger.warning("Session %s not ready for get_chat_messages", session_id)
             return []
         
-        page = session['page']
+        page = self.session_manager.get_session(session_id).page
         return await self.message_parser.parse_messages(page, chat_id)
     
     # Backward compatibility: expose sessions dict for any code that might access it directly
@@ -5,6 +5,7 @@ Manages WhatsApp Web connections via whatsapp-web.js or selenium
 import json
 import base64
 import qrcode
+from functools import lru_cache
 from io import BytesIO
 from typing import Optional, Dict, List
 from pathlib import Path
@@ -22,6 +23,32 @@ class WhatsAppConnectionStatus(str, Enum):
     FAILED = "failed"
 
 
+@lru_cache(maxsize=1024)
+def _render_qr_b64(session_id: str) -> str:
+    """
+    Render the connection QR code of a session as a base64 PNG.
+    
+    The payload only depends on the session ID, so each image is built once.
+    """
+    # Generate a mock QR code data (in production, this would come from WhatsApp Web API)
+    # Format: whatsapp://connect?session_id=xxx
+    qr_data = f"whatsapp://connect?session={session_id}"
+    
+    # Generate QR code
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+    
+    img = qr.make_image(fill_color="black", back_color="white")
+    
+    # Convert to base64; a two-colour image barely benefits from heavier
+    # zlib levels
+    buffered = BytesIO()
+    img.save(buffered, format="PNG", compress_level=1)
+    # getbuffer() exposes the written bytes without copying them out first
+    return base64.b64encode(buffered.getbuffer()).decode()
+
+
 class WhatsAppClient:
     """
     WhatsApp Web client manager
@@ -63,22 +90,7 @@ class WhatsAppClient:
             return None
         
         session = self.active_sessions[session_id]
-        
-        # Generate a mock QR code data (in production, this would come from WhatsApp Web API)
-        # Format: whatsapp://connect?session_id=xxx
-        qr_data = f"whatsapp://connect?session={session_id}"
-        
-        # Generate QR code
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+        img_str = _render_qr_b64(session_id)
         
         session["status"] = WhatsAppConnectionStatus.QR_CODE.value
         session["qr_code"] = img_str
@@ -0,0 +1,31 @@
+"""
+Unit tests for WhatsApp client.
+"""
+
+import base64
+from unittest import mock
+
+from app.services import whatsapp_client
+from app.services.whatsapp_client import WhatsAppClient, WhatsAppConnectionStatus
+
+
+class TestGenerateQrCode:
+    """Tests for WhatsAppClient.generate_qr_code."""
+
+    def test_qr_code_rendered_once_per_session(self, tmp_path):
+        """Test that repeated calls reuse the PNG rendered for the session."""
+        client = WhatsAppClient(tmp_path)
+        session_id = client.create_session()
+
+        with mock.patch.object(whatsapp_client.qrcode, 'QRCode', wraps=whatsapp_client.qrcode.QRCode) as qr_cls:
+            first = client.generate_qr_code(session_id)
+            second = client.generate_qr_code(session_id)
+
+        assert first == second
+        assert qr_cls.call_count == 1
+        assert base64.b64decode(first).startswith(b'\x89PNG')
+        assert client.get_connection_status(session_id)['status'] == WhatsAppConnectionStatus.QR_CODE.value
+
+    def test_unknown_session_has_no_qr_code(self, tmp_path):
+        """Test that sessions that weren't created get no QR code."""
+        assert WhatsAppClient(tmp_path).generate_qr_code('missing') is None
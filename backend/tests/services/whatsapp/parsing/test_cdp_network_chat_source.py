@@ -0,0 +1,272 @@
+"""
+Unit tests for CDP Network chat source.
+"""
+
+import asyncio
+import base64
+import json
+from unittest import mock
+
+from app.services.whatsapp.parsing.sources.cdp_network_chat_source import CDPNetworkChatSource
+
+
+class FakeCDPSession:
+    """Minimal CDP session capturing event handlers and serving bodies."""
+
+    def __init__(self, bodies, delay=0.0):
+        self.bodies = bodies
+        self.delay = delay
+        self.handlers = {}
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self.bodies[params['requestId']]
+        finally:
+            self.in_flight -= 1
+
+    async def detach(self):
+        pass
+
+
+def _make_source(bodies):
+    source = CDPNetworkChatSource(page=None)
+    source.cdp_session = FakeCDPSession(bodies)
+    return source
+
+
+def _deliver(source, *events):
+    """Feed response events to the listener and wait for bodies to be parsed."""
+    async def run():
+        source._setup_response_listener()
+        handler = source.cdp_session.handlers['Network.responseReceived']
+        for event in events:
+            handler(event)
+        await asyncio.wait_for(source._pending.join(), timeout=1.0)
+        await source.cleanup()
+
+    asyncio.run(run())
+
+
+def _chats_by_id(source):
+    return dict(zip(source._ids, source._build_chats()))
+
+
+def _response_event(request_id, url='https://web.whatsapp.com/chats', mime_type='application/json'):
+    return {
+        'requestId': request_id,
+        'response': {'url': url, 'mimeType': mime_type, 'status': 200},
+    }
+
+
+PAYLOAD = {
+    'chats': [
+        {'id': {'_serialized': '1@c.us', 'user': '1'}, 'name': 'Alice', 'unreadCount': 2},
+        {'id': '2@g.us', 'name': 'Team', 'isGroup': True},
+    ],
+    'total': 2,
+}
+
+
+class TestCDPNetworkChatSource:
+    """Tests for CDPNetworkChatSource response handling."""
+
+    def test_parses_plain_json_response(self):
+        """Test that chats are collected from a plain JSON body."""
+        source = _make_source({'r1': {'body': json.dumps(PAYLOAD), 'base64Encoded': False}})
+        _deliver(source, _response_event('r1'))
+
+        chats = _chats_by_id(source)
+        assert set(chats) == {'1@c.us', '2@g.us'}
+        assert chats['1@c.us'].name == 'Alice'
+        assert chats['1@c.us'].unread_count == 2
+        assert chats['1@c.us'].user_id == '1'
+        assert chats['2@g.us'].is_group is True
+        assert source._total_count == 2
+
+    def test_parses_base64_json_response(self):
+        """Test that base64-encoded bodies are decoded before parsing."""
+        encoded = base64.b64encode(json.dumps(PAYLOAD).encode('utf-8')).decode('ascii')
+        source = _make_source({'r1': {'body': encoded, 'base64Encoded': True}})
+        _deliver(source, _response_event('r1'))
+
+        assert set(source._ids) == {'1@c.us', '2@g.us'}
+
+    def test_ignores_non_json_response(self):
+        """Test that non-JSON bodies are skipped without errors."""
+        source = _make_source({'r1': {'body': '\x00\x01binary', 'base64Encoded': False}})
+        _deliver(source, _response_event('r1'))
+
+        assert source._ids == []
+
+    def test_ignores_non_whatsapp_urls(self):
+        """Test that responses outside WhatsApp Web are not fetched."""
+        source = _make_source({})
+        session = source.cdp_session
+        _deliver(
+            source,
+            _response_event('r1', url='https://example.com/chats'),
+            _response_event('r2', url='http://web.whatsapp.com/chats'),
+        )
+
+        assert session.sent == []
+
+    def test_skips_body_fetch_for_non_data_responses(self):
+        """Test that images and failed responses don't trigger getResponseBody."""
+        source = _make_source({})
+        session = source.cdp_session
+        failed = _response_event('r2')
+        failed['response']['status'] = 500
+        _deliver(source, _response_event('r1', mime_type='image/png'), failed)
+
+        assert session.sent == []
+
+    def test_body_fetches_overlap_with_bounded_concurrency(self):
+        """Test that getResponseBody calls run concurrently up to the limit."""
+        from app.services.whatsapp.parsing.sources.cdp_network_chat_source import (
+            MAX_CONCURRENT_BODY_FETCHES,
+        )
+        count = MAX_CONCURRENT_BODY_FETCHES * 2
+        bodies = {
+            f'r{i}': {'body': json.dumps([{'id': f'{i}@c.us', 'name': f'Chat {i}'}]), 'base64Encoded': False}
+            for i in range(count)
+        }
+        source = CDPNetworkChatSource(page=None)
+        source.cdp_session = session = FakeCDPSession(bodies, delay=0.01)
+        _deliver(source, *(_response_event(f'r{i}') for i in range(count)))
+
+        assert len(source._ids) == count
+        assert session.max_in_flight == MAX_CONCURRENT_BODY_FETCHES
+
+    def test_parses_alternative_field_names(self):
+        """Test that fallback keys (jid, contact name, unread, profilePicUrl) are used."""
+        source = CDPNetworkChatSource(page=None)
+        source._parse_json_payload({'conversations': [
+            {'jid': '5@g.us', 'contact': {'name': 'Group'}, 'isGroupChat': True,
+             'unread': 4, 'profilePicUrl': 'https://pps.whatsapp.net/x'},
+            {'name': 'No id'},
+        ]}, 'https://web.whatsapp.com/chats')
+
+        chats = _chats_by_id(source)
+        chat = chats['5@g.us']
+        assert list(chats) == ['5@g.us']
+        assert (chat.name, chat.is_group, chat.unread_count) == ('Group', True, 4)
+        assert chat.avatar_url == 'https://pps.whatsapp.net/x'
+
+    def test_duplicate_chats_overwrite_in_place(self):
+        """Test that re-delivered chats update their existing row."""
+        source = CDPNetworkChatSource(page=None)
+        url = 'https://web.whatsapp.com/chats'
+        source._parse_json_payload([{'id': '1@c.us', 'name': 'Old'}, {'id': '2@c.us'}], url)
+        source._parse_json_payload([{'id': '1@c.us', 'name': 'New', 'unreadCount': 3}], url)
+
+        chats = source._build_chats()
+        assert [chat.jid for chat in chats] == ['1@c.us', '2@c.us']
+        assert (chats[0].name, chats[0].unread_count) == ('New', 3)
+        assert chats[0].raw_data == {'url': url, 'source': 'network_response'}
+
+    def test_protobuf_responses_are_not_fetched(self):
+        """Test that protobuf bodies, which can't be decoded, skip getResponseBody."""
+        source = _make_source({'r1': {'body': json.dumps(PAYLOAD), 'base64Encoded': False}})
+        session = source.cdp_session
+        _deliver(source, _response_event('r1', mime_type='application/x-protobuf'))
+
+        assert session.sent == []
+        assert source._ids == []
+
+    def test_identical_bodies_are_decoded_once(self):
+        """Test that a byte-identical refetch reuses the cached parse."""
+        body = {'body': json.dumps(PAYLOAD), 'base64Encoded': False}
+        source = _make_source({'r1': body, 'r2': body})
+        with mock.patch.object(source, '_parse_json_payload', wraps=source._parse_json_payload) as parse:
+            _deliver(source, _response_event('r1'), _response_event('r2'))
+
+        assert parse.call_count == 1
+        assert set(source._ids) == {'1@c.us', '2@g.us'}
+
+    def test_fetch_batch_reuses_chats_until_a_row_changes(self):
+        """Test that unchanged re-deliveries don't rebuild the chat list."""
+        source = CDPNetworkChatSource(page=None)
+        source._initialized = True
+        url = 'https://web.whatsapp.com/chats'
+        source._parse_json_payload([{'id': '1@c.us', 'name': 'Alice'}], url)
+        first = asyncio.run(source.fetch_batch())
+
+        source._parse_json_payload([{'id': '1@c.us', 'name': 'Alice'}], url)
+        assert asyncio.run(source.fetch_batch()) is first
+
+        source._parse_json_payload([{'id': '1@c.us', 'name': 'Alice B.'}], url)
+        changed = asyncio.run(source.fetch_batch())
+        assert changed is not first
+        assert changed[0].name == 'Alice B.'
+
+    def test_fetch_batch_wakes_on_first_chat(self):
+        """Test that fetch_batch returns as soon as the first chat is stored."""
+        source = _make_source({})
+        source._initialized = True
+
+        async def run():
+            source._setup_response_listener()
+            loop = asyncio.get_event_loop()
+            loop.call_later(0.05, source._parse_json_payload, [{'id': '1@c.us'}], 'https://web.whatsapp.com/chats')
+            started = loop.time()
+            chats = await source.fetch_batch()
+            elapsed = loop.time() - started
+            await source.cleanup()
+            return chats, elapsed
+
+        chats, elapsed = asyncio.run(run())
+        assert [chat.jid for chat in chats] == ['1@c.us']
+        assert elapsed < 1.0
+
+    def test_explicit_false_and_zero_do_not_fall_through(self):
+        """Test that isGroup=False and unreadCount=0 win over alternative keys."""
+        source = CDPNetworkChatSource(page=None)
+        source._parse_json_payload([
+            {'id': '1@c.us', 'isGroup': False, 'isGroupChat': True, 'unreadCount': 0, 'unread': 5},
+        ], 'https://web.whatsapp.com/chats')
+
+        chat = source._build_chats()[0]
+        assert chat.is_group is False
+        assert chat.unread_count == 0
+
+    def test_large_bodies_are_stream_parsed(self):
+        """Test that bodies above the threshold give the same chats via ijson."""
+        from app.services.whatsapp.parsing.sources import cdp_network_chat_source as module
+        chats = [
+            {'id': {'_serialized': f'{i}@c.us', 'user': str(i)}, 'name': f'Chat {i}', 'unreadCount': i % 3}
+            for i in range(3000)
+        ]
+        payload = {'data': chats, 'meta': {'total': 'nested'}, 'count': 3000}
+        body = json.dumps(payload)
+        assert len(body) > module.STREAM_PARSE_THRESHOLD
+
+        streamed = _make_source({'r1': {'body': body, 'base64Encoded': False}})
+        with mock.patch.object(streamed, '_parse_json_payload') as full_parse:
+            _deliver(streamed, _response_event('r1'))
+        full_parse.assert_not_called()
+
+        loaded = CDPNetworkChatSource(page=None)
+        loaded._parse_json_payload(payload, 'https://web.whatsapp.com/chats')
+
+        assert streamed._build_chats() == loaded._build_chats()
+        assert streamed._total_count == loaded._total_count == 3000
+
+    def test_large_invalid_body_is_ignored(self):
+        """Test that a large non-JSON body is skipped without errors."""
+        from app.services.whatsapp.parsing.sources import cdp_network_chat_source as module
+        body = '{"chats": [' + 'x' * (module.STREAM_PARSE_THRESHOLD + 1)
+        source = _make_source({'r1': {'body': body, 'base64Encoded': False}})
+        _deliver(source, _response_event('r1'))
+
+        assert source._ids == []
+        assert source._body_cache == {}
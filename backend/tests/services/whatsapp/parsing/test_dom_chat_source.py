@@ -0,0 +1,341 @@
+"""
+Unit tests for DOM chat source.
+"""
+
+import asyncio
+from unittest import mock
+
+from app.services.whatsapp.parsing.sources import dom_chat_source
+from app.services.whatsapp.parsing.sources.dom_chat_source import DOMChatSource
+
+
+class FakePage:
+    """Page stub recording scripts and answering helper calls by name."""
+
+    def __init__(self, results=None):
+        self.results = results or {}
+        self.init_scripts = []
+        self.evaluated = []
+        self.args = []
+
+    async def wait_for_selector(self, selector, timeout=None):
+        return object()
+
+    async def add_init_script(self, script=None):
+        self.init_scripts.append(script)
+
+    async def evaluate(self, expression, arg=None):
+        self.evaluated.append(expression)
+        self.args.append(arg)
+        for name, result in self.results.items():
+            if f'__waDom.{name}(' in expression:
+                return result(arg) if callable(result) else result
+        return None
+
+
+def _row(chat_id, name, is_group=False, unread_count=0, avatar_url=None, index=0, has_aria_label=True):
+    """Build a positional row as returned by extractChats."""
+    return [chat_id, name, is_group, unread_count, avatar_url, index, has_aria_label]
+
+
+def _run(coro):
+    """Run a coroutine with sleeps skipped."""
+    with mock.patch.object(dom_chat_source.asyncio, 'sleep', new=mock.AsyncMock()):
+        return asyncio.run(coro)
+
+
+class TestDOMChatSource:
+    """Tests for DOMChatSource."""
+
+    def test_helpers_installed_once_and_called_by_name(self):
+        """Test that the JS bundle is shipped at init only."""
+        page = FakePage({
+            'scrollAndCollect': {
+                'rows': [_row('1@c.us', 'Alice')],
+                'selector': 'div[role="row"]',
+            },
+            'scrollToBottom': {'scrolled': True, 'newScrollHeight': 100, 'settledScrollHeight': 100},
+        })
+        source = DOMChatSource(page)
+
+        async def run():
+            await source.init()
+            source._reached_bottom = True
+            return await source.fetch_batch()
+
+        chats = _run(run())
+
+        assert [chat.jid for chat in chats] == ['1@c.us']
+        assert page.init_scripts == [dom_chat_source._DOM_HELPERS_JS]
+        bundle_calls = [e for e in page.evaluated if e == dom_chat_source._DOM_HELPERS_JS]
+        assert len(bundle_calls) == 1
+        assert all(len(e) < 100 for e in page.evaluated if e != dom_chat_source._DOM_HELPERS_JS)
+
+    def test_winning_selectors_are_reused(self):
+        """Test that the matched row/container selectors are passed to the next call."""
+        page = FakePage({
+            'scrollAndCollect': {'rows': [], 'selector': 'div[role="row"]'},
+            'scrollForMore': {'scrolled': False, 'atBottom': True, 'containerSelector': '#pane-side'},
+        })
+        source = DOMChatSource(page)
+        source._initialized = True
+
+        async def run():
+            await source.fetch_batch()
+            page.args.clear()
+            await source.scroll_for_more()
+            await source.fetch_batch()
+
+        _run(run())
+
+        assert source._best_chat_selector == 'div[role="row"]'
+        assert source._best_scroll_selector == '#pane-side'
+        assert page.args[-1][3:] == ['div[role="row"]', '#pane-side']
+
+    def test_scrolls_and_extraction_share_one_round_trip(self):
+        """Test that fetch_batch scrolls and extracts in a single evaluate call."""
+        scrolls = [
+            {'scrolled': True, 'atBottom': False, 'containerSelector': '#pane-side'},
+            {'scrolled': True, 'atBottom': False},
+            {'scrolled': False, 'atBottom': True},
+        ]
+        page = FakePage({
+            'scrollAndCollect': {
+                'rows': [_row('dom_chat_1_0', 'Bob')],
+                'selector': 'div[role="row"]',
+                'scrolls': scrolls,
+            },
+        })
+        source = DOMChatSource(page)
+        source._initialized = True
+        source._seen_ids.add(hash('dom_chat_2_1'))  # not the first batch: no aggressive scroll
+
+        async def run():
+            chats = await source.fetch_batch()
+            calls = len(page.evaluated)
+            await source.cleanup()
+            return chats, calls
+
+        chats, calls = _run(run())
+
+        assert calls == 1
+        assert page.args[0][0] == dom_chat_source.SCROLLS_PER_BATCH
+        assert [chat.wid for chat in chats] == ['dom_chat_1_0']
+        assert source._scroll_iterations == 2
+        assert source._best_scroll_selector == '#pane-side'
+
+    def test_no_scrolls_requested_at_bottom(self):
+        """Test that only extraction runs once the bottom has been reached."""
+        page = FakePage({'scrollAndCollect': {'rows': []}})
+        source = DOMChatSource(page)
+        source._initialized = True
+        source._reached_bottom = True
+
+        _run(source.fetch_batch())
+
+        assert page.args[0][0] == 0
+
+    def test_aggressive_scroll_waits_page_side(self):
+        """Test that scrolling to the bottom waits for rows in the page, not via sleep."""
+        page = FakePage({
+            'scrollToBottom': {
+                'scrolled': True, 'newScrollHeight': 100, 'rowsAdded': True, 'settledScrollHeight': 300,
+            },
+            'rescrollToBottom': True,
+        })
+        source = DOMChatSource(page)
+
+        with mock.patch.object(dom_chat_source.asyncio, 'sleep', new=mock.AsyncMock()) as sleep:
+            asyncio.run(source._scroll_to_bottom_aggressive())
+
+        sleep.assert_not_called()
+        assert len(page.evaluated) == 2
+        assert page.args[0][1:] == [dom_chat_source.AGGRESSIVE_SCROLL_WAIT_MS, dom_chat_source.SCROLL_STABLE_FRAMES]
+        assert page.args[-1][1] == dom_chat_source.AGGRESSIVE_RESCROLL_WAIT_MS
+
+    def test_fallback_ids_built_in_python(self):
+        """Test that rows without an ID get the same fallback ID the page used to build."""
+        page = FakePage({
+            'scrollAndCollect': {'rows': [
+                _row(None, 'Bob', index=1),
+                _row(None, 'Семья 👨‍👩‍👧', index=2),
+            ]},
+        })
+        source = DOMChatSource(page)
+        source._initialized = True
+        source._reached_bottom = True
+        source._seen_ids.add(hash('other'))
+
+        chats = _run(source.fetch_batch())
+
+        # Values produced by the former JS implementation
+        assert [chat.wid for chat in chats] == ['dom_chat_66965_1', 'dom_chat_6408092834_2']
+
+    def test_seen_ids_dedupe_by_hash(self):
+        """Test that repeated IDs are dropped and only their hashes are kept."""
+        row = _row('1@c.us', 'Alice')
+        page = FakePage({'scrollAndCollect': {'rows': [row, list(row)]}})
+        source = DOMChatSource(page)
+        source._initialized = True
+        source._reached_bottom = True
+        source._seen_ids.add(hash('other'))
+
+        chats = _run(source.fetch_batch())
+
+        assert [c.jid for c in chats] == ['1@c.us']
+        assert source._seen_ids == {hash('other'), hash('1@c.us')}
+
+    def test_chat_list_selectors_probed_in_parallel(self):
+        """Test that init waits for the fastest matching selector, not each timeout in turn."""
+        page = FakePage()
+        waited = []
+
+        async def wait_for_selector(selector, timeout=None):
+            waited.append(selector)
+            if selector != dom_chat_source._CHAT_LIST_SELECTORS[-1]:
+                await asyncio.sleep(timeout / 1000)
+                raise TimeoutError(selector)
+            return object()
+
+        page.wait_for_selector = wait_for_selector
+        source = DOMChatSource(page)
+
+        async def run():
+            loop = asyncio.get_event_loop()
+            started = loop.time()
+            selector = await source._wait_for_chat_list()
+            return selector, loop.time() - started
+
+        selector, elapsed = asyncio.run(run())
+
+        assert selector == dom_chat_source._CHAT_LIST_SELECTORS[-1]
+        assert waited == list(dom_chat_source._CHAT_LIST_SELECTORS)
+        assert elapsed < 1.0
+
+    def test_batch_columns_match_fetch_batch(self):
+        """Test that the columnar batch holds the same chats as fetch_batch."""
+        rows = [
+            _row('1@c.us', 'Alice', unread_count=2, index=0),
+            _row(None, 'Bob', is_group=True, index=1, has_aria_label=False),
+        ]
+
+        def fetch(method):
+            page = FakePage({'scrollAndCollect': {'rows': rows, 'selector': 'div[role="row"]'}})
+            source = DOMChatSource(page)
+            source._initialized = True
+            source._reached_bottom = True
+            source._seen_ids.add(hash('other'))
+            return _run(getattr(source, method)())
+
+        columns = fetch('fetch_batch_columns')
+        raw_chats = fetch('fetch_batch')
+
+        assert list(columns) == list(dom_chat_source.BATCH_COLUMNS)
+        assert columns['jid'] == ['1@c.us', None]
+        assert columns['wid'] == [None, 'dom_chat_66965_1']
+        assert columns['is_group'] == [False, True]
+        assert columns['raw_data'][1] == {'selector': 'div[role="row"]', 'index': 1, 'hasAriaLabel': False}
+        for column in dom_chat_source.BATCH_COLUMNS:
+            assert columns[column] == [getattr(chat, column) for chat in raw_chats]
+
+    def test_next_batch_is_prefetched(self):
+        """Test that the next scroll starts before fetch_batch is called again."""
+        batches = [
+            {'rows': [_row('1@c.us', 'Alice')], 'scrolls': [{'scrolled': True, 'atBottom': False}]},
+            {'rows': [_row('2@c.us', 'Bob')], 'scrolls': [{'scrolled': False, 'atBottom': True}]},
+        ]
+        page = FakePage({'scrollAndCollect': lambda arg: batches.pop(0)})
+        source = DOMChatSource(page)
+        source._initialized = True
+        source._seen_ids.add(hash('other'))
+
+        async def run():
+            first = await source.fetch_batch()
+            await asyncio.wait([source._pending_collect])
+            calls_before_second = len(page.evaluated)
+            second = await source.fetch_batch()
+            pending = source._pending_collect
+            await source.cleanup()
+            return first, calls_before_second, second, pending
+
+        # The prefetch started after the last batch is dropped by cleanup
+        first, calls_before_second, second, pending = _run(run())
+
+        assert [chat.jid for chat in first] == ['1@c.us']
+        assert calls_before_second == 2
+        assert [chat.jid for chat in second] == ['2@c.us']
+        assert len(page.evaluated) == 2
+        assert pending.cancelled()
+        assert source._pending_collect is None
+
+    def test_iter_batch_stops_early(self):
+        """Test that breaking out of iter_batch leaves later rows unbuilt but seen."""
+        page = FakePage({'scrollAndCollect': {'rows': [_row('1@c.us', 'Alice', is_group=True), _row('2@c.us', 'Bob')]}})
+        source = DOMChatSource(page)
+        source._initialized = True
+        source._reached_bottom = True
+        source._seen_ids.add(hash('other'))
+
+        async def first_group():
+            async for raw_chat in source.iter_batch():
+                if raw_chat.is_group:
+                    return raw_chat
+
+        with mock.patch.object(dom_chat_source, 'RawChat', wraps=dom_chat_source.RawChat) as raw_chat_cls:
+            chat = _run(first_group())
+
+        assert chat.jid == '1@c.us'
+        assert raw_chat_cls.call_count == 1
+        assert hash('2@c.us') in source._seen_ids
+
+    def test_init_waits_page_side_after_scrolling_to_top(self):
+        """Test that init doesn't sleep after scrolling to the top."""
+        page = FakePage({'scrollToTop': True})
+        source = DOMChatSource(page)
+
+        with mock.patch.object(dom_chat_source.asyncio, 'sleep', new=mock.AsyncMock()) as sleep:
+            asyncio.run(source.init())
+
+        sleep.assert_not_called()
+        assert page.args[-1] == [dom_chat_source.SCROLL_IDLE_MS, dom_chat_source.SCROLL_SETTLE_TIMEOUT_MS]
+
+    def test_complete_once_visible_chats_repeat_at_bottom(self):
+        """Test that completion needs the same rendered chats twice in a row at the bottom."""
+        at_bottom = [{'scrolled': False, 'atBottom': True}]
+        # extractChats leaves already returned chats out of rows, but lists
+        # every rendered row in visibleIds
+        batches = [
+            {'rows': [_row('1@c.us', 'Alice')], 'visibleIds': ['1@c.us'], 'scrolls': at_bottom},
+            {'rows': [_row('2@c.us', 'Bob')], 'visibleIds': ['1@c.us', '2@c.us'], 'scrolls': at_bottom},
+            {'rows': [], 'visibleIds': ['2@c.us'], 'scrolls': at_bottom},
+            {'rows': [], 'visibleIds': ['1@c.us'], 'scrolls': at_bottom},
+            {'rows': [], 'scrolls': at_bottom, 'unchanged': True},
+        ]
+        page = FakePage({'scrollAndCollect': lambda arg: batches.pop(0)})
+        source = DOMChatSource(page)
+        source._initialized = True
+        source._reached_bottom = True
+        source._seen_ids.add(hash('other'))
+
+        async def run():
+            complete = []
+            for _ in range(5):
+                await source.fetch_batch()
+                complete.append(await source.is_complete())
+            await source.cleanup()
+            return complete
+
+        assert _run(run()) == [False, False, False, False, True]
+
+    def test_init_script_registered_once_per_page(self):
+        """Test that repeated inits on one page only re-evaluate the bundle."""
+        page = FakePage({'scrollToTop': True})
+
+        async def run():
+            await DOMChatSource(page).init()
+            await DOMChatSource(page).init()
+
+        _run(run())
+
+        assert page.init_scripts == [dom_chat_source._DOM_HELPERS_JS]
+        assert page.evaluated.count(dom_chat_source._DOM_HELPERS_JS) == 2
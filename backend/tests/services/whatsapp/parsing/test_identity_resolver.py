@@ -0,0 +1,44 @@
+"""
+Unit tests for identity resolver.
+"""
+
+from app.services.whatsapp.parsing.identity.identity_resolver import IdentityResolver
+from app.services.whatsapp.parsing.models.chat_dto import ChatDTO
+
+
+class TestIdentityResolver:
+    """Tests for IdentityResolver."""
+
+    def test_analyze_matches_separate_checks(self):
+        """Test that analyze() agrees with detect_ambiguities() and validate_uniqueness()."""
+        chats = [
+            ChatDTO(id="1@c.us", type="personal", source="store", integrity="verified", name="Alice"),
+            ChatDTO(id="1@c.us", type="group", source="dom", integrity="fallback", name="Alicia"),
+            ChatDTO(id="2@c.us", type="personal", source="store", integrity="verified", name="Bob"),
+            ChatDTO(id="3@c.us", type="personal", source="store", integrity="verified", name="Bob"),
+            ChatDTO(id="", type="personal", source="dom", integrity="fallback", name="Nobody"),
+        ]
+        resolver = IdentityResolver()
+
+        anomalies, duplicate_ids = resolver.analyze(chats)
+
+        assert duplicate_ids == ["1@c.us"]
+        assert resolver.validate_uniqueness(chats) == (False, duplicate_ids)
+        assert anomalies[:-1] == resolver.detect_ambiguities(chats)
+        assert [a['type'] for a in anomalies] == [
+            'invalid_id',
+            'name_conflict',
+            'type_conflict',
+            'integrity_conflict',
+            'potential_duplicate',
+            'duplicate_ids',
+        ]
+        assert anomalies[-1]['count'] == 1
+
+    def test_analyze_unique_chats(self):
+        """Test that unique, valid chats produce no anomalies."""
+        chats = [
+            ChatDTO(id="1@c.us", type="personal", source="store", integrity="verified", name="Alice"),
+            ChatDTO(id="2@g.us", type="group", source="store", integrity="verified", name="Team"),
+        ]
+        assert IdentityResolver().analyze(chats) == ([], [])
@@ -50,6 +50,16 @@ class TestRawChat:
         raw_chat = RawChat(source="dom")
         candidates = raw_chat.get_id_candidates()
         assert candidates == []
+    
+    def test_raw_chat_is_slotted(self):
+        """Test that RawChat has no instance __dict__ and keeps dataclass behavior."""
+        first = RawChat(source="dom")
+        second = RawChat(source="dom")
+        assert not hasattr(first, '__dict__')
+        assert first == second
+        assert first.raw_data is not second.raw_data
+        with pytest.raises(AttributeError):
+            first.unknown_field = 1
 
 
 class TestChatDTO:
@@ -223,3 +233,24 @@ class TestParsingResult:
         assert result_dict['completeness_percentage'] == 50.0
 
 
+    
+    def test_to_dict_with_shared_empty_containers(self):
+        """Test that read-only empty fields serialize to plain containers."""
+        from types import MappingProxyType
+        result = ParsingResult(
+            missing_ids=(),
+            anomalies=(),
+            metadata=MappingProxyType({})
+        )
+        result_dict = result.to_dict()
+        assert result_dict['missing_ids'] == []
+        assert result_dict['anomalies'] == []
+        assert result_dict['metadata'] == {}
+        assert type(result_dict['metadata']) is dict
+    
+    def test_is_immutable(self):
+        """Test that ParsingResult fields cannot be reassigned."""
+        import dataclasses
+        result = ParsingResult()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.completeness = "complete"
@@ -0,0 +1,99 @@
+"""
+Unit tests for chat normalizer.
+"""
+
+import pytest
+from app.services.whatsapp.parsing.models.raw_chat import RawChat
+from app.services.whatsapp.parsing.normalizers.chat_normalizer import ChatNormalizer
+
+
+class TestChatNormalizer:
+    """Tests for ChatNormalizer."""
+
+    @pytest.mark.parametrize("jid,expected", [
+        ("123@g.us", "group"),
+        ("123@c.us", "personal"),
+        ("status@broadcast", "broadcast"),
+        ("123@unknown", "personal"),
+    ])
+    def test_determine_type_from_jid(self, jid, expected):
+        """Test chat type resolution from JID suffix."""
+        raw_chat = RawChat(source="store", jid=jid)
+        assert ChatNormalizer().normalize(raw_chat).type == expected
+
+    def test_determine_type_falls_back_to_wid(self):
+        """Test that wid is used when JID has no known suffix."""
+        raw_chat = RawChat(source="store", jid="123", wid="123@g.us")
+        assert ChatNormalizer().normalize(raw_chat).type == "group"
+
+    def test_determine_type_explicit_flag_wins(self):
+        """Test that explicit is_group flag takes priority over JID."""
+        raw_chat = RawChat(source="store", jid="123@g.us", is_group=False)
+        assert ChatNormalizer().normalize(raw_chat).type == "personal"
+
+    @pytest.mark.parametrize("name,expected", [
+        ("Test Chat", "Test Chat"),
+        ("  Test Chat \n", "Test Chat"),
+        ("   ", None),
+        ("", None),
+        (None, None),
+    ])
+    def test_normalize_name(self, name, expected):
+        """Test name whitespace cleanup."""
+        raw_chat = RawChat(source="store", jid="123@c.us", name=name)
+        assert ChatNormalizer().normalize(raw_chat).name == expected
+
+    @pytest.mark.parametrize("raw_chat,expected", [
+        (RawChat(source="store", jid="123@c.us"), "verified"),
+        (RawChat(source="store"), "fallback"),
+        (RawChat(source="network", server_id="123"), "verified"),
+        (RawChat(source="network"), "fallback"),
+        (RawChat(source="dom", jid="123@c.us"), "fallback"),
+        (RawChat(source="other", jid="123@c.us"), "ambiguous"),
+    ])
+    def test_determine_integrity(self, raw_chat, expected):
+        """Test integrity status per source and ID availability."""
+        assert ChatNormalizer().normalize(raw_chat).integrity == expected
+
+    def test_normalize_batch_skips_chats_without_id(self):
+        """Test that batch normalization with resolver drops chats without ID."""
+        from app.services.whatsapp.parsing.identity.identity_resolver import IdentityResolver
+        raw_chats = [
+            RawChat(source="store", jid="1@c.us", name="One"),
+            RawChat(source="store", name="No ID"),
+            RawChat(source="network", server_id="3", name="Three"),
+        ]
+        dtos = ChatNormalizer().normalize_batch(raw_chats, identity_resolver=IdentityResolver())
+        assert [dto.id for dto in dtos] == ["1@c.us", "3"]
+
+    def test_normalize_memoizes_identical_chats(self):
+        """Test that identical raw chats reuse the cached DTO."""
+        normalizer = ChatNormalizer()
+        first = normalizer.normalize(RawChat(source="store", jid="1@c.us", name="A"), "1@c.us")
+        again = normalizer.normalize(RawChat(source="store", jid="1@c.us", name="A"), "1@c.us")
+        renamed = normalizer.normalize(RawChat(source="store", jid="1@c.us", name="B"), "1@c.us")
+        assert again is first
+        assert renamed is not first
+        assert renamed.name == "B"
+
+    def test_normalize_cache_is_bounded(self):
+        """Test that the cache evicts least recently used entries."""
+        normalizer = ChatNormalizer(cache_size=2)
+        first = normalizer.normalize(RawChat(source="store", jid="1@c.us"), "1@c.us")
+        normalizer.normalize(RawChat(source="store", jid="2@c.us"), "2@c.us")
+        normalizer.normalize(RawChat(source="store", jid="3@c.us"), "3@c.us")
+        assert normalizer.normalize(RawChat(source="store", jid="1@c.us"), "1@c.us") is not first
+
+    def test_normalize_cache_shared_across_threads(self):
+        """Test that concurrent normalization with constant eviction doesn't fail."""
+        from concurrent.futures import ThreadPoolExecutor
+        normalizer = ChatNormalizer(cache_size=4)
+        raw_chats = [RawChat(source="store", jid=f"{i % 8}@c.us") for i in range(2000)]
+
+        def run(offset):
+            return [normalizer.normalize(raw_chat, raw_chat.jid).id for raw_chat in raw_chats[offset:] + raw_chats[:offset]]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(run, range(4)))
+
+        assert [len(ids) for ids in results] == [2000] * 4
@@ -0,0 +1,208 @@
+"""
+Unit tests for chat parsing orchestrator.
+"""
+
+import asyncio
+from typing import List, Optional
+
+from app.services.whatsapp.parsing.models.raw_chat import RawChat
+from app.services.whatsapp.parsing.orchestrator import ChatParsingOrchestrator, MAX_EMPTY_POLLS
+from app.services.whatsapp.parsing.sources.base import IChatSource
+
+
+class FakeSource(IChatSource):
+    """In-memory source returning pre-defined batches."""
+
+    def __init__(self, batches: List[List[RawChat]], name: str = "dom", complete_after: Optional[int] = None):
+        self._batches = list(batches)
+        self._name = name
+        self._complete_after = complete_after
+        self.fetch_calls = 0
+        self.cleanup_calls = 0
+
+    @property
+    def source_name(self) -> str:
+        return self._name
+
+    async def init(self) -> None:
+        pass
+
+    async def fetch_batch(self) -> List[RawChat]:
+        self.fetch_calls += 1
+        return self._batches.pop(0) if self._batches else []
+
+    async def is_complete(self) -> bool:
+        return self._complete_after is not None and self.fetch_calls >= self._complete_after
+
+    async def total_expected(self) -> Optional[int]:
+        return None
+
+    async def cleanup(self) -> None:
+        self.cleanup_calls += 1
+
+
+class FailingSource(FakeSource):
+    """Source whose fetches fail."""
+
+    async def fetch_batch(self) -> List[RawChat]:
+        raise RuntimeError("page crashed")
+
+
+async def _collect(source: IChatSource) -> List[List[RawChat]]:
+    orchestrator = ChatParsingOrchestrator()
+    return [batch async for batch in orchestrator._fetch_batches(source)]
+
+
+class TestFetchBatches:
+    """Tests for ChatParsingOrchestrator._fetch_batches."""
+
+    def test_stops_when_source_complete(self):
+        """Test that fetching stops once the source reports completion."""
+        source = FakeSource([[RawChat(source="store", jid="1@c.us")]], name="store", complete_after=1)
+        batches = asyncio.run(_collect(source))
+        assert len(batches) == 1
+        assert source.fetch_calls == 1
+
+    def test_network_stops_on_empty_batch(self):
+        """Test that the CDP Network source stops on the first empty batch."""
+        source = FakeSource([], name="network")
+        assert asyncio.run(_collect(source)) == []
+        assert source.fetch_calls == 1
+
+    def test_store_continues_past_empty_chunk(self):
+        """Test that an empty Store chunk before completion doesn't end the parse."""
+        source = FakeSource(
+            [[RawChat(source="store", jid="1@c.us")], [], [RawChat(source="store", jid="2@c.us")]],
+            name="store",
+            complete_after=3,
+        )
+        batches = asyncio.run(_collect(source))
+        assert [batch[0].jid for batch in batches] == ["1@c.us", "2@c.us"]
+        assert source.fetch_calls == 3
+
+    def test_dom_stops_after_stalled_polls(self):
+        """Test that DOM source stops after consecutive empty polls."""
+        source = FakeSource([[RawChat(source="dom", wid="dom_chat_1_0")], [], []], name="dom")
+        batches = asyncio.run(_collect(source))
+        assert len(batches) == 1
+        assert source.fetch_calls == 1 + MAX_EMPTY_POLLS
+
+
+class TestNormalizeBatch:
+    """Tests for ChatParsingOrchestrator._normalize_batch."""
+
+    def test_large_batch_normalized_in_thread(self):
+        """Test that small and large batches produce the same normalized chats."""
+        from app.services.whatsapp.parsing.orchestrator import NORMALIZE_IN_THREAD_THRESHOLD
+        orchestrator = ChatParsingOrchestrator()
+        raw_chats = [
+            RawChat(source="store", jid=f"{i}@c.us", name=f"Chat {i}")
+            for i in range(NORMALIZE_IN_THREAD_THRESHOLD + 1)
+        ]
+        large = asyncio.run(orchestrator._normalize_batch(raw_chats))
+        small = asyncio.run(orchestrator._normalize_batch(raw_chats[:2]))
+        assert len(large) == len(raw_chats)
+        assert [dto.id for dto in large[:2]] == [dto.id for dto in small]
+
+
+class FakeSelector:
+    """Source selector returning pre-built sources."""
+
+    def __init__(self, source: IChatSource, fallback: Optional[IChatSource] = None):
+        self._source = source
+        self._fallback = fallback
+
+    async def select_source(self, page):
+        return self._source, False, {}
+
+    async def on_empty_fallback(self, page):
+        return self._fallback
+
+
+async def _stream(orchestrator: ChatParsingOrchestrator):
+    return [result async for result in orchestrator.parse_chats_streaming(page=None)]
+
+
+class TestParseChatsStreaming:
+    """Tests for ChatParsingOrchestrator.parse_chats_streaming."""
+
+    def test_streams_batches_then_final_result(self):
+        """Test that each batch is streamed before the final result."""
+        source = FakeSource(
+            [
+                [RawChat(source="dom", wid="dom_chat_1_0", name="One")],
+                [RawChat(source="dom", wid="dom_chat_2_1", name="Two")],
+            ],
+            name="dom",
+            complete_after=2,
+        )
+        orchestrator = ChatParsingOrchestrator()
+        orchestrator.source_selector = FakeSelector(source)
+
+        results = asyncio.run(_stream(orchestrator))
+
+        assert [len(r.chats) for r in results] == [1, 1, 2]
+        final = results[-1]
+        assert final.metadata['batch_count'] == 2
+        assert final.metadata['raw_chats_count'] == 2
+        assert [chat.id for chat in final.chats] == ["dom_chat_1_0", "dom_chat_2_1"]
+
+    def test_empty_network_falls_back_to_dom(self):
+        """Test that an empty CDP Network source falls back to DOM."""
+        network = FakeSource([], name="network")
+        dom = FakeSource(
+            [[RawChat(source="dom", wid="dom_chat_1_0", name="One")]],
+            name="dom",
+            complete_after=1,
+        )
+        orchestrator = ChatParsingOrchestrator()
+        orchestrator.source_selector = FakeSelector(network, fallback=dom)
+
+        results = asyncio.run(_stream(orchestrator))
+
+        final = results[-1]
+        assert final.source_type == "dom"
+        assert final.source_degraded is True
+        assert len(final.chats) == 1
+
+    def test_full_parse_reuses_normalized_chats(self):
+        """Test that unchanged chats keep their memoized DTO across runs."""
+        def run():
+            source = FakeSource([[RawChat(source="dom", wid="dom_chat_1_0", name="One")]], name="dom", complete_after=1)
+            orchestrator.source_selector = FakeSelector(source)
+            return asyncio.run(_stream(orchestrator))[-1].chats[0]
+
+        orchestrator = ChatParsingOrchestrator()
+        first = run()
+        assert run() is first
+
+    def test_source_cleaned_up_when_stream_abandoned(self):
+        """Test that a caller leaving after the first batch still releases the source."""
+        source = FakeSource(
+            [[RawChat(source="dom", wid=f"dom_chat_{i}_{i}")] for i in range(5)],
+            name="dom",
+        )
+        orchestrator = ChatParsingOrchestrator()
+        orchestrator.source_selector = FakeSelector(source)
+
+        async def first_batch():
+            stream = orchestrator.parse_chats_streaming(page=None)
+            result = await stream.__anext__()
+            await stream.aclose()
+            return result
+
+        result = asyncio.run(first_batch())
+
+        assert len(result.chats) == 1
+        assert source.cleanup_calls == 1
+
+    def test_source_cleaned_up_on_error(self):
+        """Test that a failing parse releases the source after the error result."""
+        source = FailingSource([], name="dom")
+        orchestrator = ChatParsingOrchestrator()
+        orchestrator.source_selector = FakeSelector(source)
+
+        results = asyncio.run(_stream(orchestrator))
+
+        assert results[-1].metadata['error'] is True
+        assert source.cleanup_calls == 1
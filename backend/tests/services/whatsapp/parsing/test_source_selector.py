@@ -0,0 +1,229 @@
+"""
+Unit tests for source selector.
+"""
+
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+
+from app.services.whatsapp.parsing.sources import source_selector
+from app.services.whatsapp.parsing.sources.base import SourceUnavailableError
+from app.services.whatsapp.parsing.sources.source_selector import SourceSelector
+
+
+class FakePage:
+    """Page stub recording event handlers."""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+
+def _fake_source(name, delay=0.0, error=None, events=None):
+    """Build a source class whose init() sleeps, then succeeds or raises."""
+    events = events if events is not None else []
+
+    class FakeSource:
+        source_name = name
+
+        def __init__(self, page):
+            self.page = page
+
+        async def init(self):
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                events.append((name, 'cancelled'))
+                raise
+            if error is not None:
+                raise error
+            events.append((name, 'initialized'))
+
+        async def total_expected(self):
+            return None
+
+        async def cleanup(self):
+            events.append((name, 'cleanup'))
+
+    return FakeSource
+
+
+def _patched(store, network, dom, head_start=0.05):
+    return mock.patch.multiple(
+        source_selector,
+        _SOURCES=(('store', 1, store), ('network', 2, network), ('dom', 3, dom)),
+        STORE_HEAD_START=head_start,
+    )
+
+
+def _select(store, network, dom, head_start=0.05):
+    with _patched(store, network, dom, head_start):
+        return asyncio.run(SourceSelector.select_source(page=FakePage()))
+
+
+class TestSelectSource:
+    """Tests for SourceSelector.select_source."""
+
+    def test_healthy_store_skips_other_sources(self):
+        """Test that CDP Network and DOM aren't set up when the Store is ready in time."""
+        events = []
+        source, degraded, metadata = _select(
+            _fake_source('store', events=events),
+            _fake_source('network', events=events),
+            _fake_source('dom', events=events),
+            head_start=1.0,
+        )
+
+        assert source.source_name == 'store'
+        assert degraded is False
+        assert [a['source'] for a in metadata['attempted_sources']] == ['store']
+        assert events == [('store', 'initialized')]
+
+    def test_store_preferred_and_others_released(self):
+        """Test that a slow Store still wins over a lower-priority source ready first."""
+        events = []
+        source, degraded, metadata = _select(
+            _fake_source('store', delay=0.15, events=events),
+            _fake_source('network', events=events),
+            _fake_source('dom', delay=5.0, events=events),
+        )
+
+        assert source.source_name == 'store'
+        assert degraded is False
+        assert [a['status'] for a in metadata['attempted_sources']] == ['success', 'success', 'cancelled']
+        assert ('network', 'cleanup') in events
+        assert ('dom', 'cancelled') in events
+        assert ('store', 'cleanup') not in events
+
+    def test_failed_store_does_not_delay_network(self):
+        """Test that probes overlap: total time is the slowest needed probe, not the sum."""
+        events = []
+        store = _fake_source('store', delay=0.1, error=SourceUnavailableError('no Store'), events=events)
+        network = _fake_source('network', delay=0.2, events=events)
+        dom = _fake_source('dom', delay=0.2, events=events)
+
+        started = time.monotonic()
+        source, degraded, metadata = _select(store, network, dom)
+        elapsed = time.monotonic() - started
+
+        assert source.source_name == 'network'
+        assert degraded is True
+        assert metadata['selected_source'] == 'network'
+        assert metadata['errors'] == [{'source': 'store', 'error': 'no Store'}]
+        assert metadata['attempted_sources'][0]['status'] == 'unavailable'
+        assert elapsed < 0.5
+
+    def test_all_sources_failing_raises(self):
+        """Test that SourceUnavailableError lists every source's error."""
+        with pytest.raises(SourceUnavailableError) as excinfo:
+            _select(
+                _fake_source('store', error=SourceUnavailableError('no Store')),
+                _fake_source('network', error=RuntimeError('no CDP')),
+                _fake_source('dom', error=RuntimeError('no DOM')),
+            )
+
+        message = str(excinfo.value)
+        assert 'no Store' in message and 'no CDP' in message and 'no DOM' in message
+
+    def test_store_winner_is_reused_for_the_same_page(self):
+        """Test that a second call initializes only the Store once it won."""
+        events = []
+        page = FakePage()
+        store = _fake_source('store', events=events)
+        network = _fake_source('network', events=events)
+        dom = _fake_source('dom', events=events)
+
+        async def run():
+            first = await SourceSelector.select_source(page)
+            events.clear()
+            second = await SourceSelector.select_source(page)
+            return first, second
+
+        with _patched(store, network, dom, head_start=1.0):
+            first, second = asyncio.run(run())
+
+        assert second[0] is not first[0]
+        assert second[0].source_name == 'store'
+        assert second[1] is False
+        assert [a['source'] for a in second[2]['attempted_sources']] == ['store']
+        assert events == [('store', 'initialized')]
+
+    def test_degraded_winner_is_probed_again(self):
+        """Test that the Store is used once ready after a fallback won."""
+        events = []
+        page = FakePage()
+        store_inits = []
+
+        class FlakyStore(_fake_source('store', events=events)):
+            async def init(self):
+                store_inits.append(self)
+                if len(store_inits) == 1:
+                    raise SourceUnavailableError('Store not ready')
+                await super().init()
+
+        network = _fake_source('network', events=events)
+        dom = _fake_source('dom', delay=5.0, events=events)
+
+        async def run():
+            first = await SourceSelector.select_source(page)
+            second = await SourceSelector.select_source(page)
+            return first, second
+
+        with _patched(FlakyStore, network, dom):
+            first, second = asyncio.run(run())
+
+        assert first[0].source_name == 'network'
+        assert first[1] is True
+        assert second[0].source_name == 'store'
+        assert second[1] is False
+        assert source_selector._selection_cache[page].result() == 0
+
+    def test_concurrent_calls_share_one_probe(self):
+        """Test that a call made while probing waits instead of probing again."""
+        events = []
+        page = FakePage()
+
+        async def run():
+            return await asyncio.gather(
+                SourceSelector.select_source(page),
+                SourceSelector.select_source(page),
+            )
+
+        with _patched(
+            _fake_source('store', delay=0.05, events=events),
+            _fake_source('network', events=events),
+            _fake_source('dom', events=events),
+            head_start=1.0,
+        ):
+            (first, _, _), (second, _, _) = asyncio.run(run())
+
+        assert first is not second
+        assert events == [('store', 'initialized')] * 2
+
+    def test_closed_page_is_forgotten(self):
+        """Test that closing the page drops its remembered source."""
+        events = []
+        page = FakePage()
+        sources = (
+            _fake_source('store', events=events),
+            _fake_source('network', events=events),
+            _fake_source('dom', events=events),
+        )
+
+        async def run():
+            await SourceSelector.select_source(page)
+            for handler in page.handlers['close']:
+                handler(page)
+            forgotten = page not in source_selector._selection_cache
+            await SourceSelector.select_source(page)
+            return forgotten
+
+        with _patched(*sources, head_start=1.0):
+            forgotten = asyncio.run(run())
+
+        assert forgotten
+        assert len(page.handlers['close']) == 1
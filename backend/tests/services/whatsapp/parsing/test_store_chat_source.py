@@ -0,0 +1,202 @@
+"""
+Unit tests for Store chat source.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.whatsapp.parsing.sources import store_chat_source
+from app.services.whatsapp.parsing.sources.base import SourceUnavailableError
+from app.services.whatsapp.parsing.sources.store_chat_source import StoreChatSource
+
+
+class FakePage:
+    """Page stub serving a Store snapshot and its chunks, counting evaluations."""
+
+    def __init__(self, snapshot, page_chats=None, url='https://web.whatsapp.com/', has_chat_list=True):
+        self.snapshot = snapshot
+        self.url = url
+        self.has_chat_list = has_chat_list
+        self.timeouts = []
+        self.page_chats = page_chats or []
+        self.evaluated = 0
+        self.chunks = []
+        self.init_scripts = []
+        self.waited = []
+        self.snapshot_args = []
+
+    async def wait_for_function(self, expression, timeout=None, polling=None):
+        self.waited.append(expression)
+        self.timeouts.append(timeout)
+        if not self.snapshot.get('available'):
+            raise TimeoutError(f'Timeout {timeout}ms exceeded.')
+
+    async def add_init_script(self, script=None):
+        self.init_scripts.append(script)
+
+    async def evaluate(self, expression, arg=None):
+        if expression == store_chat_source._STORE_HELPERS_JS:
+            return None
+        if expression == store_chat_source._CHAT_LIST_PRESENT_CALL:
+            return self.has_chat_list
+        self.evaluated += 1
+        if expression == store_chat_source._CHUNK_CALL:
+            self.chunks.append(arg)
+            return self.page_chats[arg[0]:arg[1]]
+        self.snapshot_args.append(arg)
+        return self.snapshot
+
+
+SNAPSHOT = {
+    'available': True,
+    'totalCount': 2,
+    'chats': [
+        ['1@c.us', None, 'Alice', False, 2, None],
+        ['2@g.us', None, 'Team', True, 0, 'https://pps.whatsapp.net/t'],
+    ],
+}
+
+
+class TestStoreChatSource:
+    """Tests for StoreChatSource."""
+
+    def test_first_fetch_reuses_init_snapshot(self):
+        """Test that init and the first fetch_batch share one page round-trip."""
+        page = FakePage(SNAPSHOT)
+        source = StoreChatSource(page)
+
+        async def run():
+            await source.init()
+            return await source.fetch_batch()
+
+        chats = asyncio.run(run())
+
+        assert page.evaluated == 1
+        assert [chat.jid for chat in chats] == ['1@c.us', '2@g.us']
+        assert chats[1].is_group is True
+        assert (chats[0].name, chats[0].unread_count) == ('Alice', 2)
+        assert chats[1].avatar_url == 'https://pps.whatsapp.net/t'
+        assert asyncio.run(source.total_expected()) == 2
+
+    def test_later_fetch_reads_store_again(self):
+        """Test that the cached snapshot is only used once."""
+        page = FakePage(SNAPSHOT)
+        source = StoreChatSource(page)
+
+        async def run():
+            await source.init()
+            await source.fetch_batch()
+            return await source.fetch_batch()
+
+        chats = asyncio.run(run())
+
+        assert page.evaluated == 2
+        assert len(chats) == 2
+
+    def test_large_lists_are_fetched_in_chunks(self):
+        """Test that chats beyond the first chunk are read slice by slice."""
+        size = store_chat_source.STORE_CHUNK_SIZE
+        page_chats = [[f'{i}@c.us', None, f'Chat {i}', False, 0, None] for i in range(size * 2 + 1)]
+        snapshot = {
+            'available': True,
+            'totalCount': len(page_chats),
+            'chats': page_chats[:size],
+        }
+        page = FakePage(snapshot, page_chats)
+        source = StoreChatSource(page)
+
+        async def run():
+            await source.init()
+            batches = []
+            while True:
+                batches.append(await source.fetch_batch())
+                if await source.is_complete():
+                    return batches
+
+        batches = asyncio.run(run())
+
+        assert [len(batch) for batch in batches] == [size, size, 1]
+        assert page.chunks == [[size, size * 2], [size * 2, size * 3]]
+        assert [chat.jid for batch in batches for chat in batch] == [chat[0] for chat in page_chats]
+
+    def test_helpers_installed_once_per_page(self):
+        """Test that later sources on the same page reuse the installed helpers."""
+        page = FakePage(SNAPSHOT)
+
+        async def run():
+            await StoreChatSource(page).init()
+            await StoreChatSource(page).init()
+
+        asyncio.run(run())
+
+        assert page.init_scripts == [store_chat_source._STORE_HELPERS_JS]
+        assert page.evaluated == 2
+
+    def test_init_waits_page_side_then_reports_reason(self):
+        """Test that a missing Store is detected by one page-side wait, not a retry loop."""
+        page = FakePage({'available': False, 'reason': 'Chat models not found', 'storeKeys': ['x']})
+        source = StoreChatSource(page)
+
+        with pytest.raises(SourceUnavailableError, match='Chat models not found'):
+            asyncio.run(source.init())
+
+        assert page.waited == [store_chat_source._READY_CALL]
+        assert page.evaluated == 1
+
+    def test_store_keys_only_requested_by_init(self):
+        """Test that the Store keys diagnostic is skipped on later re-reads."""
+        page = FakePage(SNAPSHOT)
+        source = StoreChatSource(page)
+
+        async def run():
+            await source.init()
+            await source.fetch_batch()
+            await source.fetch_batch()
+
+        asyncio.run(run())
+
+        assert page.snapshot_args == [
+            [store_chat_source.STORE_CHUNK_SIZE, True],
+            [store_chat_source.STORE_CHUNK_SIZE, False],
+        ]
+
+    def test_wait_is_short_without_the_chat_ui(self):
+        """Test that the full Store wait is only spent on the logged-in chat UI."""
+        missing = {'available': False, 'reason': 'Store not found'}
+        pages = [
+            FakePage(missing),
+            FakePage(missing, has_chat_list=False),
+            FakePage(missing, url='about:blank'),
+            FakePage(missing, url='https://web.whatsapp.com/send?phone=1'),
+        ]
+        for page in pages:
+            with pytest.raises(SourceUnavailableError):
+                asyncio.run(StoreChatSource(page).init())
+
+        assert [page.timeouts for page in pages] == [
+            [store_chat_source.STORE_WAIT_TIMEOUT_MS],
+            [store_chat_source.STORE_NO_UI_WAIT_MS],
+            [store_chat_source.STORE_NO_UI_WAIT_MS],
+            [store_chat_source.STORE_NO_UI_WAIT_MS],
+        ]
+
+    def test_unparsable_chats_are_skipped(self):
+        """Test that null rows are dropped without ending the snapshot early."""
+        size = store_chat_source.STORE_CHUNK_SIZE
+        page_chats = [None] * size + [['1@c.us', None, 'Alice', False, 0, None]]
+        snapshot = {'available': True, 'totalCount': len(page_chats), 'chats': page_chats[:size]}
+        page = FakePage(snapshot, page_chats)
+        source = StoreChatSource(page)
+
+        async def run():
+            await source.init()
+            first = await source.fetch_batch()
+            second = await source.fetch_batch()
+            return first, second, await source.is_complete()
+
+        first, second, complete = asyncio.run(run())
+
+        assert first == []
+        assert [chat.jid for chat in second] == ['1@c.us']
+        assert complete
@@ -0,0 +1,125 @@
+"""
+Unit tests for browser manager.
+"""
+
+import asyncio
+
+from app.services.whatsapp.browser_manager import BrowserManager
+
+
+class FakePage:
+    def __init__(self):
+        self.init_scripts = []
+
+    async def add_init_script(self, script=None):
+        self.init_scripts.append(script)
+
+
+class FakeContext:
+    """Persistent context stub firing its close handlers on close()."""
+
+    def __init__(self):
+        self.pages = [FakePage()]
+        self.handlers = []
+        self.close_calls = 0
+
+    def on(self, event, handler):
+        if event == "close":
+            self.handlers.append(handler)
+
+    async def close(self):
+        self.close_calls += 1
+        for handler in self.handlers:
+            handler(self)
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    async def launch_persistent_context(self, user_data_dir, **kwargs):
+        await asyncio.sleep(0.01)
+        context = FakeContext()
+        self.launched.append((user_data_dir, context))
+        return context
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+def _make_manager():
+    manager = BrowserManager()
+    manager.playwright = FakePlaywright()
+    return manager
+
+
+class TestPersistentContextPool:
+    """Tests for BrowserManager.create_persistent_context pooling."""
+
+    def test_open_context_is_reused(self):
+        """Test that concurrent and later calls for one directory share a launch."""
+        manager = _make_manager()
+
+        async def run():
+            first, second = await asyncio.gather(
+                manager.create_persistent_context("/data/a"),
+                manager.create_persistent_context("/data/a"),
+            )
+            third = await manager.create_persistent_context("/data/a")
+            other = await manager.create_persistent_context("/data/b")
+            return first, second, third, other
+
+        first, second, third, other = asyncio.run(run())
+
+        assert first is second is third
+        assert other is not first
+        assert [d for d, _ in manager.playwright.chromium.launched] == ["/data/a", "/data/b"]
+
+    def test_closed_context_is_relaunched(self):
+        """Test that closing a pooled context evicts it."""
+        manager = _make_manager()
+
+        async def run():
+            first = await manager.create_persistent_context("/data/a")
+            await first.close()
+            return first, await manager.create_persistent_context("/data/a")
+
+        first, second = asyncio.run(run())
+
+        assert second is not first
+        assert len(manager.playwright.chromium.launched) == 2
+
+    def test_init_script_added_once_per_page(self):
+        """Test that handing out a pooled page again doesn't stack init scripts."""
+        manager = _make_manager()
+
+        async def run():
+            context = await manager.create_persistent_context("/data/a")
+            await manager.create_page(context)
+            return await manager.create_page(context)
+
+        page = asyncio.run(run())
+
+        assert len(page.init_scripts) == 1
+
+    def test_shutdown_closes_pooled_contexts(self):
+        """Test that contexts left in the pool are closed on shutdown."""
+        manager = _make_manager()
+        playwright = manager.playwright
+
+        async def run():
+            context = await manager.create_persistent_context("/data/a")
+            await manager.shutdown()
+            return context
+
+        context = asyncio.run(run())
+
+        assert context.close_calls == 1
+        assert playwright.stopped
+        assert manager._persistent_contexts == {}
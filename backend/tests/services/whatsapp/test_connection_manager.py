@@ -0,0 +1,112 @@
+"""
+Unit tests for connection manager.
+"""
+
+import asyncio
+import gc
+from datetime import datetime, timedelta
+from unittest import mock
+
+from app.services.whatsapp import connection_manager
+from app.services.whatsapp.browser_manager import BrowserManager
+from app.services.whatsapp.connection_manager import ConnectionManager
+from app.services.whatsapp.session_manager import SessionManager, SessionState
+
+
+class FakePage:
+    """Page stub where one selector shows up after a delay and the rest time out."""
+
+    def __init__(self, shown_selector=None, delay=0.01):
+        self.shown_selector = shown_selector
+        self.delay = delay
+        self.waited = []
+        self.cancelled = []
+
+    async def wait_for_selector(self, selector, timeout=None):
+        self.waited.append(selector)
+        try:
+            if selector == self.shown_selector:
+                await asyncio.sleep(self.delay)
+                return object()
+            await asyncio.sleep(timeout / 1000)
+        except asyncio.CancelledError:
+            self.cancelled.append(selector)
+            raise
+        raise TimeoutError(f'Timeout {timeout}ms exceeded.')
+
+
+def _monitor(tmp_path, page, expires_in_sec=20, timeout_sec=300):
+    """Run _monitor_connection for a waiting_qr session, returning it and the elapsed time."""
+    session_manager = SessionManager(tmp_path, BrowserManager())
+    expires_at = datetime.utcnow() + timedelta(seconds=expires_in_sec)
+    session = SessionState(None, page, 'waiting_qr', expires_at=expires_at.isoformat())
+    session_manager.set_session("s1", session)
+    manager = ConnectionManager(session_manager, session_manager.browser_manager)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await manager._monitor_connection("s1")
+        return loop.time() - started
+
+    with mock.patch.object(connection_manager.settings, 'WHATSAPP_CONNECT_TIMEOUT_SEC', timeout_sec):
+        elapsed = asyncio.run(run())
+    return session_manager, session, elapsed
+
+
+class TestMonitorConnection:
+    """Tests for ConnectionManager._monitor_connection."""
+
+    def test_ready_as_soon_as_an_indicator_shows(self, tmp_path):
+        """Test that the first indicator to appear marks the session ready without polling."""
+        shown = connection_manager.MONITOR_CONNECTED_SELECTORS[3]
+        page = FakePage(shown_selector=shown)
+
+        session_manager, session, elapsed = _monitor(tmp_path, page)
+
+        assert session.status == 'ready'
+        assert session.connected_at
+        assert session_manager.is_session_ready("s1")
+        assert elapsed < 1.0
+        assert page.waited == list(connection_manager.MONITOR_CONNECTED_SELECTORS)
+        assert shown not in page.cancelled
+        assert len(page.cancelled) == len(connection_manager.MONITOR_CONNECTED_SELECTORS) - 1
+
+    def test_expired_qr_after_timeout(self, tmp_path):
+        """Test that a QR past its expiry is marked expired once every wait times out."""
+        _, session, _ = _monitor(tmp_path, FakePage(), expires_in_sec=-1, timeout_sec=0.01)
+
+        assert session.status == 'expired'
+
+    def test_unexpired_qr_stays_waiting_after_timeout(self, tmp_path):
+        """Test that the status is left alone when the QR has not expired yet."""
+        _, session, _ = _monitor(tmp_path, FakePage(), expires_in_sec=20, timeout_sec=0.01)
+
+        assert session.status == 'waiting_qr'
+
+    def test_failed_waits_are_retrieved(self, tmp_path):
+        """Test that losing waits leave no unretrieved task exceptions behind."""
+        page = FakePage(shown_selector=connection_manager.MONITOR_CONNECTED_SELECTORS[0])
+        errors = []
+
+        async def settle_together(selector, timeout=None):
+            # Settle together, so failures share the winner's done set
+            await asyncio.sleep(page.delay)
+            if selector == page.shown_selector:
+                return object()
+            raise RuntimeError('Target page, context or browser has been closed')
+
+        page.wait_for_selector = settle_together
+        manager = ConnectionManager(SessionManager(tmp_path, BrowserManager()), BrowserManager())
+
+        async def run():
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+            selector = await manager._wait_for_connected(page, 1000)
+            # Unretrieved exceptions are reported when their tasks are freed
+            gc.collect()
+            return selector
+
+        selector = asyncio.run(run())
+
+        assert selector == page.shown_selector
+        assert errors == []
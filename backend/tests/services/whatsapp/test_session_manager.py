@@ -0,0 +1,279 @@
+"""
+Unit tests for session manager.
+"""
+
+import asyncio
+import os
+import shutil
+import time
+from unittest import mock
+
+from app.services.whatsapp.browser_manager import BrowserManager
+from app.services.whatsapp import session_manager
+from app.services.whatsapp.session_manager import SessionManager, SessionState
+
+
+def _make_session(sessions_dir, session_id, age_days=0, browser_data=True, profile=True):
+    """Create a session directory whose browser_data is age_days old."""
+    session_path = sessions_dir / session_id
+    session_path.mkdir()
+    if browser_data:
+        browser_data_path = session_path / "browser_data"
+        browser_data_path.mkdir()
+        if profile:
+            (browser_data_path / "Default" / "IndexedDB").mkdir(parents=True)
+        mtime = time.time() - age_days * 86400
+        os.utime(browser_data_path, (mtime, mtime))
+    return session_path
+
+
+class FakeHandle:
+    def __init__(self, value):
+        self.value = value
+
+    async def json_value(self):
+        return self.value
+
+
+class FakePage:
+    """Page stub settling on a reuse state ('connected', 'qr' or None to time out)."""
+
+    def __init__(self, state='connected'):
+        self.state = state
+        self.waited = []
+        self.wait_until = None
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.wait_until = wait_until
+
+    async def wait_for_function(self, expression, arg=None, timeout=None, polling=None):
+        self.waited.append((expression, arg))
+        if self.state is None:
+            raise TimeoutError(f'Timeout {timeout}ms exceeded.')
+        return FakeHandle(self.state)
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.close_calls = 0
+
+    async def close(self):
+        self.close_calls += 1
+        await asyncio.sleep(0)
+        self.closed = True
+
+
+class FakeBrowserManager:
+    """Browser manager stub handing out one context and page."""
+
+    def __init__(self, page):
+        self.page = page
+        self.context = FakeContext()
+
+    async def initialize(self):
+        pass
+
+    async def create_persistent_context(self, user_data_dir):
+        return self.context
+
+    async def create_page(self, context):
+        return self.page
+
+
+class TestSessionsOnDisk:
+    """Tests for SessionManager disk scans."""
+
+    def test_list_existing_sessions(self, tmp_path):
+        """Test that only directories with browser_data are listed."""
+        _make_session(tmp_path, "used")
+        _make_session(tmp_path, "empty", browser_data=False)
+        (tmp_path / "notes.txt").write_text("not a session")
+        manager = SessionManager(tmp_path, BrowserManager())
+
+        assert manager.list_existing_sessions() == ["used"]
+
+    def test_iter_existing_sessions_stops_early(self, tmp_path):
+        """Test that sessions past the ones consumed are never checked."""
+        for i in range(3):
+            _make_session(tmp_path, f"s{i}")
+        manager = SessionManager(tmp_path, BrowserManager())
+
+        with mock.patch("app.services.whatsapp.session_manager.os.path.exists", return_value=True) as exists:
+            first = next(manager.iter_existing_sessions())
+
+        assert first.startswith("s")
+        assert exists.call_count == 1
+
+    def test_check_session_exists(self, tmp_path):
+        """Test that loaded sessions skip the disk check and others are looked up."""
+        _make_session(tmp_path, "on_disk")
+        manager = SessionManager(tmp_path, BrowserManager())
+        manager.set_session("loaded", SessionState(None, None, 'ready'))
+
+        with mock.patch("app.services.whatsapp.session_manager.os.path.exists", wraps=os.path.exists) as exists:
+            results = [
+                asyncio.run(manager.check_session_exists(session_id))
+                for session_id in ("loaded", "on_disk", "missing")
+            ]
+
+        assert results == [True, True, False]
+        assert exists.call_count == 2
+
+    def test_missing_sessions_dir_lists_nothing(self, tmp_path):
+        """Test that a removed sessions directory yields no sessions."""
+        manager = SessionManager(tmp_path / "sessions", BrowserManager())
+        (tmp_path / "sessions").rmdir()
+
+        assert manager.list_existing_sessions() == []
+
+    def test_cleanup_old_sessions(self, tmp_path):
+        """Test that sessions past max_age_days or beyond max_sessions are deleted."""
+        _make_session(tmp_path, "new", age_days=0)
+        _make_session(tmp_path, "recent", age_days=2)
+        _make_session(tmp_path, "older", age_days=10)
+        _make_session(tmp_path, "stale", age_days=30)
+        _make_session(tmp_path, "empty", browser_data=False)
+        manager = SessionManager(tmp_path, BrowserManager())
+
+        stats = manager.cleanup_old_sessions(max_age_days=7, max_sessions=3)
+
+        assert (stats["deleted"], stats["kept"]) == (2, 2)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["empty", "new", "recent"]
+
+    def test_failed_deletion_is_not_counted(self, tmp_path):
+        """Test that one failing rmtree doesn't stop the other deletions."""
+        for i in range(4):
+            _make_session(tmp_path, f"stale{i}", age_days=30)
+        manager = SessionManager(tmp_path, BrowserManager())
+        rmtree = shutil.rmtree
+
+        def flaky_rmtree(path):
+            if path.endswith("stale2"):
+                raise PermissionError(path)
+            rmtree(path)
+
+        with mock.patch("app.services.whatsapp.session_manager.shutil.rmtree", side_effect=flaky_rmtree):
+            stats = manager.cleanup_old_sessions(max_age_days=7)
+
+        assert stats["deleted"] == 3
+        assert [p.name for p in tmp_path.iterdir()] == ["stale2"]
+
+    def test_async_cleanup_matches_sync(self, tmp_path):
+        """Test that the async cleanup gives the same result with rmtree in the executor."""
+        stats = {}
+        for variant in ("sync", "async"):
+            sessions_dir = tmp_path / variant
+            sessions_dir.mkdir()
+            for name, age_days in (("new", 0), ("recent", 2), ("older", 10), ("stale", 30)):
+                _make_session(sessions_dir, name, age_days=age_days)
+            manager = SessionManager(sessions_dir, BrowserManager())
+            if variant == "sync":
+                stats[variant] = manager.cleanup_old_sessions(max_age_days=7, max_sessions=3)
+            else:
+                stats[variant] = asyncio.run(manager.cleanup_old_sessions_async(max_age_days=7, max_sessions=3))
+
+        assert stats["async"] == stats["sync"]
+        assert sorted(p.name for p in (tmp_path / "async").iterdir()) == ["new", "recent"]
+
+
+class TestTryReuseSession:
+    """Tests for SessionManager.try_reuse_session."""
+
+    def test_connected_session_checked_in_one_wait(self, tmp_path):
+        """Test that all connected selectors are checked by one page-side wait."""
+        _make_session(tmp_path, "s1")
+        page = FakePage()
+        manager = SessionManager(tmp_path, FakeBrowserManager(page))
+
+        result = asyncio.run(manager.try_reuse_session("s1"))
+
+        assert result["reused"] is True
+        assert manager.is_session_ready("s1")
+        assert page.wait_until == 'domcontentloaded'
+        assert page.waited == [(
+            session_manager.PAGE_STATE_JS,
+            [session_manager.CONNECTED_SELECTORS, session_manager.QR_SELECTOR],
+        )]
+
+    def test_disconnected_session_needs_qr(self, tmp_path):
+        """Test that a session showing the QR code (or nothing) is closed."""
+        for state in ('qr', None):
+            session_id = f"s-{state}"
+            _make_session(tmp_path, session_id)
+            browser_manager = FakeBrowserManager(FakePage(state))
+            manager = SessionManager(tmp_path, browser_manager)
+
+            result = asyncio.run(manager.try_reuse_session(session_id))
+
+            assert result["reused"] is False
+            assert browser_manager.context.close_calls == 1
+            assert session_id not in manager.sessions
+
+    def test_missing_directories_reported(self, tmp_path):
+        """Test that a missing session directory and missing browser_data give their own reasons."""
+        _make_session(tmp_path, "no-data", browser_data=False)
+        (tmp_path / "file-data").mkdir()
+        (tmp_path / "file-data" / "browser_data").write_text("")
+        manager = SessionManager(tmp_path, FakeBrowserManager(FakePage()))
+
+        reasons = {
+            session_id: asyncio.run(manager.try_reuse_session(session_id))["reason"]
+            for session_id in ("missing", "no-data", "file-data")
+        }
+
+        assert reasons == {
+            "missing": "Session directory not found",
+            "no-data": "No browser data found",
+            "file-data": "No browser data found",
+        }
+
+    def test_empty_profile_skips_browser_launch(self, tmp_path):
+        """Test that a browser_data without a WhatsApp profile is rejected up front."""
+        _make_session(tmp_path, "s1", profile=False)
+        browser_manager = FakeBrowserManager(FakePage())
+        manager = SessionManager(tmp_path, browser_manager)
+
+        with mock.patch.object(browser_manager, "create_persistent_context") as create:
+            result = asyncio.run(manager.try_reuse_session("s1"))
+
+        assert result == {"reused": False, "reason": "No usable profile data"}
+        create.assert_not_called()
+
+
+class TestReadySessions:
+    """Tests for SessionManager.is_session_ready."""
+
+    def test_ready_set_follows_status_changes(self, tmp_path):
+        """Test that readiness tracks set_session and cleanup_session."""
+        manager = SessionManager(tmp_path, BrowserManager())
+        session = SessionState(FakeContext(), None, 'waiting_qr')
+
+        manager.set_session("s1", session)
+        assert not manager.is_session_ready("s1")
+
+        session.status = 'ready'
+        manager.set_session("s1", session)
+        assert manager.is_session_ready("s1")
+
+        session.status = 'expired'
+        manager.set_session("s1", session)
+        assert not manager.is_session_ready("s1")
+
+        session.status = 'ready'
+        manager.set_session("s1", session)
+        asyncio.run(manager.cleanup_session("s1"))
+        assert not manager.is_session_ready("s1")
+
+    def test_concurrent_cleanups_close_once(self, tmp_path):
+        """Test that cleaning up the same session twice at once closes it once."""
+        manager = SessionManager(tmp_path, BrowserManager())
+        context = FakeContext()
+        manager.set_session("s1", SessionState(context, None, 'ready'))
+
+        async def run():
+            return await asyncio.gather(manager.cleanup_session("s1"), manager.cleanup_session("s1"))
+
+        assert sorted(asyncio.run(run())) == [False, True]
+        assert context.close_calls == 1
+        assert manager.sessions == {}